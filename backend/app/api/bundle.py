@@ -1,18 +1,86 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
-from app.models.schemas import BundleRequest, BundleResponse, Bundle, OptimizationRequest, PlanFeature
+import asyncio
+import hashlib
+import math
+import time
+import numpy as np
+import orjson
+from app.models.schemas import (
+    BundleRequest, BundleResponse, Bundle, BundleListResponse, BundleSearchRequest, OptimizationRequest, PlanFeature, ReloadReport,
+    AllowanceTableRequest, AllowanceTableResponse, RatingAreaAllowances,
+    AffordabilityRequest, AffordabilityResponse, EmployeeAffordability, PlanListResponse, PlanSearchRequest,
+    PlanMenuRequest, PlanMenuResponse, MinimumAllowanceRequest, MinimumAllowanceResponse, ClassMinimumAllowance,
+    AnalyticsQueryRequest, AnalyticsQueryResponse
+)
 from app.models.domain import BundleResult, EmployeeProfile
+from app.models.records import dumps_plans
 from app.services.bundle_service import BundleService
-from app.services.data_service import DataService
+from app.services.data_service import DataService, PufUnavailableError
+from app.services.analytics import QueryTimeoutError
+from app.services.reload_service import DatasetReloader
+from app.api.streaming import STREAM_CHUNK_SIZE, ndjson_response, wants_ndjson
+from app.services.plan_index import SORT_KEYS, cursor_scope, decode_cursor, encode_cursor, project
+from app.services.single_flight import SingleFlight, request_key
+from app.services.work_queue import BoundedExecutor, QueueFullError
+from app.services.response_cache import ResponseCache, accepts_gzip, etag_matches, gzip_etag, make_etag
 from app.optimization.bundler import BenefitBundler
+from app.optimization.allowance import AllowanceTableGenerator
+from app.optimization.affordability import AffordabilityEngine
+from app.optimization.plan_menu import PlanMenuOptimizer
+from app.optimization.minimum_allowance import MinimumAllowanceSolver
+from app.optimization.rate_curves import normalize_rating_area
+import pandas as pd
 
 router = APIRouter()
 
-def get_data_service():
-    return DataService()
+def get_data_service(request: Request) -> DataService:
+    # Shared instance created in app.main so the in-memory CMS data is loaded once per process
+    data_service = getattr(request.app.state, "data_service", None)
+    return data_service if data_service is not None else DataService()
 
-def get_benefit_bundler():
-    return BenefitBundler()
+def get_loaded_data_service(request: Request, data_service: DataService = Depends(get_data_service)) -> DataService:
+    # While the startup load is still running, answer 503 instead of blocking on (or duplicating) the load
+    if data_service.load_progress.loading and not data_service.cms_loaded:
+        raise HTTPException(status_code=503, detail="CMS data is still loading", headers={"Retry-After": "5"})
+    # With a shared dataset, pick up a snapshot another worker published (one stat when nothing changed)
+    reloader = getattr(request.app.state, "dataset_reloader", None)
+    if reloader is not None and reloader.data_service is data_service:
+        reloader.follow_shared()
+    return data_service
+
+def get_benefit_bundler(request: Request) -> BenefitBundler:
+    bundler = getattr(request.app.state, "benefit_bundler", None)
+    return bundler if bundler is not None else BenefitBundler()
+
+def get_plan_response_cache(request: Request) -> ResponseCache:
+    response_cache = getattr(request.app.state, "plan_response_cache", None)
+    if response_cache is None:
+        response_cache = request.app.state.plan_response_cache = ResponseCache()
+    return response_cache
+
+def get_optimize_flights(request: Request) -> SingleFlight:
+    flights = getattr(request.app.state, "optimize_flights", None)
+    if flights is None:
+        flights = request.app.state.optimize_flights = SingleFlight()
+    return flights
+
+def get_optimize_executor(request: Request) -> BoundedExecutor:
+    executor = getattr(request.app.state, "optimize_executor", None)
+    if executor is None:
+        executor = request.app.state.optimize_executor = BoundedExecutor()
+    return executor
+
+def _overloaded(error: QueueFullError) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": str(error.retry_after)})
+
+def _puf_unavailable(error: PufUnavailableError) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(error))
+
+def get_dataset_reloader(request: Request, data_service: DataService = Depends(get_data_service)) -> DatasetReloader:
+    reloader = getattr(request.app.state, "dataset_reloader", None)
+    return reloader if reloader is not None else DatasetReloader(data_service)
 
 @router.post("/bundles", response_model=BundleResponse)
 async def create_bundle(bundle_request: BundleRequest):
@@ -42,6 +110,22 @@ async def get_bundles(limit: Optional[int] = 10, offset: Optional[int] = 0):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/bundles/search", response_model=BundleListResponse)
+async def search_bundles(
+    criteria: BundleSearchRequest,
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    data_service: DataService = Depends(get_data_service),
+    bundler: BenefitBundler = Depends(get_benefit_bundler)
+):
+    """
+    Search saved bundles by benefit types, providers, network type, coverage level, status and budget,
+    cheapest first. Filtering runs on the store's indexes, so only the requested page is fetched.
+    """
+    bundle_service = BundleService(data_service, bundler)
+    bundles, total = await bundle_service.search_bundles(criteria, limit=limit, offset=offset)
+    return BundleListResponse(bundles=bundles, total_count=total, limit=limit, offset=offset)
+
 @router.get("/bundles/{bundle_id}", response_model=Bundle)
 async def get_bundle(bundle_id: str):
     """
@@ -86,79 +170,477 @@ async def delete_bundle(bundle_id: str):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def _optimize_plans(request: OptimizationRequest, data_service: DataService, bundler: BenefitBundler) -> BundleResult:
+    """
+    Filter the state's plans by the request constraints and select the best one for the employee profile
+    """
+    plans = data_service.get_plans_by_state(request.state_code)
+    if not plans:
+        raise HTTPException(status_code=404, detail=f"No plans found for state {request.state_code}")
+    # Filter plans based on all constraints
+    filtered_plans = []
+    for plan in plans:
+        if request.max_monthly_premium is not None and plan.monthly_premium > request.max_monthly_premium:
+            continue
+        if request.min_actuarial_value is not None and plan.actuarial_value < request.min_actuarial_value / 100.0:
+            continue
+        if request.preferred_metal_level and plan.metal_level.lower() != request.preferred_metal_level.lower():
+            continue
+        if request.preferred_plan_type and plan.plan_type.lower() != request.preferred_plan_type.lower():
+            continue
+        if request.max_deductible is not None and plan.deductible > request.max_deductible:
+            continue
+        if request.hsa_eligible_only and not plan.hsa_eligible:
+            continue
+        # Required benefits filtering (if provided)
+        if request.required_benefits:
+            # This requires access to the benefits CSV; for now, assume plan has a 'covered_benefits' attribute or skip
+            # If not available, skip this filter
+            if hasattr(plan, 'covered_benefits'):
+                if not all(benefit in getattr(plan, 'covered_benefits', []) for benefit in request.required_benefits):
+                    continue
+        # Tobacco preference is not implemented in PlanFeature, so skip for now
+        filtered_plans.append(plan)
+    if not filtered_plans:
+        raise HTTPException(status_code=404, detail="No plans match the given constraints.")
+    # Build EmployeeProfile for optimizer
+    profile = EmployeeProfile(
+        age=request.age,
+        risk_score=request.risk_score,
+        budget_cap=request.budget_cap,
+        coverage_level=request.coverage_level,
+        spouse_age=request.spouse_age,
+        dependent_ages=request.dependent_ages,
+        rating_area_id=request.rating_area_id
+    )
+    cost_model = data_service.get_cost_model() if request.use_expected_cost else None
+    return bundler.optimize(profile, filtered_plans, data_service.get_family_premium_calculator(), cost_model)
+
 @router.post("/optimize", response_model=BundleResult, status_code=status.HTTP_200_OK)
 async def optimize_bundle(
     request: OptimizationRequest,
-    data_service: DataService = Depends(get_data_service),
-    bundler: BenefitBundler = Depends(get_benefit_bundler)
+    data_service: DataService = Depends(get_loaded_data_service),
+    bundler: BenefitBundler = Depends(get_benefit_bundler),
+    flights: SingleFlight = Depends(get_optimize_flights),
+    executor: BoundedExecutor = Depends(get_optimize_executor)
 ):
     """
-    Optimize a benefit bundle for an employee profile and state.
-    """
-    try:
-        plans = data_service.get_plans_by_state(request.state_code)
-        if not plans:
-            raise HTTPException(status_code=404, detail=f"No plans found for state {request.state_code}")
-        # Filter plans based on all constraints
-        filtered_plans = []
-        for plan in plans:
-            if request.max_monthly_premium is not None and plan.monthly_premium > request.max_monthly_premium:
-                continue
-            if request.min_actuarial_value is not None and plan.actuarial_value < request.min_actuarial_value / 100.0:
-                continue
-            if request.preferred_metal_level and plan.metal_level.lower() != request.preferred_metal_level.lower():
-                continue
-            if request.preferred_plan_type and plan.plan_type.lower() != request.preferred_plan_type.lower():
-                continue
-            if request.max_deductible is not None and plan.deductible > request.max_deductible:
-                continue
-            if request.hsa_eligible_only and not plan.hsa_eligible:
-                continue
-            # Required benefits filtering (if provided)
-            if request.required_benefits:
-                # This requires access to the benefits CSV; for now, assume plan has a 'covered_benefits' attribute or skip
-                # If not available, skip this filter
-                if hasattr(plan, 'covered_benefits'):
-                    if not all(benefit in getattr(plan, 'covered_benefits', []) for benefit in request.required_benefits):
-                        continue
-            # Tobacco preference is not implemented in PlanFeature, so skip for now
-            filtered_plans.append(plan)
-        if not filtered_plans:
-            raise HTTPException(status_code=404, detail="No plans match the given constraints.")
-        # Build EmployeeProfile for optimizer
-        profile = EmployeeProfile(
-            age=request.age,
-            risk_score=request.risk_score,
-            budget_cap=request.budget_cap
-        )
-        result = bundler.optimize(profile, filtered_plans)
-        return result
+    Optimize a benefit bundle for an employee profile and state. Concurrent identical requests against the
+    same dataset share one computation, which runs on the bounded optimization executor; when its queue is
+    full the request is rejected with 503 and a Retry-After header.
+    """
+    try:
+        key = request_key(request, data_service.dataset_version)
+        return await flights.run(key, lambda: executor.run(_optimize_plans, request, data_service, bundler))
     except HTTPException:
         raise
+    except QueueFullError as e:
+        raise _overloaded(e)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Optimization timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
 
+def _select_plan_menu(request: PlanMenuRequest, data_service: DataService, bundler: BenefitBundler) -> PlanMenuResponse:
+    start_time = time.time()
+    plans = data_service.get_plans_by_state(request.state_code)
+    if not plans:
+        raise HTTPException(status_code=404, detail=f"No plans found for state {request.state_code}")
+    menu_optimizer = PlanMenuOptimizer(bundler)
+    matrix = menu_optimizer.utility_matrix(request.employees, plans, data_service.get_family_premium_calculator())
+    selection = menu_optimizer.select(matrix, request.menu_size, request.method)
+    assigned = selection.assignments[selection.assignments >= 0]
+    return PlanMenuResponse(
+        plans=[plans[j].to_feature() for j in selection.plan_indices],
+        enrolled_counts=np.bincount(assigned, minlength=len(selection.plan_indices)).tolist(),
+        total_utility=selection.total_utility,
+        upper_bound=selection.upper_bound,
+        covered_employees=len(assigned),
+        method=selection.method,
+        optimization_time_ms=(time.time() - start_time) * 1000
+    )
+
+@router.post("/plan-menu", response_model=PlanMenuResponse, status_code=status.HTTP_200_OK)
+async def optimize_plan_menu(
+    request: PlanMenuRequest,
+    data_service: DataService = Depends(get_loaded_data_service),
+    bundler: BenefitBundler = Depends(get_benefit_bundler),
+    executor: BoundedExecutor = Depends(get_optimize_executor)
+):
+    """
+    Choose the menu of plans an employer offers the whole census, maximizing each employee's best-available utility.
+    """
+    try:
+        return await executor.run(_select_plan_menu, request, data_service, bundler)
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Menu optimization failed: {str(e)}")
+
+@router.get("/plans", response_model=PlanListResponse, status_code=status.HTTP_200_OK)
+async def list_plans(
+    request: Request,
+    search: PlanSearchRequest = Depends(),
+    sort_by: str = Query("premium", description=f"One of: {', '.join(SORT_KEYS)}"),
+    descending: bool = False,
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of a previous page; overrides offset"),
+    fields: Optional[str] = Query(None, description="Comma-separated plan fields to return"),
+    data_service: DataService = Depends(get_loaded_data_service),
+    executor: BoundedExecutor = Depends(get_optimize_executor)
+):
+    """
+    Paged, sorted and optionally projected plan listing. Pages are slices of per-state orders built once
+    per dataset version (on the optimization executor), so deep pages cost the same as the first one.
+    """
+    try:
+        index = await executor.run(data_service.get_plan_index)
+        version = data_service.dataset_version
+        filters = search.model_dump(exclude_none=True, exclude={"state_code"}, mode="json")
+        scope = cursor_scope(search.state_code, sort_by, descending, filters)
+        if cursor:
+            cursor_version, offset, issued_scope = decode_cursor(cursor)
+            if issued_scope != scope:
+                raise HTTPException(status_code=400, detail="Cursor was issued for a different sort or filter set")
+            if cursor_version != version:
+                raise HTTPException(status_code=409, detail="Cursor belongs to an older dataset version; restart paging")
+        etag = make_etag(version, hashlib.sha256(f"{request.url.query}|{offset}".encode()).hexdigest()[:16])
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        plans, total = index.page(search.state_code, sort_by, descending, offset, limit, filters)
+        selected = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+        next_offset = offset + limit
+        body = orjson.dumps({
+            "plans": project(plans, selected),
+            "total_count": total,
+            "limit": limit,
+            "offset": offset,
+            "sort_by": sort_by,
+            "descending": descending,
+            "next_cursor": encode_cursor(version, next_offset, scope) if next_offset < total else None,
+            "filters_applied": search.model_dump(exclude_none=True, mode="json"),
+        })
+        return Response(content=body, media_type="application/json", headers={"ETag": etag, "Cache-Control": "no-cache"})
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to list plans: {str(e)}")
+
 @router.get("/plans/{state_code}", response_model=List[PlanFeature], status_code=status.HTTP_200_OK)
 async def get_plans_for_state(
     state_code: str,
-    data_service: DataService = Depends(get_data_service)
+    request: Request,
+    data_service: DataService = Depends(get_loaded_data_service),
+    response_cache: ResponseCache = Depends(get_plan_response_cache),
+    executor: BoundedExecutor = Depends(get_optimize_executor)
 ):
     """
-    Get available plans for a state.
+    Get available plans for a state. Responses carry a strong ETag tied to the dataset version, one
+    per content coding; a matching If-None-Match gets 304 without touching the data layer. With
+    ?format=ndjson (or Accept: application/x-ndjson) plans are streamed one JSON document per line.
+    Cache misses are built on the optimization executor.
     """
+    state_code = state_code.upper()
+    streaming = wants_ndjson(request)
+    zipped = not streaming and accepts_gzip(request.headers.get("accept-encoding"))
+    etag_key = f"{state_code}.ndjson" if streaming else state_code
+    version = data_service.dataset_version
+    if version is not None:
+        etag = make_etag(version, etag_key)
+        # Either coding's tag validates the cached copy; the 304 names the variant this request selects
+        tags = (etag,) if streaming else (etag, gzip_etag(etag))
+        if etag_matches(request.headers.get("if-none-match"), *tags):
+            headers = {"ETag": gzip_etag(etag) if zipped else etag, "Cache-Control": "no-cache"}
+            if not streaming:
+                headers["Vary"] = "Accept-Encoding"
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     try:
-        plans = data_service.get_plans_by_state(state_code)
-        if not plans:
-            raise HTTPException(status_code=404, detail=f"No plans found for state {state_code}")
-        return plans
+        if streaming:
+            partition = (await executor.run(data_service.get_plan_index)).plans(state_code)
+            if not partition:
+                raise HTTPException(status_code=404, detail=f"No plans found for state {state_code}")
+            etag = make_etag(data_service.dataset_version, etag_key)
+            return ndjson_response(partition, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        def build() -> bytes:
+            # Plans are looked up only on a cache miss; records are serialized directly and
+            # response_model only documents the schema
+            plans = data_service.get_plans_by_state(state_code)
+            if not plans:
+                raise HTTPException(status_code=404, detail=f"No plans found for state {state_code}")
+            return dumps_plans(plans)
+
+        version = data_service.dataset_version
+        entry = response_cache.get(version, state_code)
+        if entry is None:
+            entry = await executor.run(response_cache.get_or_build, version, state_code, build)
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if zipped:
+            headers["ETag"] = entry.gzip_etag
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=entry.gzip_body, media_type="application/json", headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
     except HTTPException:
         raise
+    except QueueFullError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load plans: {str(e)}")
 
+def _generate_allowance_table(request: AllowanceTableRequest, data_service: DataService) -> AllowanceTableResponse:
+    curves = data_service.get_rate_curves(tobacco=request.tobacco).for_state(request.state_code)
+    if not len(curves):
+        raise HTTPException(status_code=404, detail=f"No rates found for state {request.state_code}")
+    table = AllowanceTableGenerator(curves).generate(
+        request.classes,
+        metal_level=request.metal_level,
+        benchmark=request.benchmark,
+        percentile=request.percentile,
+        min_age=request.min_age,
+        max_age=request.max_age
+    )
+    if not len(table.area_ids):
+        raise HTTPException(status_code=404, detail=f"No {request.metal_level} benchmark plans found for state {request.state_code}")
+
+    def clean(values):
+        return [None if math.isnan(v) else round(v, 2) for v in values.tolist()]
+
+    tables = [
+        RatingAreaAllowances(
+            class_name=class_name,
+            state_code=table.area_states[a],
+            rating_area_id=table.area_ids[a],
+            benchmark_premiums=clean(table.benchmark_premiums[a]),
+            allowances=clean(table.allowances[c, a])
+        )
+        for c, class_name in enumerate(table.class_names)
+        for a in range(len(table.area_ids))
+    ]
+    return AllowanceTableResponse(
+        state_code=request.state_code.upper(),
+        benchmark=request.benchmark,
+        ages=table.ages.tolist(),
+        tables=tables
+    )
+
+@router.post("/allowances", response_model=AllowanceTableResponse, status_code=status.HTTP_200_OK)
+async def generate_allowance_table(
+    request: AllowanceTableRequest,
+    data_service: DataService = Depends(get_loaded_data_service),
+    executor: BoundedExecutor = Depends(get_optimize_executor)
+):
+    """
+    Generate ICHRA allowance tables per class, rating area and age from Rate PUF benchmark premiums.
+    """
+    if request.min_age > request.max_age:
+        raise HTTPException(status_code=422, detail="min_age must not exceed max_age")
+    try:
+        return await executor.run(_generate_allowance_table, request, data_service)
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Allowance table generation failed: {str(e)}")
+
+def _affordability_rows(evaluated: pd.DataFrame):
+    def optional(value):
+        return None if pd.isna(value) else round(float(value), 2)
+
+    for row in evaluated.itertuples(index=False):
+        yield {
+            "employee_id": row.employee_id,
+            "lcsp_premium": optional(row.lcsp_premium),
+            "required_contribution": optional(row.required_contribution),
+            "affordability_limit": round(row.affordability_limit, 2),
+            "affordable": row.affordable,
+            "shortfall": optional(row.shortfall) if row.affordable is not None else None
+        }
+
+def _find_minimum_allowances(request: MinimumAllowanceRequest, data_service: DataService) -> MinimumAllowanceResponse:
+    solver = data_service.get_derived(
+        'minimum_allowance_solver', lambda: MinimumAllowanceSolver(data_service.get_rate_curves())
+    )
+    census = pd.DataFrame([employee.model_dump() for employee in request.employees])
+    result = solver.solve(census, request.target_coverage, request.min_metal_level.value, request.min_choices,
+                          request.annual_budget, request.affordability_percentage)
+    classes = result.classes.astype(object).where(result.classes.notna(), None)
+    return MinimumAllowanceResponse(
+        classes=[ClassMinimumAllowance(**row) for row in classes.to_dict(orient="records")],
+        target_coverage=request.target_coverage,
+        annual_cost=result.annual_cost,
+        budget_coverage=result.budget_coverage
+    )
+
+@router.post("/allowances/minimum", response_model=MinimumAllowanceResponse, status_code=status.HTTP_200_OK)
+async def find_minimum_allowances(
+    request: MinimumAllowanceRequest,
+    data_service: DataService = Depends(get_loaded_data_service),
+    executor: BoundedExecutor = Depends(get_optimize_executor)
+):
+    """
+    Smallest monthly allowance per class at which the target share of employees can afford a plan meeting the metal floor.
+    The solver is built once per dataset version; the search runs on the bounded optimization executor.
+    """
+    try:
+        return await executor.run(_find_minimum_allowances, request, data_service)
+    except QueueFullError as e:
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Minimum allowance search failed: {str(e)}")
+
+def _affordability_engine(data_service: DataService) -> AffordabilityEngine:
+    return data_service.get_derived(
+        'affordability_engine', lambda: AffordabilityEngine(data_service.get_rate_curves())
+    )
+
+def _evaluate_affordability(request: AffordabilityRequest, engine: AffordabilityEngine) -> AffordabilityResponse:
+    census = pd.DataFrame([employee.model_dump() for employee in request.employees])
+    evaluated = engine.evaluate(census, request.affordability_percentage)
+    return AffordabilityResponse(
+        results=[EmployeeAffordability(**row) for row in _affordability_rows(evaluated)],
+        affordable_count=int((evaluated['affordable'] == True).sum()),
+        unaffordable_count=int((evaluated['affordable'] == False).sum()),
+        unmatched_count=int(evaluated['affordable'].isna().sum()),
+        affordability_percentage=request.affordability_percentage or engine.affordability_percentage
+    )
+
+@router.post("/affordability", response_model=AffordabilityResponse, status_code=status.HTTP_200_OK)
+async def evaluate_affordability(
+    request: AffordabilityRequest,
+    http_request: Request,
+    data_service: DataService = Depends(get_loaded_data_service),
+    executor: BoundedExecutor = Depends(get_optimize_executor)
+):
+    """
+    Evaluate ICHRA affordability for a census against the lowest-cost silver plan in each employee's rating area.
+    With ?format=ndjson (or Accept: application/x-ndjson) one EmployeeAffordability per line is streamed,
+    evaluated a chunk of the census at a time. Otherwise the census is evaluated on the optimization executor.
+    """
+    try:
+        engine = await executor.run(_affordability_engine, data_service)
+        if wants_ndjson(http_request):
+            employees = request.employees
+            percentage = request.affordability_percentage
+
+            def stream_rows():
+                # A sync iterator: the response iterates it on the threadpool, off the event loop
+                for start in range(0, len(employees), STREAM_CHUNK_SIZE):
+                    chunk = pd.DataFrame([employee.model_dump() for employee in employees[start:start + STREAM_CHUNK_SIZE]])
+                    yield from _affordability_rows(engine.evaluate(chunk, percentage))
+
+            return ndjson_response(stream_rows())
+
+        return await executor.run(_evaluate_affordability, request, engine)
+    except QueueFullError as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Affordability evaluation failed: {str(e)}")
+
+@router.get("/puf/{kind}", status_code=status.HTTP_200_OK)
+async def query_puf(
+    kind: str,
+    state_code: str = Query(..., min_length=2, max_length=2),
+    plan_id: Optional[str] = None,
+    age: Optional[str] = Query(None, description='Rate PUF age band, e.g. "40", "0-14" or "64 and over"'),
+    rating_area_id: Optional[str] = None,
+    benefit_name: Optional[str] = None,
+    columns: Optional[str] = Query(None, description="Comma-separated PUF columns to return"),
+    limit: int = Query(1000, ge=1, le=50000),
+    data_service: DataService = Depends(get_loaded_data_service)
+):
+    """
+    Raw Rate or Benefits PUF rows for one state. Reads only the requested columns and matching row groups when
+    the columnar PUF store is configured.
+    """
+    if kind not in ("rate", "benefits"):
+        raise HTTPException(status_code=404, detail=f"Unknown PUF '{kind}'")
+    filters = {"StateCode": state_code.upper()}
+    if plan_id:
+        filters["PlanId" if kind == "rate" or "-" in plan_id else "StandardComponentId"] = plan_id
+    if age is not None:
+        filters["Age"] = age
+    if rating_area_id is not None:
+        filters["RatingAreaId"] = normalize_rating_area(pd.Series([rating_area_id])).iloc[0]
+    if benefit_name is not None:
+        filters["BenefitName"] = benefit_name
+    try:
+        rows = await run_in_threadpool(data_service.query_puf, kind,
+                                       [column.strip() for column in columns.split(",")] if columns else None,
+                                       filters, limit)
+        rows = rows.astype(object).where(rows.notna(), None)
+        return {"kind": kind, "count": len(rows), "rows": rows.to_dict("records")}
+    except PufUnavailableError as e:
+        raise _puf_unavailable(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PUF query failed: {str(e)}")
+
+@router.get("/analytics/schema")
+async def analytics_schema(data_service: DataService = Depends(get_loaded_data_service)):
+    """
+    Tables and columns available to analytics queries
+    """
+    try:
+        engine = await run_in_threadpool(data_service.get_analytics_engine)
+    except PufUnavailableError as e:
+        raise _puf_unavailable(e)
+    return {"dataset_version": engine.dataset_version, "tables": engine.schema()}
+
+@router.post("/analytics/query", response_model=AnalyticsQueryResponse)
+async def analytics_query(request: AnalyticsQueryRequest, data_service: DataService = Depends(get_loaded_data_service)):
+    """
+    Run one read-only SQL statement (SQLite dialect, plus median and percentile aggregates) against the plan,
+    rate and benefits tables, e.g. SELECT issuer_id, median(monthly_premium) FROM plans WHERE state_code = 'FL'
+    AND metal_level = 'Silver' GROUP BY issuer_id. Statements are limited in run time and rows returned.
+    """
+    try:
+        return await run_in_threadpool(data_service.query_analytics, request.sql, request.params, request.max_rows)
+    except QueryTimeoutError as e:
+        raise HTTPException(status_code=408, detail=str(e))
+    except PufUnavailableError as e:
+        raise _puf_unavailable(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid query: {str(e)}")
+
+@router.post("/data/reload", response_model=ReloadReport, status_code=status.HTTP_200_OK)
+async def reload_data(reloader: DatasetReloader = Depends(get_dataset_reloader)):
+    """
+    Pick up changed PUF files, rebuilding only the affected data. The current dataset keeps serving until the swap.
+    """
+    try:
+        return await run_in_threadpool(reloader.reload)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {str(e)}")
+
 @router.get("/health", status_code=status.HTTP_200_OK)
-async def health_check():
+async def health_check(
+    data_service: DataService = Depends(get_data_service),
+    bundler: BenefitBundler = Depends(get_benefit_bundler),
+    flights: SingleFlight = Depends(get_optimize_flights),
+    executor: BoundedExecutor = Depends(get_optimize_executor)
+):
     """
-    Health check endpoint.
+    Health check endpoint. Includes dataset load state, solver, request-coalescing and optimization queue
+    counters; readiness for traffic is reported by /ready.
     """
-    return {"status": "ok"} 
\ No newline at end of file
+    return {
+        "status": "ok",
+        "dataset": {"state": data_service.load_progress.state, "version": data_service.dataset_version},
+        "solver": bundler.solver.summary(),
+        "optimize_coalescing": flights.stats(),
+        "optimize_queue": executor.stats()
+    } 
\ No newline at end of file
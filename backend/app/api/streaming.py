@@ -0,0 +1,34 @@
+from typing import Any, Dict, Iterable, Iterator, Optional
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Records serialized per chunk; bounds the memory held for a response regardless of its length
+STREAM_CHUNK_SIZE = 1000
+
+def wants_ndjson(request: Request) -> bool:
+    """
+    NDJSON is chosen with ?format=ndjson or an Accept header naming application/x-ndjson
+    """
+    return (request.query_params.get("format") == "ndjson"
+            or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""))
+
+def ndjson_chunks(records: Iterable[Any], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Serialize records lazily, one newline-terminated JSON document each, chunk_size records per yield
+    """
+    batch = []
+    for record in records:
+        batch.append(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+        if len(batch) >= chunk_size:
+            yield b"".join(batch)
+            batch = []
+    if batch:
+        yield b"".join(batch)
+
+def ndjson_response(records: Iterable[Any], headers: Optional[Dict[str, str]] = None,
+                    chunk_size: int = STREAM_CHUNK_SIZE) -> StreamingResponse:
+    # Starlette pulls the next chunk only after the previous one was sent, so a slow client throttles generation
+    return StreamingResponse(ndjson_chunks(records, chunk_size), media_type=NDJSON_MEDIA_TYPE, headers=headers)
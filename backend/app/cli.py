@@ -0,0 +1,241 @@
+"""
+Command-line tools
+
+Usage: python -m app.cli optimize-census census.csv --out results.csv [--workers 4] [--chunk-size 5000]
+       python -m app.cli ingest-pufs [--data-dir data] [--store data/columnar] [--plan-year 2025]
+       python -m app.cli puf-memory-report [--data-dir data] [--plan-year 2025]
+"""
+
+import argparse
+import csv
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional
+import pandas as pd
+from app.core.config import settings
+from app.models.domain import EmployeeProfile
+from app.optimization.bundler import BenefitBundler
+from app.services.data_service import DataService, PUF_FILE_PATTERNS
+from app.services.puf_schema import memory_report
+from app.services.puf_store import COLUMNAR_PUFS, PufStore
+from app.services.shared_dataset import SharedDatasetStore
+
+logger = logging.getLogger("ichra.cli")
+
+# Census columns read by optimize-census; employee_id, state_code, age and budget_cap are required
+# (monthly_allowance is accepted in place of budget_cap). dependent_ages is a ";"-separated list.
+CENSUS_COLUMNS = ("employee_id", "state_code", "age", "budget_cap", "monthly_allowance", "risk_score",
+                  "rating_area_id", "coverage_level", "spouse_age", "dependent_ages")
+
+RESULT_COLUMNS = ("employee_id", "state_code", "plan_id", "plan_marketing_name", "metal_level",
+                  "monthly_premium", "utility_score", "error")
+
+# Per-process dataset and optimizer; set once by _init_worker
+_worker: Dict[str, Any] = {}
+
+def _init_worker(data_directory: str, shared_directory: str, use_expected_cost: bool):
+    data_service = DataService()
+    SharedDatasetStore(shared_directory).load_or_attach(data_service, data_directory)
+    _worker.update(data_service=data_service, bundler=BenefitBundler(), use_expected_cost=use_expected_cost)
+
+def _optional(value: Any) -> Optional[Any]:
+    return None if value is None or (isinstance(value, float) and pd.isna(value)) or value == "" else value
+
+def _profile(row: Dict[str, Any], default_risk_score: float) -> EmployeeProfile:
+    budget = _optional(row.get("budget_cap"))
+    if budget is None:
+        budget = _optional(row.get("monthly_allowance"))
+    if budget is None:
+        raise ValueError("Missing budget_cap")
+    dependents = _optional(row.get("dependent_ages"))
+    spouse_age = _optional(row.get("spouse_age"))
+    rating_area = _optional(row.get("rating_area_id"))
+    risk_score = _optional(row.get("risk_score"))
+    return EmployeeProfile(
+        age=int(row["age"]),
+        risk_score=float(risk_score if risk_score is not None else default_risk_score),
+        budget_cap=float(budget),
+        coverage_level=_optional(row.get("coverage_level")) or "individual",
+        spouse_age=int(spouse_age) if spouse_age is not None else None,
+        dependent_ages=[int(age) for age in str(dependents).split(";") if age.strip()] if dependents is not None else [],
+        rating_area_id=str(rating_area) if rating_area is not None else None
+    )
+
+def optimize_rows(state_code: str, rows: List[Dict[str, Any]], default_risk_score: float) -> List[Dict[str, Any]]:
+    """
+    Best plan for each census row of one state. A row that cannot be optimized gets its error instead of a plan.
+    """
+    data_service: DataService = _worker["data_service"]
+    bundler: BenefitBundler = _worker["bundler"]
+    plans = data_service.get_plans_by_state(state_code)
+    family_premiums = data_service.get_family_premium_calculator()
+    cost_model = data_service.get_cost_model() if _worker["use_expected_cost"] else None
+    results = []
+    for row in rows:
+        result = {"employee_id": row["employee_id"], "state_code": state_code}
+        try:
+            if not plans:
+                raise ValueError(f"No plans found for state {state_code}")
+            selected = bundler.optimize(_profile(row, default_risk_score), plans, family_premiums, cost_model)
+            plan = selected.selected_plan
+            result.update(plan_id=plan.plan_id, plan_marketing_name=plan.plan_marketing_name,
+                          metal_level=plan.metal_level, monthly_premium=round(selected.total_cost, 2),
+                          utility_score=round(selected.utility_score, 6))
+        except Exception as e:
+            result["error"] = str(e)
+        results.append(result)
+    return results
+
+def _census_chunks(path: str, chunk_size: int) -> Iterable[pd.DataFrame]:
+    header = pd.read_csv(path, nrows=0).columns
+    missing = {"employee_id", "state_code", "age"} - set(header)
+    if missing or not {"budget_cap", "monthly_allowance"} & set(header):
+        raise ValueError(f"Census is missing required columns: {sorted(missing) or ['budget_cap']}")
+    usecols = [column for column in CENSUS_COLUMNS if column in header]
+    dtypes = {"employee_id": str, "state_code": str, "rating_area_id": str, "coverage_level": str, "dependent_ages": str}
+    return pd.read_csv(path, usecols=usecols, chunksize=chunk_size,
+                       dtype={column: dtype for column, dtype in dtypes.items() if column in usecols})
+
+def optimize_census(census_path: str, out_path: str, workers: int = 1, chunk_size: int = 5000,
+                    data_directory: Optional[str] = None, default_risk_score: float = 0.5,
+                    use_expected_cost: bool = False, report_every: float = 5.0) -> Dict[str, Any]:
+    """
+    Stream a census through the plan optimizer and write one result row per employee. The census is read in
+    chunks and each chunk is split by state; with workers > 1 the state groups run in worker processes that
+    attach to one shared dataset snapshot. At most two groups per worker are in flight, so memory stays flat
+    however long the census is. Results are written chunk by chunk, grouped by state within a chunk.
+    """
+    data_directory = data_directory or settings.DATA_DIRECTORY
+    with tempfile.TemporaryDirectory(prefix="ichra-dataset-") as scratch:
+        shared_directory = settings.SHARED_DATASET_DIRECTORY or scratch
+        start = time.perf_counter()
+        _init_worker(data_directory, shared_directory, use_expected_cost)
+        if not _worker["data_service"].cms_loaded:
+            raise RuntimeError(f"No CMS data could be loaded from {data_directory}")
+        logger.info(f"Dataset ready in {time.perf_counter() - start:.1f}s")
+
+        pool = (ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(data_directory, shared_directory, use_expected_cost))
+                if workers > 1 else None)
+        pending: Deque[Future] = deque()
+        totals = {"rows": 0, "errors": 0}
+        start = last_report = time.perf_counter()
+        try:
+            with open(out_path, "w", newline="") as out:
+                writer = csv.DictWriter(out, fieldnames=RESULT_COLUMNS)
+                writer.writeheader()
+
+                def write(results: List[Dict[str, Any]]):
+                    nonlocal last_report
+                    writer.writerows(results)
+                    totals["rows"] += len(results)
+                    totals["errors"] += sum(1 for result in results if result.get("error"))
+                    now = time.perf_counter()
+                    if now - last_report >= report_every:
+                        last_report = now
+                        logger.info(f"{totals['rows']} employees, {totals['rows'] / (now - start):.1f}/s, "
+                                    f"{totals['errors']} errors")
+
+                for chunk in _census_chunks(census_path, chunk_size):
+                    states = chunk["state_code"].astype(str).str.upper().str.strip()
+                    for state, group in chunk.groupby(states, sort=False):
+                        rows = group.to_dict("records")
+                        if pool is None:
+                            write(optimize_rows(state, rows, default_risk_score))
+                            continue
+                        pending.append(pool.submit(optimize_rows, state, rows, default_risk_score))
+                        while len(pending) >= 2 * workers:
+                            write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        elapsed = time.perf_counter() - start
+        summary = {**totals, "seconds": round(elapsed, 3), "rows_per_second": round(totals["rows"] / elapsed, 1) if elapsed else None}
+        logger.info(f"Optimized {summary['rows']} employees in {summary['seconds']}s "
+                    f"({summary['rows_per_second']}/s, {summary['errors']} errors) -> {out_path}")
+        return summary
+
+def ingest_pufs(data_directory: str, store_directory: str, plan_year: str = "2025",
+                kinds: Iterable[str] = COLUMNAR_PUFS) -> Dict[str, int]:
+    """
+    Convert the plan year's PUF CSVs into the partitioned columnar store. Returns rows written per kind.
+    """
+    data_service = DataService()
+    store = PufStore(store_directory)
+    paths = data_service._puf_paths(Path(data_directory), plan_year)
+    written = {}
+    for kind in kinds:
+        path = paths[kind]
+        if not path.exists():
+            logger.warning(f"Skipping {kind}: {path} not found")
+            continue
+        start = time.perf_counter()
+        written[kind] = store.ingest(kind, path, plan_year, source_sha256=data_service._fingerprint_file(path).sha256)
+        logger.info(f"{kind}: {written[kind]} rows in {time.perf_counter() - start:.1f}s")
+    for entry in store.describe():
+        logger.info(f"{entry['kind']}: {entry['states']} states, {entry['files']} files, {entry['bytes'] / 1e6:.1f} MB")
+    return written
+
+def print_memory_report(data_directory: str, plan_year: str = "2025", nrows: Optional[int] = None):
+    """
+    Per-column memory and parse time of each PUF read with inferred types versus the typed schema
+    """
+    for kind, path in DataService()._puf_paths(Path(data_directory), plan_year).items():
+        if not path.exists():
+            continue
+        report = memory_report(path, kind, nrows)
+        print(f"\n{kind}: {report['rows']} rows, {report['inferred_bytes'] / 1e6:.1f} MB -> "
+              f"{report['typed_bytes'] / 1e6:.1f} MB, parse {report['inferred_seconds']:.2f}s -> "
+              f"{report['typed_seconds']:.2f}s")
+        print(report['columns'].to_string())
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="ICHRA Benefit Bundler command-line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    census = commands.add_parser("optimize-census", help="Select the best plan for every employee of a census CSV")
+    census.add_argument("census", help="Census CSV (employee_id, state_code, age, budget_cap, ...)")
+    census.add_argument("--out", required=True, help="Results CSV to write")
+    census.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 runs in-process)")
+    census.add_argument("--chunk-size", type=int, default=5000, help="Census rows read per chunk")
+    census.add_argument("--data-dir", default=None, help="CMS data directory (defaults to DATA_DIRECTORY)")
+    census.add_argument("--risk-score", type=float, default=0.5, help="Risk score for rows without one")
+    census.add_argument("--expected-cost", action="store_true", help="Score plans by simulated expected annual cost")
+    ingest = commands.add_parser("ingest-pufs", help="Convert PUF CSVs to partitioned Parquet (needs pyarrow)")
+    ingest.add_argument("--data-dir", default=None, help="CMS data directory (defaults to DATA_DIRECTORY)")
+    ingest.add_argument("--store", default=None, help="Columnar store directory (defaults to PUF_STORE_DIRECTORY)")
+    ingest.add_argument("--plan-year", default="2025")
+    ingest.add_argument("--kinds", nargs="+", default=list(COLUMNAR_PUFS), choices=list(PUF_FILE_PATTERNS))
+    report = commands.add_parser("puf-memory-report", help="Compare PUF memory with inferred and schema types")
+    report.add_argument("--data-dir", default=None, help="CMS data directory (defaults to DATA_DIRECTORY)")
+    report.add_argument("--plan-year", default="2025")
+    report.add_argument("--rows", type=int, default=None, help="Read only the first N rows of each PUF")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", stream=sys.stderr)
+    try:
+        if args.command == "ingest-pufs":
+            store = args.store or settings.PUF_STORE_DIRECTORY
+            if not store:
+                raise ValueError("Pass --store or set PUF_STORE_DIRECTORY")
+            ingest_pufs(args.data_dir or settings.DATA_DIRECTORY, store, args.plan_year, args.kinds)
+        elif args.command == "puf-memory-report":
+            print_memory_report(args.data_dir or settings.DATA_DIRECTORY, args.plan_year, args.rows)
+        else:
+            optimize_census(args.census, args.out, workers=max(1, args.workers), chunk_size=args.chunk_size,
+                            data_directory=args.data_dir, default_risk_score=args.risk_score,
+                            use_expected_cost=args.expected_cost)
+    except (OSError, ValueError, RuntimeError) as e:
+        logger.error(str(e))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,9 +10,42 @@ class Settings(BaseSettings):
     # Database Configuration
     DATABASE_URL: Optional[str] = None
     
+    # CMS Data Configuration
+    DATA_DIRECTORY: str = "data"
+    DATA_RELOAD_INTERVAL_SECONDS: int = 0  # 0 disables polling for changed PUF files
+    # Directory for memory-mapped dataset snapshots shared by the uvicorn workers of one host; unset loads per worker
+    SHARED_DATASET_DIRECTORY: Optional[str] = None
+    # Parquet copies of the Rate and Benefits PUFs (python -m app.cli ingest-pufs); needs pyarrow
+    PUF_STORE_DIRECTORY: Optional[str] = None
+    # Read-only SQL over the plan, rate and benefits tables (POST /api/analytics/query)
+    ANALYTICS_QUERY_TIMEOUT_SECONDS: float = 5.0  # 0 disables the limit
+    ANALYTICS_MAX_ROWS: int = 10000
+    
+    # ICHRA rules (2025 required contribution percentage for the affordability test)
+    ICHRA_AFFORDABILITY_PERCENTAGE: float = 0.0902
+    
+    # MIP solver for bundle and plan optimization: "auto" (HiGHS when highspy is installed), "highs" or "cbc"
+    SOLVER_BACKEND: str = "auto"
+    SOLVER_TIME_LIMIT_SECONDS: float = 10.0  # 0 disables the limit
+    SOLVER_MIP_GAP: Optional[float] = None  # relative gap; None keeps the solver default
+    SOLVER_THREADS: int = 0  # 0 keeps the solver default
+    
+    # Seconds an /api/optimize caller waits for its (possibly shared) result; 0 waits indefinitely
+    OPTIMIZE_TIMEOUT_SECONDS: float = 30.0
+    # Optimizations run at once on worker threads, and how many more may wait before requests get 503
+    OPTIMIZE_WORKERS: int = 4
+    OPTIMIZE_QUEUE_SIZE: int = 32
+    OPTIMIZE_RETRY_AFTER_SECONDS: float = 1.0  # minimum Retry-After sent with a 503
+    
     # Redis Configuration
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Saved bundles: "redis" (REDIS_URL), "sqlite" (embedded file, writes batched in the background) or "memory"
+    BUNDLE_STORE_BACKEND: str = "redis"
+    BUNDLE_STORE_SQLITE_PATH: str = "data/bundles.sqlite3"
+    BUNDLE_STORE_FLUSH_INTERVAL_SECONDS: float = 0.5  # 0 writes through
+    BUNDLE_STORE_BATCH_SIZE: int = 256  # pending writes that trigger an early flush
+    
     # Security
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
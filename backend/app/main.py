@@ -1,4 +1,5 @@
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
@@ -9,6 +10,13 @@ from app.core.config import settings
 from app.services.data_service import DataService
 from app.optimization.bundler import BenefitBundler
 from app.services.bundle_service import BundleService
+from app.services.reload_service import DatasetReloader
+from app.services.load_progress import BackgroundLoader
+from app.services.shared_dataset import SharedDatasetStore
+from app.services.response_cache import ResponseCache
+from app.services.single_flight import SingleFlight
+from app.services.work_queue import BoundedExecutor
+from typing import Optional
 import logging
 import time
 
@@ -48,19 +56,42 @@ app.add_middleware(LoggingMiddleware)
 data_service = DataService()
 optimizer = BenefitBundler()
 bundle_service = BundleService(data_service, optimizer)
+# With several uvicorn workers, the first one loads the PUFs and the rest attach to its shared snapshot
+shared_store = SharedDatasetStore(settings.SHARED_DATASET_DIRECTORY) if settings.SHARED_DATASET_DIRECTORY else None
+dataset_reloader = DatasetReloader(data_service, shared_store)
+dataset_loader = BackgroundLoader(data_service, shared_store)
+app.state.data_service = data_service
+app.state.benefit_bundler = optimizer
+app.state.dataset_reloader = dataset_reloader
+app.state.plan_response_cache = ResponseCache()
+app.state.optimize_flights = SingleFlight(timeout=settings.OPTIMIZE_TIMEOUT_SECONDS or None)
+app.state.optimize_executor = BoundedExecutor(
+    max_workers=settings.OPTIMIZE_WORKERS,
+    max_queue=settings.OPTIMIZE_QUEUE_SIZE,
+    retry_after_seconds=settings.OPTIMIZE_RETRY_AFTER_SECONDS
+)
+
+def start_reload_polling():
+    if settings.DATA_RELOAD_INTERVAL_SECONDS > 0:
+        dataset_reloader.start_polling(settings.DATA_RELOAD_INTERVAL_SECONDS)
 
-# Startup event to load CMS data
+# Startup event to load CMS data in the background; the server accepts connections while it runs
 @app.on_event("startup")
 def load_cms_data():
-    logger.info("Loading CMS data on startup...")
-    data_service.load_cms_data("data")
-    logger.info("CMS data loaded.")
+    logger.info("Loading CMS data in the background...")
+    dataset_loader.start(settings.DATA_DIRECTORY, on_ready=start_reload_polling)
+
+@app.on_event("shutdown")
+def stop_dataset_reloader():
+    dataset_reloader.stop_polling()
+    app.state.optimize_executor.shutdown(wait=False)
+    data_service.bundle_store.close()
 
 # Exception handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     logger.error(f"HTTPException: {exc.detail}")
-    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers)
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -83,10 +114,27 @@ app.include_router(bundle.router, prefix="/api", tags=["bundles"])
 async def root():
     return {"message": "ICHRA Benefit Bundler API"}
 
+# Liveness: answers as soon as the process serves requests, without touching the dataset
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+# Readiness: 200 once the dataset is loaded and indexed (and, with ?state=, has plans for that state).
+# The index lookup runs on the threadpool rather than the optimization queue, so probes are never shed.
+@app.get("/ready")
+async def readiness_check(state: Optional[str] = Query(None, min_length=2, max_length=2)):
+    progress = data_service.load_progress.snapshot()
+    ready = progress["state"] == "ready"
+    body = {"ready": ready, "dataset_version": data_service.dataset_version, **progress}
+    if state is not None:
+        state = state.upper()
+        body["state_code"] = state
+        if ready:
+            index = await run_in_threadpool(data_service.get_plan_index, data_service.data_directory)
+            ready = len(index.plans(state)) > 0
+        body["ready"] = ready
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -177,6 +177,8 @@ class BundleResponse(BaseModel):
     message: str
     errors: Optional[List[str]] = None
 
+NETWORK_TIERS = ('bronze', 'silver', 'gold', 'platinum')
+
 class PlanFeature(BaseModel):
     plan_id: str
     monthly_premium: float
@@ -184,7 +186,7 @@ class PlanFeature(BaseModel):
     out_of_pocket_max: float
     hsa_eligible: bool
     actuarial_value: float = Field(ge=0, le=1)
-    network_tier: str = Field(pattern="^(bronze|silver|gold|platinum)$")
+    network_tier: str = Field(pattern=f"^({'|'.join(NETWORK_TIERS)})$")
     # Additional CMS-specific fields
     state_code: str
     issuer_id: str
@@ -200,6 +202,10 @@ class EmployeeProfile(BaseModel):
     age: int
     risk_score: float = Field(ge=0, le=1)
     budget_cap: float
+    coverage_level: CoverageLevel = CoverageLevel.INDIVIDUAL
+    spouse_age: Optional[int] = Field(default=None, ge=0)
+    dependent_ages: List[int] = []
+    rating_area_id: Optional[str] = None
     preference_weights: Dict[str, float] = Field(default_factory=lambda: {
         "cost": 0.4,
         "coverage": 0.3,
@@ -211,4 +217,46 @@ class BundleResult(BaseModel):
     selected_plan: PlanFeature
     utility_score: float
     total_cost: float
-    optimization_time_ms: float 
\ No newline at end of file
+    optimization_time_ms: float
+
+class PufFingerprint(BaseModel):
+    path: str
+    size: int
+    mtime: float
+    sha256: str
+
+class ReloadReport(BaseModel):
+    dataset_version: Optional[str] = None
+    previous_version: Optional[str] = None
+    full_rebuild: bool = False
+    changed_files: List[str] = []
+    rebuilt: Dict[str, List[str]] = {}
+    rebuilt_plan_count: int = 0
+    total_plan_count: int = 0
+    # Shared snapshot attached to or exported by this reload, when workers share the dataset
+    shared_snapshot: Optional[str] = None
+    duration_ms: float
+
+class AllowanceClass(BaseModel):
+    name: str
+    # Share of the benchmark premium the employer funds, e.g. 0.8 = 80%
+    benchmark_share: float = Field(default=1.0, ge=0)
+    min_allowance: Optional[float] = Field(default=None, ge=0)
+    max_allowance: Optional[float] = Field(default=None, ge=0)
+
+class CensusEmployee(BaseModel):
+    employee_id: str
+    state_code: str
+    rating_area_id: str
+    age: int = Field(ge=0)
+    monthly_allowance: float = Field(default=0.0, ge=0)
+    household_income: float = Field(ge=0)
+    class_name: Optional[str] = None
+
+class EmployeeAffordability(BaseModel):
+    employee_id: str
+    lcsp_premium: Optional[float] = None
+    required_contribution: Optional[float] = None
+    affordability_limit: float
+    affordable: Optional[bool] = None
+    shortfall: Optional[float] = None
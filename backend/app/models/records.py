@@ -0,0 +1,104 @@
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+import numpy as np
+import orjson
+from app.models.domain import PlanFeature
+
+@dataclass(slots=True)
+class PlanRecord:
+    """
+    Compact in-memory plan row used by the data layer and the optimizers. Field names and order mirror
+    PlanFeature; values are validated once at ingest, so records are built and read without Pydantic.
+    """
+    plan_id: str
+    monthly_premium: float
+    deductible: float
+    out_of_pocket_max: float
+    hsa_eligible: bool
+    actuarial_value: float
+    network_tier: str
+    state_code: str
+    issuer_id: str
+    plan_marketing_name: str
+    metal_level: str
+    plan_type: str
+    market_coverage: str
+    dental_only_plan: bool = False
+    service_area_id: Optional[str] = None
+    network_id: Optional[str] = None
+
+    @classmethod
+    def from_feature(cls, plan: PlanFeature) -> "PlanRecord":
+        return cls(*(getattr(plan, name) for name in PLAN_RECORD_FIELDS))
+
+    def to_feature(self) -> PlanFeature:
+        """
+        PlanFeature for API models that embed a plan; skips re-validation
+        """
+        return PlanFeature.model_construct(**self.to_dict())
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in PLAN_RECORD_FIELDS}
+
+PLAN_RECORD_FIELDS = tuple(field.name for field in fields(PlanRecord))
+
+# Records built per batch while iterating a PlanTable
+_TABLE_BATCH_SIZE = 4096
+
+class PlanTable(Sequence):
+    """
+    Plans held column by column, one array per PlanRecord field (memory-mapped from a shared snapshot, for
+    instance). Records are built when read and not kept, so the arrays stay the only copy of the plans.
+    Optional fields carry a presence mask; rows where it is False read as None.
+    """
+    __slots__ = ("columns", "present")
+
+    def __init__(self, columns: Dict[str, np.ndarray], present: Optional[Dict[str, np.ndarray]] = None):
+        self.columns = columns
+        self.present = present or {}
+
+    def __len__(self) -> int:
+        return len(self.columns[PLAN_RECORD_FIELDS[0]])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("plan index out of range")
+        return self.take([index])[0]
+
+    def __iter__(self) -> Iterator[PlanRecord]:
+        for start in range(0, len(self), _TABLE_BATCH_SIZE):
+            yield from self.take(range(start, min(start + _TABLE_BATCH_SIZE, len(self))))
+
+    def take(self, positions: Iterable[int]) -> List[PlanRecord]:
+        """
+        Records at the given row positions, in order
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        columns = []
+        for name in PLAN_RECORD_FIELDS:
+            values = self.columns[name][positions].tolist()
+            present = self.present.get(name)
+            if present is not None:
+                values = [value if has else None for value, has in zip(values, present[positions].tolist())]
+            columns.append(values)
+        return [PlanRecord(*row) for row in zip(*columns)]
+
+def take_plans(plans: Sequence[PlanRecord], positions: Iterable[int]) -> List[PlanRecord]:
+    return plans.take(positions) if isinstance(plans, PlanTable) else [plans[i] for i in positions]
+
+def plan_column(plans: Sequence[PlanRecord], name: str) -> Sequence:
+    """
+    Values of one PlanRecord field for every plan; a PlanTable returns its array without building records
+    (optional fields then read "" where absent)
+    """
+    return plans.columns[name] if isinstance(plans, PlanTable) else [getattr(plan, name) for plan in plans]
+
+def dumps_plans(plans: Iterable[PlanRecord]) -> bytes:
+    """
+    Serialize plan records straight to JSON bytes (orjson handles slotted dataclasses natively)
+    """
+    return orjson.dumps(list(plans))
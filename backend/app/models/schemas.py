@@ -3,7 +3,8 @@ from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from .domain import (
     BenefitType, CoverageLevel, BundleStatus, Benefit, Bundle, BundleRequest, BundleResponse,
-    MetalLevel, MarketCoverage, CMSPlanAttributes, CMSServiceArea, CMSRate, CMSBenefits, PlanFeature, EmployeeProfile
+    MetalLevel, MarketCoverage, CMSPlanAttributes, CMSServiceArea, CMSRate, CMSBenefits, PlanFeature, EmployeeProfile,
+    ReloadReport, AllowanceClass, CensusEmployee, EmployeeAffordability
 )
 
 # Re-export domain models as schemas for API use
@@ -21,7 +22,11 @@ __all__ = [
     "CMSServiceArea", 
     "CMSRate",
     "CMSBenefits",
-    "PlanFeature"
+    "PlanFeature",
+    "ReloadReport",
+    "AllowanceClass",
+    "CensusEmployee",
+    "EmployeeAffordability"
 ]
 
 # Additional API-specific schemas
@@ -37,6 +42,7 @@ class BundleSearchRequest(BaseModel):
     coverage_level: Optional[CoverageLevel] = None
     providers: Optional[List[str]] = None
     network_type: Optional[str] = None
+    status: Optional[BundleStatus] = None
 
 class BundleComparisonRequest(BaseModel):
     bundle_ids: List[str] = Field(..., min_items=2, max_items=5)
@@ -59,10 +65,14 @@ class PlanSearchRequest(BaseModel):
     network_tier: Optional[str] = None
 
 class PlanListResponse(BaseModel):
-    plans: List[PlanFeature]
+    # Full PlanFeature objects, or only the requested fields when a projection is given
+    plans: List[Dict[str, Any]]
     total_count: int
     limit: int
     offset: int
+    sort_by: str
+    descending: bool
+    next_cursor: Optional[str] = None
     filters_applied: Dict[str, Any]
 
 class PlanComparisonRequest(BaseModel):
@@ -87,4 +97,95 @@ class OptimizationRequest(BaseModel):
     max_deductible: Optional[float] = None
     hsa_eligible_only: Optional[bool] = None
     required_benefits: Optional[List[str]] = None
-    tobacco_preference: Optional[str] = None 
\ No newline at end of file
+    tobacco_preference: Optional[str] = None
+    coverage_level: CoverageLevel = CoverageLevel.INDIVIDUAL
+    spouse_age: Optional[int] = Field(default=None, ge=0)
+    dependent_ages: List[int] = []
+    rating_area_id: Optional[str] = None
+    # Score plans by expected total annual cost: premium plus simulated out-of-pocket spending
+    use_expected_cost: bool = False
+
+class AllowanceTableRequest(BaseModel):
+    state_code: str
+    classes: List[AllowanceClass] = Field(..., min_items=1)
+    benchmark: str = Field(default="lowest", pattern="^(lowest|second_lowest|percentile)$")
+    metal_level: Optional[str] = "Silver"
+    percentile: float = Field(default=50.0, ge=0, le=100)
+    tobacco: bool = False
+    min_age: int = Field(default=21, ge=0, le=64)
+    max_age: int = Field(default=64, ge=0, le=64)
+
+class RatingAreaAllowances(BaseModel):
+    class_name: str
+    state_code: str
+    rating_area_id: str
+    benchmark_premiums: List[Optional[float]]
+    allowances: List[Optional[float]]
+
+class AllowanceTableResponse(BaseModel):
+    state_code: str
+    benchmark: str
+    ages: List[int]
+    tables: List[RatingAreaAllowances]
+
+class AffordabilityRequest(BaseModel):
+    employees: List[CensusEmployee] = Field(..., min_items=1)
+    affordability_percentage: Optional[float] = Field(default=None, gt=0, lt=1)
+
+class AffordabilityResponse(BaseModel):
+    results: List[EmployeeAffordability]
+    affordable_count: int
+    unaffordable_count: int
+    unmatched_count: int
+    affordability_percentage: float
+
+class PlanMenuRequest(BaseModel):
+    state_code: str
+    menu_size: int = Field(..., ge=1, le=100)
+    employees: List[EmployeeProfile] = Field(..., min_items=1)
+    method: str = Field(default="greedy", pattern="^(greedy|exact)$")
+
+class PlanMenuResponse(BaseModel):
+    plans: List[PlanFeature]
+    enrolled_counts: List[int]
+    total_utility: float
+    upper_bound: float
+    covered_employees: int
+    method: str
+    optimization_time_ms: float
+
+class MinimumAllowanceRequest(BaseModel):
+    employees: List[CensusEmployee] = Field(..., min_items=1)
+    target_coverage: float = Field(..., gt=0, le=1)
+    min_metal_level: MetalLevel = MetalLevel.BRONZE
+    min_choices: int = Field(default=1, ge=1, le=20)
+    annual_budget: Optional[float] = Field(default=None, gt=0)
+    affordability_percentage: Optional[float] = Field(default=None, gt=0, lt=1)
+
+class ClassMinimumAllowance(BaseModel):
+    class_name: str
+    employee_count: int
+    monthly_allowance: Optional[float] = None
+    coverage: float
+    max_coverage: float
+    budget_monthly_allowance: Optional[float] = None
+
+class MinimumAllowanceResponse(BaseModel):
+    classes: List[ClassMinimumAllowance]
+    target_coverage: float
+    annual_cost: Optional[float] = None
+    budget_coverage: Optional[float] = None
+
+class AnalyticsQueryRequest(BaseModel):
+    # One read-only SQLite statement over the plans, rates and benefits tables; use ? placeholders for params
+    sql: str = Field(..., min_length=1, max_length=20000)
+    params: List[Any] = []
+    max_rows: Optional[int] = Field(default=None, ge=1)
+
+class AnalyticsQueryResponse(BaseModel):
+    columns: List[str]
+    rows: List[List[Any]]
+    row_count: int
+    truncated: bool
+    elapsed_ms: float
+    dataset_version: Optional[str] = None
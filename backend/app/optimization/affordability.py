@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+from app.core.config import settings
+from app.optimization.rate_curves import MAX_AGE, RateCurves, normalize_rating_area
+
+class AffordabilityEngine:
+    """
+    ICHRA affordability for a whole census. The lowest-cost silver premium per (rating area, age) is
+    precomputed once; a census is then evaluated with array lookups instead of a plan scan per employee.
+    """
+    def __init__(self, curves: RateCurves, affordability_percentage: Optional[float] = None):
+        self.affordability_percentage = (
+            affordability_percentage if affordability_percentage is not None
+            else settings.ICHRA_AFFORDABILITY_PERCENTAGE
+        )
+        area_states, area_ids, self.lowest_silver = curves.benchmark("Silver", "lowest")
+        self._areas = pd.Index([f"{state}|{area}" for state, area in zip(area_states, area_ids)])
+
+    def lowest_cost_silver(self, state_codes: pd.Series, rating_area_ids: pd.Series, ages: pd.Series) -> np.ndarray:
+        """
+        Self-only lowest-cost silver premium for each employee; NaN where the area has no silver plan
+        """
+        keys = state_codes.astype(str).str.upper().str.strip() + "|" + normalize_rating_area(rating_area_ids)
+        area_index = self._areas.get_indexer(keys)
+        age_index = np.clip(pd.to_numeric(ages, errors='coerce').fillna(-1).to_numpy(dtype=int), -1, MAX_AGE)
+        found = (area_index >= 0) & (age_index >= 0)
+        premiums = np.full(len(keys), np.nan)
+        premiums[found] = self.lowest_silver[area_index[found], age_index[found]]
+        return premiums
+
+    def evaluate(self, census: pd.DataFrame, affordability_percentage: Optional[float] = None) -> pd.DataFrame:
+        """
+        Evaluate every employee in one vectorized pass. The census needs state_code, rating_area_id, age,
+        monthly_allowance and household_income (annual) columns. Adds lcsp_premium, required_contribution,
+        affordability_limit, affordable (None when no lowest-cost silver plan was found) and shortfall,
+        the monthly allowance increase needed to make the offer affordable.
+        """
+        percentage = affordability_percentage if affordability_percentage is not None else self.affordability_percentage
+        lcsp = self.lowest_cost_silver(census['state_code'], census['rating_area_id'], census['age'])
+        allowance = pd.to_numeric(census['monthly_allowance'], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+        income = pd.to_numeric(census['household_income'], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+
+        required = np.maximum(lcsp - allowance, 0.0)
+        limit = income * percentage / 12.0
+        shortfall = np.maximum(required - limit, 0.0)
+        known = ~np.isnan(lcsp)
+
+        result = census.copy()
+        result['lcsp_premium'] = lcsp
+        result['required_contribution'] = required
+        result['affordability_limit'] = limit
+        result['affordable'] = pd.Series(np.where(known, shortfall <= 0, None), index=census.index, dtype=object)
+        result['shortfall'] = shortfall
+        return result
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+from app.models.domain import AllowanceClass
+from app.optimization.rate_curves import RateCurves
+
+# ICHRA age-varying allowances: the oldest participant's allowance may not exceed 3x the youngest's
+AGE_RATIO_LIMIT = 3.0
+
+class AllowanceTable:
+    """
+    Monthly allowances per class, rating area and age. allowances has shape [classes, areas, ages].
+    """
+    def __init__(self, class_names: List[str], area_states: np.ndarray, area_ids: np.ndarray, ages: np.ndarray,
+                 benchmark_premiums: np.ndarray, allowances: np.ndarray):
+        self.class_names = class_names
+        self.area_states = area_states
+        self.area_ids = area_ids
+        self.ages = ages
+        self.benchmark_premiums = benchmark_premiums
+        self.allowances = allowances
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Long format: one row per (class, rating area, age)
+        """
+        n_classes, n_areas, n_ages = self.allowances.shape
+        return pd.DataFrame({
+            'class_name': np.repeat(np.asarray(self.class_names, dtype=object), n_areas * n_ages),
+            'state_code': np.tile(np.repeat(self.area_states, n_ages), n_classes),
+            'rating_area_id': np.tile(np.repeat(self.area_ids, n_ages), n_classes),
+            'age': np.tile(self.ages, n_classes * n_areas),
+            'benchmark_premium': np.tile(self.benchmark_premiums.ravel(), n_classes),
+            'monthly_allowance': self.allowances.ravel()
+        })
+
+class AllowanceTableGenerator:
+    """
+    Builds ICHRA allowance tables from Rate PUF age curves, vectorized over classes, rating areas and ages
+    """
+    def __init__(self, curves: RateCurves):
+        self.curves = curves
+
+    def generate(self, classes: List[AllowanceClass], metal_level: Optional[str] = "Silver", benchmark: str = "lowest",
+                 percentile: float = 50.0, min_age: int = 21, max_age: int = 64) -> AllowanceTable:
+        """
+        Allowance = benchmark premium x class share, clipped to the class floor/cap and to the 3:1 age ratio
+        relative to the youngest age in the table.
+        """
+        if not classes:
+            raise ValueError("At least one allowance class is required.")
+        if not 0 <= min_age <= max_age <= 64:
+            raise ValueError("Ages must satisfy 0 <= min_age <= max_age <= 64.")
+
+        area_states, area_ids, table = self.curves.benchmark(metal_level, benchmark, percentile)
+        ages = np.arange(min_age, max_age + 1)
+        benchmark_premiums = table[:, ages]
+
+        shares = np.array([c.benchmark_share for c in classes])[:, None, None]
+        floors = np.array([c.min_allowance if c.min_allowance is not None else 0.0 for c in classes])[:, None, None]
+        caps = np.array([c.max_allowance if c.max_allowance is not None else np.inf for c in classes])[:, None, None]
+
+        allowances = np.clip(shares * benchmark_premiums[None, :, :], floors, caps)
+        age_ratio_cap = AGE_RATIO_LIMIT * allowances[:, :, :1]
+        allowances = np.where(np.isnan(age_ratio_cap), allowances, np.minimum(allowances, age_ratio_cap))
+        return AllowanceTable([c.name for c in classes], area_states, area_ids, ages, benchmark_premiums, allowances)
@@ -1,179 +1,281 @@
+import hashlib
+import logging
+import threading
 import pulp
+import numpy as np
 import pandas as pd
 import time
-from typing import List, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
 from app.models.domain import Benefit, BundleRequest, EmployeeProfile, PlanFeature, BundleResult
+from app.models.records import PlanRecord
+from app.optimization.cost_model import ExpectedCostModel
+from app.optimization.family_premium import FamilyPremiumCalculator, charged_ages, is_individual
+from app.optimization.solvers import SolveStats, SolverBackend, get_solver_backend
 
-class BundleOptimizer:
-    def __init__(self):
-        self.problem = None
-    
-    def optimize_bundle(self, available_benefits: List[Benefit], bundle_request: BundleRequest) -> List[Benefit]:
-        """
-        Optimize bundle selection using linear programming
-        """
-        if not available_benefits:
-            return []
-        
-        # Create optimization problem
-        self.problem = pulp.LpProblem("ICHRA_Bundle_Optimization", pulp.LpMinimize)
-        
-        # Create decision variables (binary: 1 if benefit is selected, 0 otherwise)
-        benefit_vars = {}
-        for benefit in available_benefits:
-            benefit_vars[benefit.id] = pulp.LpVariable(
-                f"benefit_{benefit.id}",
-                cat=pulp.LpBinary
-            )
-        
-        # Objective function: minimize total monthly premium
-        self.problem += pulp.lpSum([
-            benefit.monthly_premium * benefit_vars[benefit.id]
-            for benefit in available_benefits
-        ])
-        
-        # Constraints
-        self._add_budget_constraint(benefit_vars, available_benefits, bundle_request)
-        self._add_benefit_type_constraints(benefit_vars, available_benefits, bundle_request)
-        self._add_deductible_constraints(benefit_vars, available_benefits, bundle_request)
-        self._add_provider_preferences(benefit_vars, available_benefits, bundle_request)
-        
-        # Solve the problem
-        self.problem.solve()
-        
-        # Extract solution
-        selected_benefits = []
-        for benefit in available_benefits:
-            if benefit_vars[benefit.id].value() == 1:
-                selected_benefits.append(benefit)
-        
-        return selected_benefits
-    
-    def _add_budget_constraint(self, benefit_vars, available_benefits: List[Benefit], bundle_request: BundleRequest):
+logger = logging.getLogger("ichra.optimization")
+
+def catalog_version(benefits: List[Benefit]) -> str:
+    """
+    Fingerprint of the benefit fields that shape the bundle model
+    """
+    digest = hashlib.sha256()
+    for benefit in benefits:
+        digest.update(f"{benefit.id}|{getattr(benefit.type, 'value', benefit.type)}|{benefit.provider}|"
+                      f"{benefit.monthly_premium}|{benefit.annual_deductible}|{benefit.max_out_of_pocket}\n".encode())
+    return digest.hexdigest()[:16]
+
+@dataclass(frozen=True)
+class BundleSolution:
+    selected: List[Benefit]
+    status: str
+    objective_value: Optional[float]
+    warm_started: bool
+    stats: Optional[SolveStats] = None
+
+class BundleModelTemplate:
+    """
+    Bundle model compiled once per benefit catalog. Coefficients, benefit-type groups and providers are kept
+    as arrays; a request only supplies right-hand sides (budget, deductible and out-of-pocket caps) and the
+    preferred-provider split. Every solve builds its own problem and variables, so one template can serve
+    concurrent requests. The last optimal selection is kept as the warm start for the next solve.
+    """
+    def __init__(self, benefits: List[Benefit]):
+        self.benefits = tuple(benefits)
+        self.version = catalog_version(benefits)
+        self.premiums = np.array([b.monthly_premium for b in benefits], dtype=float)
+        self.deductibles = np.array([b.annual_deductible for b in benefits], dtype=float)
+        self.out_of_pocket = np.array([b.max_out_of_pocket for b in benefits], dtype=float)
+        self.providers = np.array([b.provider for b in benefits], dtype=object)
+        types = pd.Series([getattr(b.type, 'value', b.type) for b in benefits], dtype=object)
+        self.type_members = {benefit_type: np.asarray(rows) for benefit_type, rows in types.groupby(types).indices.items()}
+        self._incumbent: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def constraint_rows(self, bundle_request: BundleRequest) -> List[Tuple[np.ndarray, int, float]]:
         """
-        Add budget constraint if specified
+        (coefficients, sense, rhs) for each constraint the request activates
         """
+        rows = []
         if bundle_request.budget_constraint:
-            self.problem += pulp.lpSum([
-                benefit.monthly_premium * benefit_vars[benefit.id]
-                for benefit in available_benefits
-            ]) <= bundle_request.budget_constraint
-    
-    def _add_benefit_type_constraints(self, benefit_vars, available_benefits: List[Benefit], bundle_request: BundleRequest):
-        """
-        Ensure at least one benefit of each requested type is selected
-        """
+            rows.append((self.premiums, pulp.LpConstraintLE, bundle_request.budget_constraint))
+        # At least one benefit of each requested type
         for benefit_type in bundle_request.benefit_types:
-            type_benefits = [b for b in available_benefits if b.type == benefit_type]
-            if type_benefits:
-                self.problem += pulp.lpSum([
-                    benefit_vars[benefit.id] for benefit in type_benefits
-                ]) >= 1
-    
-    def _add_deductible_constraints(self, benefit_vars, available_benefits: List[Benefit], bundle_request: BundleRequest):
-        """
-        Add deductible constraints if specified
-        """
+            members = self.type_members.get(getattr(benefit_type, 'value', benefit_type))
+            if members is not None:
+                coefficients = np.zeros(len(self.benefits))
+                coefficients[members] = 1.0
+                rows.append((coefficients, pulp.LpConstraintGE, 1.0))
         if bundle_request.max_deductible:
-            self.problem += pulp.lpSum([
-                benefit.annual_deductible * benefit_vars[benefit.id]
-                for benefit in available_benefits
-            ]) <= bundle_request.max_deductible
-        
+            rows.append((self.deductibles, pulp.LpConstraintLE, bundle_request.max_deductible))
         if bundle_request.max_out_of_pocket:
-            self.problem += pulp.lpSum([
-                benefit.max_out_of_pocket * benefit_vars[benefit.id]
-                for benefit in available_benefits
-            ]) <= bundle_request.max_out_of_pocket
-    
-    def _add_provider_preferences(self, benefit_vars, available_benefits: List[Benefit], bundle_request: BundleRequest):
+            rows.append((self.out_of_pocket, pulp.LpConstraintLE, bundle_request.max_out_of_pocket))
+        # Prefer preferred providers: at least as many preferred as non-preferred benefits
+        if bundle_request.preferred_providers:
+            preferred = np.isin(self.providers, list(bundle_request.preferred_providers))
+            if preferred.any() and not preferred.all():
+                rows.append((np.where(preferred, 1.0, -1.0), pulp.LpConstraintGE, 0.0))
+        return rows
+
+    def _incumbent_for(self, rows: List[Tuple[np.ndarray, int, float]]) -> Optional[np.ndarray]:
+        with self._lock:
+            incumbent = self._incumbent
+        if incumbent is None:
+            return None
+        for coefficients, sense, rhs in rows:
+            lhs = float(coefficients @ incumbent)
+            if (sense == pulp.LpConstraintLE and lhs > rhs + 1e-9) or (sense == pulp.LpConstraintGE and lhs < rhs - 1e-9):
+                return None
+        return incumbent
+
+    def solve(self, bundle_request: BundleRequest, solver: SolverBackend) -> BundleSolution:
+        rows = self.constraint_rows(bundle_request)
+        variables = [pulp.LpVariable(f"benefit_{benefit.id}", cat=pulp.LpBinary) for benefit in self.benefits]
+
+        def expression(coefficients: np.ndarray) -> pulp.LpAffineExpression:
+            nonzero = np.flatnonzero(coefficients)
+            return pulp.LpAffineExpression([(variables[i], c) for i, c in zip(nonzero, coefficients[nonzero].tolist())])
+
+        # Objective: minimize total monthly premium
+        problem = pulp.LpProblem("ICHRA_Bundle_Optimization", pulp.LpMinimize)
+        problem += expression(self.premiums)
+        for coefficients, sense, rhs in rows:
+            problem += pulp.LpConstraint(expression(coefficients), sense, rhs=rhs)
+
+        # Only warm-start from an incumbent that is feasible under this request's right-hand sides
+        incumbent = self._incumbent_for(rows)
+        if incumbent is not None:
+            for variable, value in zip(variables, incumbent.tolist()):
+                variable.setInitialValue(value)
+        stats = solver.solve(problem, warm_start=incumbent is not None)
+
+        status = pulp.LpStatus[problem.status]
+        chosen = np.array([variable.value() == 1 for variable in variables], dtype=float)
+        if problem.status == pulp.LpStatusOptimal:
+            with self._lock:
+                self._incumbent = chosen
+        return BundleSolution(
+            selected=[benefit for benefit, picked in zip(self.benefits, chosen) if picked],
+            status=status,
+            objective_value=pulp.value(problem.objective) if problem.status == pulp.LpStatusOptimal else None,
+            warm_started=incumbent is not None,
+            stats=stats
+        )
+
+class BundleOptimizer:
+    # Compiled templates kept for the most recent benefit catalogs
+    MAX_TEMPLATES = 8
+
+    def __init__(self, solver: Optional[SolverBackend] = None):
+        self.solver = solver or get_solver_backend()
+        self._templates: "OrderedDict[str, BundleModelTemplate]" = OrderedDict()
+        self._templates_lock = threading.Lock()
+        # Outcome of the calling thread's last solve, for get_optimization_status / get_objective_value
+        self._last = threading.local()
+
+    def template_for(self, available_benefits: List[Benefit]) -> BundleModelTemplate:
+        version = catalog_version(available_benefits)
+        with self._templates_lock:
+            template = self._templates.get(version)
+            if template is not None:
+                self._templates.move_to_end(version)
+                return template
+        template = BundleModelTemplate(available_benefits)
+        with self._templates_lock:
+            template = self._templates.setdefault(version, template)
+            while len(self._templates) > self.MAX_TEMPLATES:
+                self._templates.popitem(last=False)
+        return template
+
+    def solve(self, available_benefits: List[Benefit], bundle_request: BundleRequest) -> BundleSolution:
+        solution = self.template_for(available_benefits).solve(bundle_request, self.solver)
+        self._last.solution = solution
+        return solution
+
+    def optimize_bundle(self, available_benefits: List[Benefit], bundle_request: BundleRequest) -> List[Benefit]:
         """
-        Add provider preference constraints if specified
+        Optimize bundle selection using linear programming
         """
-        if bundle_request.preferred_providers:
-            # Prefer benefits from preferred providers
-            preferred_benefits = [
-                b for b in available_benefits 
-                if b.provider in bundle_request.preferred_providers
-            ]
-            non_preferred_benefits = [
-                b for b in available_benefits 
-                if b.provider not in bundle_request.preferred_providers
-            ]
-            
-            # Add constraint to prefer preferred providers when possible
-            if preferred_benefits and non_preferred_benefits:
-                self.problem += pulp.lpSum([
-                    benefit_vars[b.id] for b in preferred_benefits
-                ]) >= pulp.lpSum([
-                    benefit_vars[b.id] for b in non_preferred_benefits
-                ])
-    
+        if not available_benefits:
+            return []
+        return self.solve(available_benefits, bundle_request).selected
+
     def get_optimization_status(self) -> str:
         """
-        Get the status of the optimization problem
+        Get the status of the calling thread's last optimization
         """
-        if self.problem:
-            return pulp.LpStatus[self.problem.status]
-        return "No problem solved"
-    
+        solution = getattr(self._last, "solution", None)
+        return solution.status if solution is not None else "No problem solved"
+
     def get_objective_value(self) -> Optional[float]:
         """
-        Get the objective value of the solved problem
+        Get the objective value of the calling thread's last optimization
         """
-        if self.problem and self.problem.status == pulp.LpStatusOptimal:
-            return pulp.value(self.problem.objective)
-        return None
+        solution = getattr(self._last, "solution", None)
+        return solution.objective_value if solution is not None else None
+
+# Preference weight names and their defaults when a profile omits them
+UTILITY_WEIGHTS = (("cost", 0.4), ("coverage", 0.3), ("network", 0.2), ("flexibility", 0.1))
+
+def plan_utilities(premiums, deductibles, actuarial_values, out_of_pocket_maxima, budget_cap, risk_score,
+                   cost_weight, coverage_weight, network_weight, flexibility_weight,
+                   expected_annual_cost=None) -> np.ndarray:
+    """
+    Weighted plan utility. Plan arguments are arrays; profile arguments may be scalars or column vectors,
+    so one call scores many employees against many plans. With simulated expected annual costs (premium plus
+    out-of-pocket), a single total-cost score relative to the cheapest plan scored replaces the premium,
+    deductible and out-of-pocket terms under the combined cost, network and flexibility weights.
+    """
+    if expected_annual_cost is not None:
+        total = np.maximum(np.asarray(expected_annual_cost, dtype=float), 1)
+        cost_score = total.min(axis=-1, keepdims=True) / total
+        return (cost_weight + network_weight + flexibility_weight) * cost_score + coverage_weight * actuarial_values
+    monthly_budget = np.maximum(1, budget_cap)
+    annual_budget = np.maximum(1, np.asarray(budget_cap) * 12)
+    # Lower premium is better
+    premium_score = np.maximum(0, 1 - premiums / monthly_budget)
+    # Lower deductible is better, especially for high risk
+    deductible_score = np.maximum(0, 1 - deductibles / annual_budget) * (0.5 + np.asarray(risk_score) / 2)
+    # Lower out-of-pocket max is better; higher actuarial value is better
+    oop_score = np.maximum(0, 1 - out_of_pocket_maxima / annual_budget)
+    return (cost_weight * premium_score + coverage_weight * actuarial_values +
+            network_weight * oop_score + flexibility_weight * deductible_score)
+
+def allows_hsa(profile: EmployeeProfile) -> bool:
+    # HSA plans are only offered to profiles that carry an HSA preference weight
+    return any('hsa' in weight.lower() for weight in profile.preference_weights)
 
 class BenefitBundler:
-    def optimize(self, profile: EmployeeProfile, plans: List[PlanFeature]) -> BundleResult:
+    def __init__(self, solver: Optional[SolverBackend] = None):
+        self.solver = solver or get_solver_backend()
+
+    def household_premiums(self, profile: EmployeeProfile, plans: List[PlanRecord],
+                           family_premiums: Optional[FamilyPremiumCalculator] = None) -> List[float]:
+        """
+        Monthly premium of each plan for the profile's household, computed for all plans at once
+        """
+        listed = [plan.monthly_premium for plan in plans]
+        if is_individual(profile):
+            return listed
+        if family_premiums is None:
+            members = len(charged_ages(profile))
+            return [premium * members for premium in listed]
+        return family_premiums.premiums([plan.plan_id for plan in plans], profile, fallback=listed).tolist()
+
+    def utility_scores(self, profile: EmployeeProfile, plans: List[PlanRecord], premiums: List[float],
+                       cost_model: Optional[ExpectedCostModel] = None) -> np.ndarray:
+        """
+        Utility of each plan for the profile, given each plan's household premium. A cost model switches the
+        cost terms to the expected total annual cost (premium plus simulated spending) at the profile's risk score.
+        """
+        weights = profile.preference_weights
+        return plan_utilities(
+            np.asarray(premiums, dtype=float),
+            np.array([plan.deductible for plan in plans], dtype=float),
+            np.array([plan.actuarial_value for plan in plans], dtype=float),
+            np.array([plan.out_of_pocket_max for plan in plans], dtype=float),
+            profile.budget_cap, profile.risk_score,
+            *(weights.get(name, default) for name, default in UTILITY_WEIGHTS),
+            expected_annual_cost=(cost_model.expected_annual_cost(plans, profile.risk_score, premiums)
+                                  if cost_model is not None else None)
+        )
+
+    def optimize(self, profile: EmployeeProfile, plans: List[PlanRecord],
+                 family_premiums: Optional[FamilyPremiumCalculator] = None,
+                 cost_model: Optional[ExpectedCostModel] = None) -> BundleResult:
         start_time = time.time()
         if not plans:
             raise ValueError("No plans provided for optimization.")
 
         # Decision variables: plan_selected[plan_id] = Binary
         plan_vars = {plan.plan_id: pulp.LpVariable(f"plan_{plan.plan_id}", cat=pulp.LpBinary) for plan in plans}
-
-        # Utility function for each plan
-        def utility(plan: PlanFeature, profile: EmployeeProfile) -> float:
-            # Lower premium is better
-            premium_score = max(0, 1 - (plan.monthly_premium / max(1, profile.budget_cap)))
-            # Lower deductible is better, especially for high risk
-            deductible_score = max(0, 1 - (plan.deductible / max(1, profile.budget_cap * 12))) * (0.5 + profile.risk_score/2)
-            # Higher actuarial value is better
-            av_score = plan.actuarial_value
-            # Lower out-of-pocket max is better
-            oop_score = max(0, 1 - (plan.out_of_pocket_max / max(1, profile.budget_cap * 12)))
-            # Weighted sum
-            weights = profile.preference_weights
-            score = (
-                weights.get("cost", 0.4) * premium_score +
-                weights.get("coverage", 0.3) * av_score +
-                weights.get("network", 0.2) * oop_score +
-                weights.get("flexibility", 0.1) * deductible_score
-            )
-            return score
+        premiums = dict(zip((plan.plan_id for plan in plans), self.household_premiums(profile, plans, family_premiums)))
+        # Utility of each plan for this profile
+        scores = dict(zip((plan.plan_id for plan in plans),
+                          self.utility_scores(profile, plans, [premiums[plan.plan_id] for plan in plans], cost_model).tolist()))
 
         # Create the optimization problem
         prob = pulp.LpProblem("Plan_Selection", pulp.LpMaximize)
 
         # Objective: maximize sum(plan_selected[i] * utility(plan[i], profile))
-        prob += pulp.lpSum([plan_vars[plan.plan_id] * utility(plan, profile) for plan in plans])
+        prob += pulp.lpSum([plan_vars[plan.plan_id] * scores[plan.plan_id] for plan in plans])
 
         # Constraint: Only one plan can be selected
         prob += pulp.lpSum([plan_vars[plan.plan_id] for plan in plans]) == 1
 
         # Constraint: Selected plan premium <= budget_cap
-        prob += pulp.lpSum([plan_vars[plan.plan_id] * plan.monthly_premium for plan in plans]) <= profile.budget_cap
+        prob += pulp.lpSum([plan_vars[plan.plan_id] * premiums[plan.plan_id] for plan in plans]) <= profile.budget_cap
 
         # Constraint: If not HSA eligible, can't select HSA plans
-        if not any([w for w in profile.preference_weights if 'hsa' in w.lower()]):
+        if not allows_hsa(profile):
             for plan in plans:
                 if plan.hsa_eligible:
                     prob += plan_vars[plan.plan_id] == 0
 
         # Solve
-        prob.solve()
+        stats = self.solver.solve(prob)
+        logger.debug(f"Plan selection solved by {stats.backend} in {stats.solve_time_ms:.1f} ms ({stats.status})")
         status = pulp.LpStatus[prob.status]
         if status != 'Optimal':
             raise RuntimeError(f"Optimization failed: {status}")
@@ -188,12 +290,12 @@ class BenefitBundler:
             raise RuntimeError("No plan selected by optimization.")
 
         # Compute utility and cost
-        utility_score = utility(selected_plan, profile)
-        total_cost = selected_plan.monthly_premium
+        utility_score = scores[selected_plan.plan_id]
+        total_cost = premiums[selected_plan.plan_id]
         optimization_time_ms = (time.time() - start_time) * 1000
 
         return BundleResult(
-            selected_plan=selected_plan,
+            selected_plan=selected_plan.to_feature() if isinstance(selected_plan, PlanRecord) else selected_plan,
             utility_score=utility_score,
             total_cost=total_cost,
             optimization_time_ms=optimization_time_ms
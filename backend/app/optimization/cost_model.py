@@ -0,0 +1,91 @@
+import threading
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+from app.models.records import PlanRecord
+
+# Risk scores are simulated at this resolution; profiles share the draws of their bucket
+RISK_BUCKETS = 20
+
+# Annual claim draws per risk bucket
+DEFAULT_SAMPLES = 4000
+
+# Plans simulated per batch; bounds the samples x plans temporaries
+PLAN_BATCH_SIZE = 256
+
+def risk_bucket(risk_score: float) -> int:
+    return int(round(min(max(risk_score, 0.0), 1.0) * RISK_BUCKETS))
+
+def coinsurance_rate(actuarial_values: np.ndarray) -> np.ndarray:
+    """
+    Member coinsurance after the deductible. Plan records carry no coinsurance, so it is approximated from the
+    metal tier's actuarial value: 30% at bronze (0.6), 20% silver, 10% gold, none at platinum.
+    """
+    return np.clip(0.9 - actuarial_values, 0.0, 0.5)
+
+def simulate_claims(risk_score: float, samples: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Annual allowed claims: a utilization hurdle (share of members with any claim rises with risk) followed by a
+    lognormal severity whose median and spread grow with risk
+    """
+    any_claims = rng.random(samples) < 0.55 + 0.4 * risk_score
+    severity = rng.lognormal(mean=np.log(1200.0) + 2.5 * risk_score, sigma=1.1 + 0.5 * risk_score, size=samples)
+    return np.where(any_claims, severity, 0.0)
+
+class ExpectedCostModel:
+    """
+    Expected annual cost per plan and risk bucket, estimated by Monte Carlo: twelve months of premium plus
+    out-of-pocket spending (deductible, then coinsurance, capped at the out-of-pocket maximum). Draws are seeded
+    per bucket, so every plan is scored on the same simulated claims and results are reproducible. Out-of-pocket
+    estimates are cached per (plan, risk bucket); premiums are added per request because household premiums
+    depend on the profile. After warm-up, scoring a plan list is a dictionary lookup per plan.
+    """
+    def __init__(self, samples: int = DEFAULT_SAMPLES, seed: int = 2025):
+        self.samples = samples
+        self.seed = seed
+        self._claims: Dict[int, np.ndarray] = {}
+        self._cache: Dict[Tuple[str, int], float] = {}
+        self._lock = threading.Lock()
+
+    def _bucket_claims(self, bucket: int) -> np.ndarray:
+        claims = self._claims.get(bucket)
+        if claims is None:
+            claims = simulate_claims(bucket / RISK_BUCKETS, self.samples, np.random.default_rng([self.seed, bucket]))
+            with self._lock:
+                claims = self._claims.setdefault(bucket, claims)
+        return claims
+
+    def simulate(self, plans: Sequence[PlanRecord], risk_score: float) -> np.ndarray:
+        """
+        Expected annual out-of-pocket cost of each plan, simulated without the cache
+        """
+        claims = self._bucket_claims(risk_bucket(risk_score))[:, None]
+        deductibles = np.array([plan.deductible for plan in plans], dtype=float)
+        out_of_pocket = np.array([plan.out_of_pocket_max for plan in plans], dtype=float)
+        coinsurance = coinsurance_rate(np.array([plan.actuarial_value for plan in plans], dtype=float))
+        expected = np.empty(len(plans))
+        for start in range(0, len(plans), PLAN_BATCH_SIZE):
+            batch = slice(start, start + PLAN_BATCH_SIZE)
+            deductible = deductibles[batch]
+            spend = np.minimum(claims, deductible) + coinsurance[batch] * np.maximum(claims - deductible, 0.0)
+            expected[batch] = np.minimum(spend, out_of_pocket[batch]).mean(axis=0)
+        return expected
+
+    def expected_out_of_pocket(self, plans: Sequence[PlanRecord], risk_score: float) -> np.ndarray:
+        bucket = risk_bucket(risk_score)
+        cache = self._cache
+        values = [cache.get((plan.plan_id, bucket)) for plan in plans]
+        missing: List[int] = [i for i, value in enumerate(values) if value is None]
+        if missing:
+            simulated = self.simulate([plans[i] for i in missing], bucket / RISK_BUCKETS)
+            with self._lock:
+                for i, value in zip(missing, simulated.tolist()):
+                    cache[(plans[i].plan_id, bucket)] = value
+                    values[i] = value
+        return np.array(values, dtype=float)
+
+    def expected_annual_cost(self, plans: Sequence[PlanRecord], risk_score: float,
+                             monthly_premiums: Sequence[float]) -> np.ndarray:
+        """
+        Expected total annual cost of each plan: twelve months of the given premium plus expected out-of-pocket
+        """
+        return 12 * np.asarray(monthly_premiums, dtype=float) + self.expected_out_of_pocket(plans, risk_score)
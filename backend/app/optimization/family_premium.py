@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Sequence
+from app.models.domain import CoverageLevel, EmployeeProfile
+from app.optimization.rate_curves import MAX_AGE, RateCurves, family_tier_index, normalize_rating_area, plan_key
+
+# Under age rating only the three oldest covered children under 21 are charged
+MAX_CHARGED_CHILDREN = 3
+CHILD_AGE_LIMIT = 21
+
+def covered_members(profile: EmployeeProfile) -> tuple[List[int], Optional[int], List[int]]:
+    """
+    Ages of the subscriber, spouse and dependents actually enrolled at the profile's coverage level
+    """
+    level = profile.coverage_level
+    spouse_age = profile.spouse_age if level in (CoverageLevel.FAMILY, CoverageLevel.EMPLOYEE_AND_SPOUSE) else None
+    dependent_ages = list(profile.dependent_ages) if level in (CoverageLevel.FAMILY, CoverageLevel.EMPLOYEE_AND_CHILDREN) else []
+    return [profile.age], spouse_age, dependent_ages
+
+def charged_ages(profile: EmployeeProfile) -> List[int]:
+    """
+    Member ages that carry an age-rated premium
+    """
+    subscriber, spouse_age, dependent_ages = covered_members(profile)
+    adults = subscriber + ([spouse_age] if spouse_age is not None else [])
+    children = sorted((age for age in dependent_ages if age < CHILD_AGE_LIMIT), reverse=True)[:MAX_CHARGED_CHILDREN]
+    return adults + [age for age in dependent_ages if age >= CHILD_AGE_LIMIT] + children
+
+def is_individual(profile: EmployeeProfile) -> bool:
+    _, spouse_age, dependent_ages = covered_members(profile)
+    return spouse_age is None and not dependent_ages
+
+class FamilyPremiumCalculator:
+    """
+    Household premiums for many plans at once: the family-tier rate where the issuer files one,
+    otherwise the sum of each charged member's age-rated premium.
+    """
+    def __init__(self, curves: RateCurves):
+        self.curves = curves
+        self._pair_index = pd.Index(pd.Series(curves.plan_ids, dtype=object) + "|" +
+                                    pd.Series(curves.area_ids[curves.area_index], dtype=object))
+        # First rating area per plan, used when the household's rating area is unknown
+        first = ~pd.Index(curves.plan_ids).duplicated()
+        self._plan_rows = pd.Series(np.flatnonzero(first), index=pd.Index(curves.plan_ids[first]))
+
+    def plan_rows(self, plan_ids: Sequence[str], rating_area_id: Optional[str]) -> np.ndarray:
+        """
+        Curve row of each plan in the rating area (the plan's first area when the area is unknown or not
+        filed), -1 for plans without Rate PUF rows
+        """
+        keys = plan_key(pd.Series(list(plan_ids), dtype=object))
+        rows = np.full(len(keys), -1)
+        if rating_area_id:
+            area = normalize_rating_area(pd.Series([rating_area_id]))[0]
+            rows = self._pair_index.get_indexer(keys + "|" + area)
+        missing = rows < 0
+        if missing.any():
+            rows[missing] = self._plan_rows.reindex(keys[missing]).fillna(-1).to_numpy(dtype=int)
+        return rows
+
+    def premiums(self, plan_ids: Sequence[str], profile: EmployeeProfile,
+                 fallback: Optional[Sequence[float]] = None) -> np.ndarray:
+        """
+        Monthly household premium per plan. Plans without Rate PUF rows use fallback (the listed individual
+        premium) times the number of charged members, or NaN if no fallback is given.
+        """
+        return self.household_premiums(self.plan_rows(plan_ids, profile.rating_area_id), [profile], fallback)[0]
+
+    def household_premiums(self, rows: np.ndarray, profiles: Sequence[EmployeeProfile],
+                           fallback: Optional[Sequence[float]] = None) -> np.ndarray:
+        """
+        Monthly premiums (profiles × plans) of many households priced on the same plan rows, i.e. in one
+        rating area. Each household is reduced to its charged-age counts and family tier, so the age-rated
+        premiums of all of them are a single matrix product.
+        """
+        counts = np.zeros((len(profiles), MAX_AGE + 1))
+        tiers = np.empty(len(profiles), dtype=int)
+        for i, profile in enumerate(profiles):
+            np.add.at(counts[i], np.clip(np.asarray(charged_ages(profile), dtype=int), 0, MAX_AGE), 1)
+            _, spouse_age, dependent_ages = covered_members(profile)
+            tiers[i] = family_tier_index(spouse_age is not None, len(dependent_ages))
+        found = rows >= 0
+
+        curves = self.curves.premiums[rows[found]]
+        unfiled = np.isnan(curves)
+        age_rated = counts @ np.where(unfiled, 0.0, curves).T
+        # A charged age without a filed rate leaves the age-rated premium unknown, as a NaN sum would
+        age_rated[(counts > 0).astype(float) @ unfiled.T > 0] = np.nan
+        tier = self.curves.family_tiers[rows[found]][:, tiers].T
+        result = np.full((len(profiles), len(rows)), np.nan)
+        result[:, found] = np.where(np.isnan(tier), age_rated, tier)
+
+        if fallback is not None:
+            unresolved = np.isnan(result)
+            members = counts.sum(axis=1, keepdims=True)
+            result[unresolved] = (np.asarray(fallback, dtype=float)[None, :] * members)[unresolved]
+        return result
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Dict, Optional
+from app.core.config import settings
+from app.optimization.rate_curves import MAX_AGE, RateCurves, normalize_rating_area
+
+# Metal levels ordered by coverage; a floor admits its own level and every richer one
+METAL_TIERS = {"bronze": 1, "expanded bronze": 1, "silver": 2, "gold": 3, "platinum": 4}
+
+# Iterations of the coverage binary search under a budget; resolves the target to well below one employee
+BUDGET_SEARCH_STEPS = 40
+
+@dataclass
+class MinimumAllowanceResult:
+    # One row per class: class_name, employee_count, monthly_allowance (None when the target is unreachable),
+    # coverage, max_coverage and budget_monthly_allowance (set when the budget binds)
+    classes: pd.DataFrame
+    annual_cost: Optional[float]
+    budget_coverage: Optional[float]
+
+class MinimumAllowanceSolver:
+    """
+    Smallest monthly allowance per employee class such that a target share of the class can afford a plan
+    meeting the coverage floor. Each employee's threshold (the allowance at which they are covered) is
+    computed once; per class the answer is then an order statistic of the sorted thresholds.
+    """
+    def __init__(self, curves: RateCurves, affordability_percentage: Optional[float] = None):
+        self.curves = curves
+        self.affordability_percentage = (
+            affordability_percentage if affordability_percentage is not None
+            else settings.ICHRA_AFFORDABILITY_PERCENTAGE
+        )
+
+    def thresholds(self, census: pd.DataFrame, min_metal_level: str = "Bronze", min_choices: int = 1,
+                   affordability_percentage: Optional[float] = None) -> np.ndarray:
+        """
+        Allowance at which each employee can buy min_choices plans at or above the floor while paying no more
+        than the affordability share of household income. NaN where the area has too few qualifying plans.
+        """
+        floor = METAL_TIERS.get(min_metal_level.lower())
+        if floor is None:
+            raise ValueError(f"Unknown metal level '{min_metal_level}'")
+        metals = [level for level, tier in METAL_TIERS.items() if tier >= floor]
+        area_states, area_ids, lowest = self.curves.lowest_premiums(metals, min_choices)
+        areas = pd.Index([f"{state}|{area}" for state, area in zip(area_states, area_ids)])
+
+        keys = (census['state_code'].astype(str).str.upper().str.strip() + "|" +
+                normalize_rating_area(census['rating_area_id']))
+        area_index = areas.get_indexer(keys)
+        age_index = np.clip(pd.to_numeric(census['age'], errors='coerce').fillna(-1).to_numpy(dtype=int), -1, MAX_AGE)
+        found = (area_index >= 0) & (age_index >= 0)
+        premium = np.full(len(census), np.nan)
+        premium[found] = lowest[area_index[found], age_index[found], min_choices - 1]
+
+        percentage = affordability_percentage if affordability_percentage is not None else self.affordability_percentage
+        income = pd.to_numeric(census['household_income'], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+        return np.maximum(premium - income * percentage / 12.0, 0.0)
+
+    def solve(self, census: pd.DataFrame, target_coverage: float, min_metal_level: str = "Bronze",
+              min_choices: int = 1, annual_budget: Optional[float] = None,
+              affordability_percentage: Optional[float] = None) -> MinimumAllowanceResult:
+        """
+        Per-class minimum allowances for target_coverage. When annual_budget is given and the target costs more,
+        the highest uniform coverage target the budget pays for is found by binary search; budget_coverage is
+        the share of the census covered at those allowances.
+        """
+        thresholds = self.thresholds(census, min_metal_level, min_choices, affordability_percentage)
+        class_names = (census['class_name'] if 'class_name' in census else pd.Series(None, index=census.index))
+        class_names = class_names.fillna("All employees").astype(str).to_numpy()
+        classes = {name: np.sort(thresholds[class_names == name]) for name in pd.unique(class_names)}
+
+        def allowances(target: float) -> Dict[str, Optional[float]]:
+            result = {}
+            for name, ranked in classes.items():
+                needed = int(np.ceil(target * len(ranked) - 1e-9))
+                if needed == 0:
+                    result[name] = 0.0
+                elif needed > np.count_nonzero(~np.isnan(ranked)):  # NaN sorts last
+                    result[name] = None
+                else:
+                    result[name] = float(np.ceil(ranked[needed - 1] * 100) / 100)
+            return result
+
+        def annual_cost(levels: Dict[str, Optional[float]]) -> float:
+            return sum(len(classes[name]) * 12 * (level or 0.0) for name, level in levels.items())
+
+        levels = allowances(target_coverage)
+        budget_levels, budget_coverage = None, None
+        if annual_budget is not None and (annual_cost(levels) > annual_budget or None in levels.values()):
+            low, high = 0.0, target_coverage
+            for _ in range(BUDGET_SEARCH_STEPS):
+                middle = (low + high) / 2
+                candidate = allowances(middle)
+                if None not in candidate.values() and annual_cost(candidate) <= annual_budget:
+                    low = middle
+                else:
+                    high = middle
+            budget_levels = allowances(low)
+
+        def covered(name: str, level: Optional[float]) -> int:
+            ranked = classes[name]
+            return int(np.searchsorted(ranked, level, side='right')) if level is not None else 0  # NaN sorts last
+
+        if budget_levels is not None:
+            # Share of the whole census covered at the allowances the budget pays for
+            budget_coverage = sum(covered(name, level) for name, level in budget_levels.items()) / len(census)
+
+        rows = []
+        for name, ranked in classes.items():
+            level = levels[name]
+            coverable = np.count_nonzero(~np.isnan(ranked))
+            rows.append({
+                "class_name": name,
+                "employee_count": len(ranked),
+                "monthly_allowance": level,
+                "coverage": covered(name, level) / len(ranked),
+                "max_coverage": coverable / len(ranked),
+                "budget_monthly_allowance": budget_levels.get(name) if budget_levels is not None else None,
+            })
+        return MinimumAllowanceResult(
+            classes=pd.DataFrame(rows),
+            annual_cost=annual_cost(levels) if None not in levels.values() else None,
+            budget_coverage=budget_coverage
+        )
@@ -0,0 +1,151 @@
+import heapq
+import numpy as np
+import pulp
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+from app.models.domain import EmployeeProfile
+from app.models.records import PlanRecord
+from app.optimization.bundler import UTILITY_WEIGHTS, BenefitBundler, allows_hsa, plan_utilities
+from app.optimization.family_premium import FamilyPremiumCalculator, charged_ages, is_individual
+
+# Employees scored per block when building the utility matrix; bounds temporaries to block × plans
+MATRIX_BLOCK_SIZE = 1024
+
+# Largest employees × plans instance accepted by the exact model
+EXACT_MAX_PAIRS = 50_000
+
+@dataclass(frozen=True)
+class MenuSelection:
+    plan_indices: List[int]
+    total_utility: float
+    upper_bound: float
+    assignments: np.ndarray  # per employee, position in plan_indices of the best menu plan; -1 if none is usable
+    method: str
+
+class PlanMenuOptimizer:
+    """
+    Choose the K plans an employer offers so that the census' summed best-available utility is maximal
+    (a facility-location problem). Utilities come from BenefitBundler's scoring, precomputed once as an
+    employees × plans matrix; selection then runs on the matrix alone.
+    """
+    def __init__(self, bundler: BenefitBundler):
+        self.bundler = bundler
+
+    def utility_matrix(self, profiles: Sequence[EmployeeProfile], plans: Sequence[PlanRecord],
+                       family_premiums: Optional[FamilyPremiumCalculator] = None) -> np.ndarray:
+        """
+        Utility of every plan for every employee; 0 where the household premium is over budget or the
+        plan is excluded by the HSA rule. Stored column-major since selection reads whole plan columns.
+        """
+        listed = np.array([plan.monthly_premium for plan in plans], dtype=float)
+        deductibles = np.array([plan.deductible for plan in plans], dtype=float)
+        actuarial_values = np.array([plan.actuarial_value for plan in plans], dtype=float)
+        out_of_pocket = np.array([plan.out_of_pocket_max for plan in plans], dtype=float)
+        hsa_plans = np.array([plan.hsa_eligible for plan in plans], dtype=bool)
+
+        budgets = np.array([profile.budget_cap for profile in profiles], dtype=float)
+        risks = np.array([profile.risk_score for profile in profiles], dtype=float)
+        weights = np.array([[profile.preference_weights.get(name, default) for name, default in UTILITY_WEIGHTS]
+                            for profile in profiles], dtype=float).reshape(len(profiles), len(UTILITY_WEIGHTS))
+        hsa_allowed = np.array([allows_hsa(profile) for profile in profiles], dtype=bool)
+
+        plan_ids = [plan.plan_id for plan in plans]
+        area_rows: Dict[Optional[str], np.ndarray] = {}
+        matrix = np.empty((len(profiles), len(plans)), dtype=np.float32, order="F")
+        for start in range(0, len(profiles), MATRIX_BLOCK_SIZE):
+            rows = slice(start, start + MATRIX_BLOCK_SIZE)
+            premiums = np.tile(listed, (len(budgets[rows]), 1))
+            # Households are priced together per rating area; plan rows are resolved once per area
+            households: Dict[Optional[str], List[int]] = {}
+            for offset, profile in enumerate(profiles[rows]):
+                if not is_individual(profile):
+                    households.setdefault(profile.rating_area_id, []).append(offset)
+            for area, offsets in households.items():
+                members = [profiles[start + offset] for offset in offsets]
+                if family_premiums is None:
+                    premiums[offsets] = listed * np.array([[len(charged_ages(profile))] for profile in members])
+                    continue
+                if area not in area_rows:
+                    area_rows[area] = family_premiums.plan_rows(plan_ids, area)
+                premiums[offsets] = family_premiums.household_premiums(area_rows[area], members, fallback=listed)
+            utilities = plan_utilities(premiums, deductibles, actuarial_values, out_of_pocket,
+                                       budgets[rows, None], risks[rows, None], *weights[rows].T[:, :, None])
+            usable = (premiums <= budgets[rows, None]) & ~(hsa_plans & ~hsa_allowed[rows, None])
+            matrix[rows] = np.where(usable, np.maximum(utilities, 0.0), 0.0)
+        return matrix
+
+    def select(self, matrix: np.ndarray, menu_size: int, method: str = "greedy") -> MenuSelection:
+        if method == "greedy":
+            return self.greedy(matrix, menu_size)
+        if method == "exact":
+            return self.exact(matrix, menu_size)
+        raise ValueError(f"Unknown menu method '{method}'; expected greedy or exact")
+
+    def greedy(self, matrix: np.ndarray, menu_size: int) -> MenuSelection:
+        """
+        Lazy greedy. The objective is monotone submodular, so stale marginal gains stay valid upper bounds
+        and most candidates are never re-evaluated; the result is within (1 - 1/e) of the optimum.
+        """
+        best = np.zeros(matrix.shape[0], dtype=np.float32)
+        heap = [(-float(gain), j) for j, gain in enumerate(matrix.sum(axis=0, dtype=float))]
+        heapq.heapify(heap)
+        chosen: List[int] = []
+        while heap and len(chosen) < menu_size:
+            _, j = heapq.heappop(heap)
+            gain = float(np.maximum(matrix[:, j] - best, 0.0).sum(dtype=float))
+            if heap and gain < -heap[0][0]:
+                heapq.heappush(heap, (-gain, j))
+                continue
+            if gain <= 0.0:
+                break  # no remaining plan improves any employee
+            chosen.append(j)
+            np.maximum(best, matrix[:, j], out=best)
+        return self._selection(matrix, chosen, menu_size, "greedy")
+
+    def exact(self, matrix: np.ndarray, menu_size: int) -> MenuSelection:
+        """
+        MILP: open at most K plans, assign each employee to at most one open plan. Only for small instances.
+        """
+        employees, plans = matrix.shape
+        if employees * plans > EXACT_MAX_PAIRS:
+            raise ValueError(f"Exact menu selection is limited to {EXACT_MAX_PAIRS} employee-plan pairs; use greedy")
+        open_vars = [pulp.LpVariable(f"open_{j}", cat=pulp.LpBinary) for j in range(plans)]
+        rows, cols = np.nonzero(matrix > 0)
+        # Assignments can stay continuous: with the open plans fixed, each employee takes its best one
+        assign = [pulp.LpVariable(f"assign_{i}_{j}", lowBound=0, upBound=1) for i, j in zip(rows, cols)]
+
+        problem = pulp.LpProblem("Plan_Menu", pulp.LpMaximize)
+        problem += pulp.LpAffineExpression([(x, float(matrix[i, j])) for x, i, j in zip(assign, rows, cols)])
+        by_employee: List[List[pulp.LpVariable]] = [[] for _ in range(employees)]
+        for x, i, j in zip(assign, rows, cols):
+            by_employee[i].append(x)
+            problem += x <= open_vars[j]
+        for variables in by_employee:
+            if variables:
+                problem += pulp.lpSum(variables) <= 1
+        problem += pulp.lpSum(open_vars) <= menu_size
+
+        self.bundler.solver.solve(problem)
+        if problem.status != pulp.LpStatusOptimal:
+            raise RuntimeError(f"Menu optimization failed: {pulp.LpStatus[problem.status]}")
+        chosen = [j for j, variable in enumerate(open_vars) if (variable.value() or 0) > 0.5]
+        selection = self._selection(matrix, chosen, menu_size, "exact")
+        if problem.sol_status == pulp.LpSolutionOptimal:
+            selection = MenuSelection(selection.plan_indices, selection.total_utility, selection.total_utility,
+                                      selection.assignments, "exact")
+        return selection
+
+    def _selection(self, matrix: np.ndarray, chosen: List[int], menu_size: int, method: str) -> MenuSelection:
+        if not chosen:
+            return MenuSelection([], 0.0, 0.0, np.full(matrix.shape[0], -1), method)
+        menu = matrix[:, chosen]
+        best = menu.max(axis=1)
+        assignments = np.where(best > 0, menu.argmax(axis=1), -1)
+        total = float(best.sum(dtype=float))
+        # Data-dependent bound for any menu S: OPT <= f(S) + the K largest single-plan gains over S
+        residual = np.zeros(matrix.shape[1])
+        for start in range(0, matrix.shape[0], MATRIX_BLOCK_SIZE):
+            rows = slice(start, start + MATRIX_BLOCK_SIZE)
+            residual += np.maximum(matrix[rows] - best[rows, None], 0.0).sum(axis=0, dtype=float)
+        bound = total + float(np.sort(residual)[::-1][:menu_size].sum())
+        return MenuSelection(chosen, total, bound, assignments, method)
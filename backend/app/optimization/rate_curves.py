@@ -0,0 +1,235 @@
+import re
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Optional, Sequence, Tuple
+
+# Rate PUF ages run 0-14 (one banded row), 15..63, then "64 and over"
+MAX_AGE = 64
+AGES = np.arange(MAX_AGE + 1)
+
+BENCHMARK_METHODS = ("lowest", "second_lowest", "percentile")
+
+# Family-tier rate columns of "Family Option" rows, indexed by FamilyTier position
+FAMILY_TIER_COLUMNS = (
+    'IndividualRate',
+    'Couple',
+    'PrimarySubscriberAndOneDependent',
+    'PrimarySubscriberAndTwoDependents',
+    'PrimarySubscriberAndThreeOrMoreDependents',
+    'CoupleAndOneDependent',
+    'CoupleAndTwoDependents',
+    'CoupleAndThreeOrMoreDependents'
+)
+
+def family_tier_index(has_spouse: bool, dependents: int) -> int:
+    """
+    Position in FAMILY_TIER_COLUMNS for a household composition
+    """
+    dependents = min(dependents, 3)
+    if not has_spouse:
+        return 0 if dependents == 0 else 1 + dependents
+    return 1 if dependents == 0 else 4 + dependents
+
+def plan_key(plan_ids: pd.Series) -> pd.Series:
+    """
+    Standard component id of a plan: Rate PUF rows are keyed without the CSR variant suffix
+    """
+    return _map_unique(plan_ids, lambda values: values.astype(str).str.split('-').str[0])
+
+def _map_unique(column: pd.Series, transform) -> pd.Series:
+    """
+    Apply a string transform to the distinct values of a column only. PUF code columns repeat heavily.
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    return pd.Series(transform(pd.Series(uniques)).to_numpy()[codes], index=column.index)
+
+def normalize_rating_area(values: pd.Series) -> pd.Series:
+    """
+    Accept "3", "Rating Area 3" or "rating area 3" and return the Rate PUF spelling "Rating Area 3"
+    """
+    text = values.astype(str).str.strip()
+    number = text.str.extract(r'^(?:rating\s*area\s*)?(\d+)$', flags=re.IGNORECASE)[0]
+    return ("Rating Area " + number).where(number.notna(), text)
+
+class RateCurves:
+    """
+    Dense premium-by-age curves for every (plan, rating area) pair in a Rate PUF extract.
+    Row i of premiums is the curve of plan_ids[i] in rating area area_index[i]; columns are ages 0..64.
+    family_tiers holds the matching "Family Option" tier rates (NaN unless the issuer uses family-tier rating).
+    """
+    def __init__(self, plan_ids: np.ndarray, metal_levels: np.ndarray, area_index: np.ndarray,
+                 area_states: np.ndarray, area_ids: np.ndarray, premiums: np.ndarray,
+                 family_tiers: Optional[np.ndarray] = None):
+        self.plan_ids = plan_ids
+        self.metal_levels = metal_levels
+        self.area_index = area_index
+        self.area_states = area_states
+        self.area_ids = area_ids
+        self.premiums = premiums
+        self.family_tiers = (family_tiers if family_tiers is not None
+                             else np.full((len(plan_ids), len(FAMILY_TIER_COLUMNS)), np.nan))
+
+    @classmethod
+    def from_puf(cls, rate_df: Optional[pd.DataFrame], plan_attributes_df: Optional[pd.DataFrame] = None,
+                 tobacco: bool = False) -> "RateCurves":
+        """
+        Build curves from Rate PUF rows. Metal levels come from the Plan Attributes PUF when available and
+        dental-only plans are dropped. "Family Option" rows fill family_tiers instead of an age column.
+        """
+        if rate_df is None or rate_df.empty:
+            return cls.empty()
+
+        rates = pd.DataFrame({
+            'plan_key': plan_key(rate_df['PlanId']),
+            'state': _map_unique(rate_df['StateCode'], lambda values: values.astype(str).str.upper()),
+            'area': _map_unique(rate_df['RatingAreaId'], lambda values: values.astype(str)),
+            'age': rate_df['Age'],
+            'premium': pd.to_numeric(rate_df['IndividualRate'], errors='coerce')
+        })
+        if tobacco and 'IndividualTobaccoRate' in rate_df.columns:
+            tobacco_rate = pd.to_numeric(rate_df['IndividualTobaccoRate'], errors='coerce')
+            rates['premium'] = tobacco_rate.fillna(rates['premium'])
+        tier_columns = [column for column in FAMILY_TIER_COLUMNS[1:] if column in rate_df.columns]
+        for column in tier_columns:
+            rates[column] = pd.to_numeric(rate_df[column], errors='coerce')
+        if 'RateEffectiveDate' in rate_df.columns:
+            # Keep only the most recent rate period, as _get_premium_from_rate_data does
+            rates['effective'] = rate_df['RateEffectiveDate'].astype(str)
+            rates = rates.sort_values('effective', kind='stable').drop_duplicates(
+                ['plan_key', 'state', 'area', 'age'], keep='last')
+
+        # "0-14" expands to ages 0..14 and "64 and over" to 64; anything else non-numeric is dropped
+        low = _map_unique(rates['age'], lambda values: pd.to_numeric(
+            values.astype(str).str.extract(r'^\s*(\d+)')[0], errors='coerce'))
+        high = _map_unique(rates['age'], lambda values: pd.to_numeric(
+            values.astype(str).str.extract(r'^\s*\d+\s*-\s*(\d+)')[0], errors='coerce')).fillna(low)
+        family = _map_unique(rates['age'], lambda values: values.astype(str).str.strip().str.lower() == 'family option')
+        valid = (low.notna() & rates['premium'].notna()) | family
+        rates, family = rates[valid], family[valid].to_numpy(dtype=bool)
+        low = np.minimum(low[valid].fillna(0).astype(int).to_numpy(), MAX_AGE)
+        high = np.minimum(high[valid].fillna(0).astype(int).to_numpy(), MAX_AGE)
+
+        metal = pd.Series('', index=rates.index)
+        if plan_attributes_df is not None and not plan_attributes_df.empty and 'MetalLevel' in plan_attributes_df.columns:
+            attributes = plan_attributes_df
+            if 'DentalOnlyPlan' in attributes.columns:
+                dental = attributes['DentalOnlyPlan'].astype(str).str.lower() == 'yes'
+                keep = ~rates['plan_key'].isin(set(plan_key(attributes.loc[dental, 'PlanId']))).to_numpy()
+                rates, low, high, family = rates[keep], low[keep], high[keep], family[keep]
+            key_column = attributes['StandardComponentId'] if 'StandardComponentId' in attributes.columns else attributes['PlanId']
+            metal_by_plan = pd.Series(attributes['MetalLevel'].astype(str).str.lower().to_numpy(),
+                                      index=plan_key(key_column))
+            metal_by_plan = metal_by_plan[~metal_by_plan.index.duplicated()]
+            metal = rates['plan_key'].map(metal_by_plan).fillna('')
+
+        if rates.empty:
+            return cls.empty()
+
+        # One output row per (plan, state, rating area)
+        pair_codes = rates.groupby(['plan_key', 'state', 'area'], sort=False).ngroup().to_numpy()
+        pairs = rates.iloc[np.unique(pair_codes, return_index=True)[1]]
+        metal = metal.loc[pairs.index]
+        area_codes = pairs.groupby(['state', 'area'], sort=False).ngroup().to_numpy()
+        areas = pairs.iloc[np.unique(area_codes, return_index=True)[1]]
+
+        # Expand banded ages so every covered age gets its own cell
+        age_rows = ~family
+        span = high[age_rows] - low[age_rows] + 1
+        row = np.repeat(pair_codes[age_rows], span)
+        age = np.repeat(low[age_rows], span) + (np.arange(span.sum()) - np.repeat(np.cumsum(span) - span, span))
+        premium_values = np.repeat(rates['premium'].to_numpy(dtype=float)[age_rows], span)
+        premiums = np.full((len(pairs), MAX_AGE + 1), np.nan)
+        premiums[row, age] = premium_values
+
+        family_tiers = np.full((len(pairs), len(FAMILY_TIER_COLUMNS)), np.nan)
+        family_rows = pair_codes[family]
+        family_tiers[family_rows, 0] = rates['premium'].to_numpy(dtype=float)[family]
+        for column in tier_columns:
+            family_tiers[family_rows, FAMILY_TIER_COLUMNS.index(column)] = rates[column].to_numpy(dtype=float)[family]
+
+        return cls(
+            plan_ids=pairs['plan_key'].to_numpy(),
+            metal_levels=metal.to_numpy().astype(str),
+            area_index=area_codes,
+            area_states=areas['state'].to_numpy(),
+            area_ids=areas['area'].to_numpy(),
+            premiums=premiums,
+            family_tiers=family_tiers
+        )
+
+    @classmethod
+    def empty(cls) -> "RateCurves":
+        return cls(np.array([], dtype=object), np.array([], dtype=object), np.array([], dtype=int),
+                   np.array([], dtype=object), np.array([], dtype=object), np.empty((0, MAX_AGE + 1)))
+
+    def __len__(self) -> int:
+        return len(self.plan_ids)
+
+    def for_state(self, state_code: str) -> "RateCurves":
+        """
+        Restrict the curves to one state, renumbering its rating areas
+        """
+        rows = self.area_states[self.area_index] == state_code.upper() if len(self) else np.zeros(0, dtype=bool)
+        used_areas, area_index = np.unique(self.area_index[rows], return_inverse=True)
+        return RateCurves(self.plan_ids[rows], self.metal_levels[rows], area_index.astype(int),
+                          self.area_states[used_areas], self.area_ids[used_areas], self.premiums[rows],
+                          self.family_tiers[rows])
+
+    def _area_cube(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Curves of the selected rows packed into an areas x plans x ages cube padded with NaN,
+        plus the number of plans per area
+        """
+        keys = self.area_index[rows]
+        curves = self.premiums[rows]
+        order = np.argsort(keys, kind='stable')
+        keys, curves = keys[order], curves[order]
+        counts = np.bincount(keys, minlength=len(self.area_states))
+        position = np.arange(len(keys)) - (np.cumsum(counts) - counts)[keys]
+        cube = np.full((len(counts), counts.max(), MAX_AGE + 1), np.nan)
+        cube[keys, position] = curves
+        return cube, counts
+
+    def benchmark(self, metal_level: Optional[str] = "Silver", method: str = "lowest",
+                  percentile: float = 50.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Benchmark premium per rating area and age, computed for all areas and ages at once.
+        Returns (area_states, area_ids, premiums[areas, ages]); areas with no matching plan are omitted.
+        """
+        if method not in BENCHMARK_METHODS:
+            raise ValueError(f"Unknown benchmark method '{method}', expected one of {BENCHMARK_METHODS}")
+        rows = np.ones(len(self), dtype=bool)
+        if metal_level:
+            rows &= self.metal_levels == metal_level.lower()
+        if not rows.any():
+            return np.array([], dtype=object), np.array([], dtype=object), np.empty((0, MAX_AGE + 1))
+        cube, counts = self._area_cube(rows)
+
+        if method == "percentile":
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN ages in sparse areas
+                table = np.nanpercentile(cube, percentile, axis=1)
+        else:
+            ranked = np.sort(cube, axis=1)  # NaN sorts last
+            available = np.sum(~np.isnan(cube), axis=1)
+            rank = 0 if method == "lowest" else np.clip(available - 1, 0, 1)
+            table = np.take_along_axis(ranked, np.broadcast_to(rank, available.shape)[:, None, :], axis=1)[:, 0, :]
+
+        present = counts > 0
+        return self.area_states[present], self.area_ids[present], table[present]
+
+    def lowest_premiums(self, metal_levels: Sequence[str], count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The count cheapest premiums per rating area and age among plans of the given metal levels, ascending.
+        Returns (area_states, area_ids, premiums[areas, ages, count]), NaN-padded where an area has fewer plans.
+        """
+        rows = np.isin(self.metal_levels, [level.lower() for level in metal_levels])
+        if not rows.any():
+            return np.array([], dtype=object), np.array([], dtype=object), np.empty((0, MAX_AGE + 1, count))
+        cube, counts = self._area_cube(rows)
+        ranked = np.sort(cube, axis=1)[:, :count, :]  # NaN sorts last
+        if ranked.shape[1] < count:
+            ranked = np.concatenate([ranked, np.full((len(counts), count - ranked.shape[1], MAX_AGE + 1), np.nan)], axis=1)
+        present = counts > 0
+        return self.area_states[present], self.area_ids[present], ranked[present].transpose(0, 2, 1)
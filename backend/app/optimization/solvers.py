@@ -0,0 +1,194 @@
+import logging
+import math
+import threading
+import time
+import pulp
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional
+from app.core.config import settings
+
+try:
+    import highspy
+except ImportError:  # optional: in-process HiGHS backend
+    highspy = None
+
+logger = logging.getLogger("ichra.solvers")
+
+@dataclass(frozen=True)
+class SolveStats:
+    backend: str
+    status: str
+    objective_value: Optional[float]
+    solve_time_ms: float
+    num_variables: int
+    num_constraints: int
+    mip_gap: Optional[float] = None
+    warm_started: bool = False
+
+class SolverBackend(ABC):
+    """
+    Solves a built pulp.LpProblem in place (variable values and problem.status are set as problem.solve() would)
+    and returns per-solve statistics. Backends are stateless apart from counters, so one instance is shared.
+    """
+    name = "base"
+
+    def __init__(self, time_limit: Optional[float] = None, mip_gap: Optional[float] = None,
+                 threads: Optional[int] = None):
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.threads = threads
+        self._counters: Dict[str, float] = {"solves": 0, "total_time_ms": 0.0, "not_optimal": 0}
+        self._counters_lock = threading.Lock()
+
+    def solve(self, problem: pulp.LpProblem, warm_start: bool = False) -> SolveStats:
+        start = time.perf_counter()
+        mip_gap = self._solve(problem, warm_start)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        status = pulp.LpStatus[problem.status]
+        stats = SolveStats(
+            backend=self.name,
+            status=status,
+            objective_value=pulp.value(problem.objective) if problem.status == pulp.LpStatusOptimal else None,
+            solve_time_ms=elapsed_ms,
+            num_variables=problem.numVariables(),
+            num_constraints=problem.numConstraints(),
+            mip_gap=mip_gap,
+            warm_started=warm_start
+        )
+        with self._counters_lock:
+            self._counters["solves"] += 1
+            self._counters["total_time_ms"] += elapsed_ms
+            self._counters["not_optimal"] += problem.status != pulp.LpStatusOptimal
+        return stats
+
+    @abstractmethod
+    def _solve(self, problem: pulp.LpProblem, warm_start: bool) -> Optional[float]:
+        """
+        Solve in place and return the relative MIP gap when the backend reports one
+        """
+
+    def summary(self) -> Dict[str, float]:
+        with self._counters_lock:
+            counters = dict(self._counters)
+        solves = counters["solves"]
+        return {
+            "backend": self.name,
+            "solves": int(solves),
+            "not_optimal": int(counters["not_optimal"]),
+            "mean_solve_time_ms": round(counters["total_time_ms"] / solves, 3) if solves else 0.0,
+        }
+
+class CbcBackend(SolverBackend):
+    """
+    PuLP's bundled CBC. Each solve writes an MPS file and runs a CBC subprocess.
+    """
+    name = "cbc"
+
+    def _solve(self, problem: pulp.LpProblem, warm_start: bool) -> Optional[float]:
+        problem.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=self.time_limit, gapRel=self.mip_gap,
+                                        threads=self.threads, warmStart=warm_start))
+        return None
+
+class HighsBackend(SolverBackend):
+    """
+    HiGHS through its Python bindings (highspy). The model is passed in memory and solved in-process:
+    no temp files and no subprocess per solve.
+    """
+    name = "highs"
+
+    def __init__(self, *args, **kwargs):
+        if highspy is None:
+            raise RuntimeError("The HiGHS backend needs the highspy package")
+        super().__init__(*args, **kwargs)
+
+    def _solve(self, problem: pulp.LpProblem, warm_start: bool) -> Optional[float]:
+        variables = problem.variables()
+        columns = {variable: i for i, variable in enumerate(variables)}
+        inf = highspy.kHighsInf
+
+        lp = highspy.HighsLp()
+        lp.num_col_ = len(variables)
+        lp.num_row_ = len(problem.constraints)
+        costs = [0.0] * len(variables)
+        for variable, coefficient in problem.objective.items():
+            costs[columns[variable]] = coefficient
+        lp.col_cost_ = costs
+        lp.offset_ = problem.objective.constant
+        lp.sense_ = highspy.ObjSense.kMaximize if problem.sense == pulp.LpMaximize else highspy.ObjSense.kMinimize
+        lp.col_lower_ = [-inf if v.lowBound is None else v.lowBound for v in variables]
+        lp.col_upper_ = [inf if v.upBound is None else v.upBound for v in variables]
+        lp.integrality_ = [highspy.HighsVarType.kInteger if v.cat == pulp.LpInteger else highspy.HighsVarType.kContinuous
+                           for v in variables]
+
+        # Row-wise constraint matrix; a pulp constraint is "expression + constant (sense) 0"
+        starts, indices, values, row_lower, row_upper = [0], [], [], [], []
+        for constraint in problem.constraints.values():
+            for variable, coefficient in constraint.items():
+                indices.append(columns[variable])
+                values.append(coefficient)
+            starts.append(len(indices))
+            rhs = -constraint.constant
+            row_lower.append(rhs if constraint.sense != pulp.LpConstraintLE else -inf)
+            row_upper.append(rhs if constraint.sense != pulp.LpConstraintGE else inf)
+        lp.row_lower_ = row_lower
+        lp.row_upper_ = row_upper
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        lp.a_matrix_.start_ = starts
+        lp.a_matrix_.index_ = indices
+        lp.a_matrix_.value_ = values
+
+        highs = highspy.Highs()
+        highs.setOptionValue("output_flag", False)
+        if self.time_limit is not None:
+            highs.setOptionValue("time_limit", float(self.time_limit))
+        if self.mip_gap is not None:
+            highs.setOptionValue("mip_rel_gap", float(self.mip_gap))
+        if self.threads is not None:
+            highs.setOptionValue("threads", int(self.threads))
+        highs.passModel(lp)
+        if warm_start:
+            start = highspy.HighsSolution()
+            start.col_value = [v.varValue if v.varValue is not None else 0.0 for v in variables]
+            highs.setSolution(start)
+        highs.run()
+
+        model_status = highs.getModelStatus()
+        solution = highs.getSolution()
+        has_solution = highs.getInfo().primal_solution_status == highspy.SolutionStatus.kSolutionStatusFeasible
+        if model_status == highspy.HighsModelStatus.kOptimal or has_solution:
+            # Like CBC under a time limit, a feasible incumbent is reported as solved
+            problem.assignStatus(pulp.LpStatusOptimal,
+                                 pulp.LpSolutionOptimal if model_status == highspy.HighsModelStatus.kOptimal
+                                 else pulp.LpSolutionIntegerFeasible)
+            for variable, value in zip(variables, solution.col_value):
+                variable.varValue = round(value) if variable.cat == pulp.LpInteger else value
+        elif model_status == highspy.HighsModelStatus.kInfeasible:
+            problem.assignStatus(pulp.LpStatusInfeasible)
+        elif model_status in (highspy.HighsModelStatus.kUnbounded, highspy.HighsModelStatus.kUnboundedOrInfeasible):
+            problem.assignStatus(pulp.LpStatusUnbounded)
+        else:
+            problem.assignStatus(pulp.LpStatusNotSolved)
+        mip_gap = highs.getInfo().mip_gap
+        # No gap without both an incumbent and a bound (HiGHS reports inf or nan then)
+        return mip_gap if math.isfinite(mip_gap) and any(v.cat == pulp.LpInteger for v in variables) else None
+
+SOLVER_BACKENDS = {"cbc": CbcBackend, "highs": HighsBackend}
+
+def get_solver_backend(name: Optional[str] = None) -> SolverBackend:
+    """
+    Backend named by SOLVER_BACKEND: "cbc", "highs", or "auto" (HiGHS when highspy is installed, else CBC)
+    """
+    name = (name or settings.SOLVER_BACKEND).lower()
+    if name == "auto":
+        name = "highs" if highspy is not None else "cbc"
+    if name not in SOLVER_BACKENDS:
+        raise ValueError(f"Unknown solver backend '{name}'; expected one of auto, {', '.join(SOLVER_BACKENDS)}")
+    if name == "highs" and highspy is None:
+        logger.warning("highspy is not installed; falling back to CBC")
+        name = "cbc"
+    return SOLVER_BACKENDS[name](
+        time_limit=settings.SOLVER_TIME_LIMIT_SECONDS or None,
+        mip_gap=settings.SOLVER_MIP_GAP,
+        threads=settings.SOLVER_THREADS or None
+    )
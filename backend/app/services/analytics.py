@@ -0,0 +1,181 @@
+import logging
+import math
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+import pandas as pd
+from app.models.records import PLAN_RECORD_FIELDS
+
+if TYPE_CHECKING:
+    from app.services.data_service import DataService
+
+logger = logging.getLogger(__name__)
+
+# PUF tables registered next to plans: table -> (PUF kind, PUF column -> SQL column)
+PUF_TABLES = {
+    'rates': ('rate', {
+        'PlanId': 'plan_id',
+        'StateCode': 'state_code',
+        'IssuerId': 'issuer_id',
+        'RatingAreaId': 'rating_area_id',
+        'Tobacco': 'tobacco',
+        'Age': 'age',
+        'IndividualRate': 'individual_rate',
+        'IndividualTobaccoRate': 'individual_tobacco_rate',
+    }),
+    'benefits': ('benefits', {
+        'PlanId': 'plan_id',
+        'StandardComponentId': 'standard_component_id',
+        'StateCode': 'state_code',
+        'IssuerId': 'issuer_id',
+        'BenefitName': 'benefit_name',
+        'IsEHB': 'is_ehb',
+        'IsCovered': 'is_covered',
+    }),
+}
+
+# Indexes per table, chosen for the usual filters (state, metal level, issuer) and the joins on plan ids
+TABLE_INDEXES = {
+    'plans': (('state_code', 'metal_level'), ('issuer_id',), ('standard_component_id',), ('monthly_premium',)),
+    'rates': (('plan_id',), ('state_code', 'rating_area_id', 'age')),
+    'benefits': (('standard_component_id',), ('plan_id',), ('state_code', 'benefit_name')),
+}
+
+# Statements may only read; everything else (writes, ATTACH, PRAGMA, temp tables) is denied
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+# Virtual machine instructions between checks of the statement deadline
+_PROGRESS_STEPS = 10_000
+
+class QueryTimeoutError(Exception):
+    """Raised when a statement runs past its time limit"""
+    def __init__(self, seconds: float):
+        super().__init__(f"Query exceeded its {seconds:g}s time limit")
+        self.seconds = seconds
+
+class _Percentile:
+    # percentile(value, p) with p in [0, 100], linear interpolation like numpy's default
+    def __init__(self):
+        self.values: List[float] = []
+        self.p: Optional[float] = None
+
+    def step(self, value, p=50.0):
+        if value is not None:
+            self.values.append(float(value))
+            self.p = float(p)
+
+    def finalize(self):
+        if not self.values:
+            return None
+        values = sorted(self.values)
+        rank = (len(values) - 1) * min(max(self.p, 0.0), 100.0) / 100.0
+        low = math.floor(rank)
+        high = min(low + 1, len(values) - 1)
+        return values[low] + (values[high] - values[low]) * (rank - low)
+
+class _Median(_Percentile):
+    def step(self, value):
+        super().step(value, 50.0)
+
+class AnalyticsEngine:
+    """
+    The plan table and the Rate and Benefits PUFs loaded into an in-process SQLite database with indexes, for
+    ad-hoc aggregate queries ("median silver premium by issuer in FL"). Statements are read-only (enforced
+    by an authorizer), one per call, limited in run time and in rows returned. Adds median(x) and
+    percentile(x, p) aggregates. The database is built once per published dataset and queried on a single
+    connection, so statements run one at a time and never touch the optimizers' data structures.
+    """
+    def __init__(self, data_service: "DataService"):
+        self.dataset_version = data_service.dataset_version
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(":memory:", check_same_thread=False)
+        self._connection.create_aggregate("median", 1, _Median)
+        self._connection.create_aggregate("percentile", 2, _Percentile)
+        start = time.perf_counter()
+        self._load(data_service)
+        self._connection.execute("ANALYZE")
+        self._connection.execute("PRAGMA query_only = ON")
+        self._connection.set_authorizer(self._authorize)
+        logger.info(f"Built analytics tables in {time.perf_counter() - start:.2f}s")
+
+    def _load(self, data_service: "DataService"):
+        plans = pd.DataFrame.from_records([tuple(getattr(plan, name) for name in PLAN_RECORD_FIELDS)
+                                           for plan in data_service.plans_cache or []],
+                                          columns=list(PLAN_RECORD_FIELDS))
+        plans['standard_component_id'] = plans['plan_id'].astype(str).str[:14]
+        self._register('plans', plans)
+        for table, (kind, columns) in PUF_TABLES.items():
+            # Raises PufUnavailableError on an attached worker that can read the PUF from neither snapshot nor store
+            frame = data_service.get_puf_frame(kind)
+            if frame is None:
+                frame = pd.DataFrame(columns=list(columns))
+            present = [column for column in columns if column in frame.columns]
+            frame = frame[present].rename(columns=columns)
+            for column in frame.columns:
+                if isinstance(frame[column].dtype, pd.CategoricalDtype):
+                    frame[column] = frame[column].astype(object)
+            self._register(table, frame)
+
+    def _register(self, table: str, frame: pd.DataFrame):
+        frame.to_sql(table, self._connection, index=False, chunksize=100_000)
+        for columns in TABLE_INDEXES.get(table, ()):
+            if all(column in frame.columns for column in columns):
+                self._connection.execute(f"CREATE INDEX {table}_{'_'.join(columns)} ON {table} ({', '.join(columns)})")
+
+    def _authorize(self, action, arg1, arg2, database, trigger):
+        return sqlite3.SQLITE_OK if action in _ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+    def schema(self) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Tables and their columns with SQLite types
+        """
+        with self._lock:
+            self._connection.set_authorizer(None)
+            try:
+                tables = [row[0] for row in self._connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+                return {table: [{"name": row[1], "type": row[2]}
+                                for row in self._connection.execute(f"PRAGMA table_info({table})")]
+                        for table in tables}
+            finally:
+                self._connection.set_authorizer(self._authorize)
+
+    def query(self, sql: str, params: Sequence[Any] = (), max_rows: int = 10_000,
+              timeout_seconds: float = 5.0) -> Dict[str, Any]:
+        """
+        Run one read-only statement. Raises ValueError for invalid or disallowed statements and
+        QueryTimeoutError when waiting for the connection and running take longer than timeout_seconds (0
+        disables the limit). At most max_rows rows are returned; truncated reports whether more were available.
+        BLOB values are returned as hex strings.
+        """
+        deadline = time.monotonic() + timeout_seconds if timeout_seconds > 0 else None
+        if not self._lock.acquire(timeout=timeout_seconds if deadline is not None else -1):
+            raise QueryTimeoutError(timeout_seconds)
+        try:
+            self._connection.set_progress_handler(
+                (lambda: int(time.monotonic() > deadline)) if deadline is not None else None, _PROGRESS_STEPS)
+            start = time.perf_counter()
+            try:
+                cursor = self._connection.execute(sql, list(params))
+                rows = cursor.fetchmany(max_rows + 1)
+            except sqlite3.OperationalError as e:
+                if deadline is not None and time.monotonic() > deadline and "interrupted" in str(e):
+                    raise QueryTimeoutError(timeout_seconds) from e
+                raise ValueError(str(e)) from e
+            except (sqlite3.DatabaseError, sqlite3.Warning, sqlite3.ProgrammingError) as e:
+                raise ValueError(str(e)) from e
+            finally:
+                self._connection.set_progress_handler(None, 0)
+            columns = [column[0] for column in cursor.description or []]
+            cursor.close()
+        finally:
+            self._lock.release()
+        return {
+            "columns": columns,
+            "rows": [[value.hex() if isinstance(value, bytes) else value for value in row] for row in rows[:max_rows]],
+            "row_count": min(len(rows), max_rows),
+            "truncated": len(rows) > max_rows,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+            "dataset_version": self.dataset_version,
+        }
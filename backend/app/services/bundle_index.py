@@ -0,0 +1,159 @@
+import time
+import uuid
+from typing import Dict, List, Optional, Set, Tuple
+from app.models.domain import Bundle
+
+# Key layout. Bundle documents live under "bundle:<id>"; the indexes use their own prefix so that
+# get_bundles' "bundle:*" scan never sees them.
+BUNDLE_PREFIX = "bundle"
+INDEX_PREFIX = "bundle_idx"
+
+# Sorted set of bundle ids scored by total monthly premium; every search intersects with it
+PREMIUM_INDEX = f"{INDEX_PREFIX}:premium"
+
+# Sorted set of bundle ids scored by the time their document expires; searches drop expired ids from it
+# first and intersect with it, so they only see live bundles
+EXPIRY_INDEX = f"{INDEX_PREFIX}:expires"
+
+# Facets kept as one set of bundle ids per value
+INDEXED_FACETS = ('benefit_type', 'provider', 'network_type', 'coverage_level', 'status')
+
+# Scratch keys created by a search expire on their own if the client dies before deleting them
+SCRATCH_TTL_SECONDS = 30
+
+def bundle_key(bundle_id: str) -> str:
+    return f"{BUNDLE_PREFIX}:{bundle_id}"
+
+def facet_key(facet: str, value: str) -> str:
+    return f"{INDEX_PREFIX}:{facet}:{str(value).strip().casefold()}"
+
+def bundle_terms(bundle: Bundle) -> Dict[str, Set[str]]:
+    """
+    Facet values a bundle is indexed under. Coverage level is not a Bundle field; it is read from the
+    metadata create_bundle records.
+    """
+    terms = {
+        'benefit_type': {benefit.type.value for benefit in bundle.benefits},
+        'provider': {benefit.provider for benefit in bundle.benefits if benefit.provider},
+        'network_type': {benefit.network_type for benefit in bundle.benefits if benefit.network_type},
+        'coverage_level': set(),
+        'status': {bundle.status.value},
+    }
+    coverage_level = bundle.metadata.get('coverage_level')
+    if coverage_level:
+        terms['coverage_level'].add(str(coverage_level))
+    return terms
+
+def _decode(items) -> List[str]:
+    return [item.decode() if isinstance(item, bytes) else item for item in items]
+
+class RedisBundleIndex:
+    """
+    Secondary indexes for bundles stored in Redis, maintained on every write: a sorted set by total monthly
+    premium and one set per facet value (benefit type, provider, network type, coverage level, status).
+    Each bundle also records the index keys it was added to, so an update or delete removes exactly those
+    entries. A search intersects the indexes on the server and pages through the result in premium order,
+    taking two round-trips (one for the ids, one to fetch the documents). Expiry times are indexed too: the
+    search drops expired ids before intersecting, then removes them from the other indexes.
+    """
+    def __init__(self, client):
+        self.client = client
+
+    def _terms_key(self, bundle_id: str) -> str:
+        return f"{INDEX_PREFIX}:terms:{bundle_id}"
+
+    def _unindex(self, pipe, bundle_id: str, keys):
+        for key in keys:
+            pipe.srem(key, bundle_id)
+        pipe.zrem(PREMIUM_INDEX, bundle_id)
+        pipe.zrem(EXPIRY_INDEX, bundle_id)
+        pipe.delete(self._terms_key(bundle_id))
+
+    def save(self, bundle: Bundle, payload: str, ttl_seconds: int):
+        old_keys = self.client.smembers(self._terms_key(bundle.id))
+        new_keys = [facet_key(facet, value) for facet, values in bundle_terms(bundle).items() for value in values]
+        pipe = self.client.pipeline()
+        self._unindex(pipe, bundle.id, old_keys)
+        pipe.setex(bundle_key(bundle.id), ttl_seconds, payload)
+        pipe.zadd(PREMIUM_INDEX, {bundle.id: float(bundle.total_monthly_premium)})
+        pipe.zadd(EXPIRY_INDEX, {bundle.id: time.time() + ttl_seconds})
+        for key in new_keys:
+            pipe.sadd(key, bundle.id)
+        if new_keys:
+            pipe.sadd(self._terms_key(bundle.id), *new_keys)
+        pipe.execute()
+
+    def delete(self, bundle_id: str) -> bool:
+        old_keys = self.client.smembers(self._terms_key(bundle_id))
+        pipe = self.client.pipeline()
+        self._unindex(pipe, bundle_id, old_keys)
+        pipe.delete(bundle_key(bundle_id))
+        return pipe.execute()[-1] > 0
+
+    def search(self, benefit_types: Optional[List[str]] = None, providers: Optional[List[str]] = None,
+               network_type: Optional[str] = None, coverage_level: Optional[str] = None,
+               status: Optional[str] = None, max_budget: Optional[float] = None,
+               limit: int = 10, offset: int = 0) -> Tuple[List[str], int]:
+        """
+        Ids of the bundles matching every given filter, cheapest first, and the total number of matches.
+        A bundle must include all requested benefit types and any of the requested providers.
+        """
+        sources = [facet_key('benefit_type', value) for value in benefit_types or []]
+        sources += [facet_key(facet, value) for facet, value in
+                    (('network_type', network_type), ('coverage_level', coverage_level), ('status', status)) if value]
+        now = time.time()
+        pipe = self.client.pipeline()
+        # Expired ids are read (for the clean-up below) and removed before anything is intersected
+        pipe.zrangebyscore(EXPIRY_INDEX, "-inf", now)
+        pipe.zremrangebyscore(EXPIRY_INDEX, "-inf", now)
+        scratch = []
+        if providers:
+            scratch.append(f"{INDEX_PREFIX}:tmp:{uuid.uuid4().hex}")
+            pipe.sunionstore(scratch[-1], [facet_key('provider', value) for value in providers])
+            sources.append(scratch[-1])
+        target = f"{INDEX_PREFIX}:tmp:{uuid.uuid4().hex}"
+        scratch.append(target)
+        # The expiry set and the facet sets are weighted 0 so the result keeps the premium as its score
+        pipe.zinterstore(target, {PREMIUM_INDEX: 1, EXPIRY_INDEX: 0, **{key: 0 for key in sources}})
+        for key in scratch:
+            pipe.expire(key, SCRATCH_TTL_SECONDS)
+        high = "+inf" if max_budget is None else max_budget
+        pipe.zcount(target, "-inf", high)
+        pipe.zrangebyscore(target, "-inf", high, start=offset, num=limit)
+        pipe.delete(*scratch)
+        results = pipe.execute()
+        expired, total, ids = results[0], results[-3], results[-2]
+        if expired:
+            self._drop(_decode(expired))
+        return _decode(ids), total
+
+    def _drop(self, bundle_ids: List[str]):
+        # Remove expired bundles from the premium and facet indexes (their documents are already gone). An id
+        # back in the expiry index was saved again since, and is left alone.
+        pipe = self.client.pipeline()
+        for bundle_id in bundle_ids:
+            pipe.zscore(EXPIRY_INDEX, bundle_id)
+            pipe.smembers(self._terms_key(bundle_id))
+        results = pipe.execute()
+        pipe = self.client.pipeline()
+        for bundle_id, score, keys in zip(bundle_ids, results[::2], results[1::2]):
+            if score is None:
+                self._unindex(pipe, bundle_id, keys)
+        pipe.execute()
+
+    def fetch(self, bundle_ids: List[str]) -> List[Bundle]:
+        """
+        Bundles for the given ids, in order. Ids whose document is missing anyway (evicted, or expired by the
+        server's clock just before the index's) are dropped from the indexes.
+        """
+        if not bundle_ids:
+            return []
+        bundles, stale = [], []
+        for bundle_id, payload in zip(bundle_ids, self.client.mget([bundle_key(i) for i in bundle_ids])):
+            if payload is None:
+                stale.append(bundle_id)
+            else:
+                bundles.append(Bundle.model_validate_json(payload))
+        for bundle_id in stale:
+            self.delete(bundle_id)
+        return bundles
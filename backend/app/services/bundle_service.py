@@ -1,7 +1,8 @@
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.models.domain import Bundle, BundleRequest, Benefit, EmployeeProfile, BundleResult
+from app.models.schemas import BundleSearchRequest
 from app.services.data_service import DataService
 from app.optimization.bundler import BundleOptimizer, BenefitBundler
 import logging
@@ -46,7 +47,9 @@ class BundleService:
             total_annual_deductible=total_annual_deductible,
             total_max_out_of_pocket=total_max_out_of_pocket,
             created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            updated_at=datetime.utcnow(),
+            # Kept so searches can filter on it; Bundle has no coverage level of its own
+            metadata={"coverage_level": bundle_request.coverage_level.value}
         )
         
         # Save bundle
@@ -91,13 +94,14 @@ class BundleService:
         """
         return await self.data_service.delete_bundle(bundle_id)
     
-    async def search_bundles(self, search_criteria: dict) -> List[Bundle]:
+    async def search_bundles(self, search_criteria: BundleSearchRequest, limit: int = 10,
+                             offset: int = 0) -> Tuple[List[Bundle], int]:
         """
-        Search bundles based on criteria
+        Search bundles based on criteria using the data store's indexes; returns one page and the total count
         """
-        # This would implement search logic based on criteria
-        # For now, return all bundles
-        return await self.data_service.get_bundles()
+        if isinstance(search_criteria, dict):
+            search_criteria = BundleSearchRequest(**search_criteria)
+        return await self.data_service.search_bundles(search_criteria, limit=limit, offset=offset)
     
     async def compare_bundles(self, bundle_ids: List[str]) -> dict:
         """
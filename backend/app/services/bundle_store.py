@@ -0,0 +1,363 @@
+import logging
+import sqlite3
+from abc import ABC, abstractmethod
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.models.domain import Bundle
+from app.models.schemas import BundleSearchRequest
+from app.services.bundle_index import RedisBundleIndex, bundle_key, bundle_terms, facet_key
+
+try:
+    import redis
+except ImportError:  # only the redis backend needs it
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds a saved bundle is kept
+BUNDLE_TTL_SECONDS = 3600
+
+def search_filters(criteria: BundleSearchRequest) -> Dict[str, Any]:
+    """
+    Search criteria as the plain values every backend filters on
+    """
+    return {
+        'benefit_types': [bt.value for bt in criteria.benefit_types or []],
+        'providers': criteria.providers or [],
+        'network_type': criteria.network_type,
+        'coverage_level': criteria.coverage_level.value if criteria.coverage_level else None,
+        'status': criteria.status.value if criteria.status else None,
+        'max_budget': criteria.max_budget,
+    }
+
+def _required_terms(filters: Dict[str, Any]) -> List[Tuple[str, str]]:
+    # Facet values a match must have (all of them); providers are handled separately (any of them)
+    terms = [('benefit_type', value) for value in filters['benefit_types']]
+    terms += [(facet, filters[facet]) for facet in ('network_type', 'coverage_level', 'status') if filters[facet]]
+    return [(facet, facet_key(facet, value)) for facet, value in terms]
+
+class BundleStore(ABC):
+    """
+    Persistence for saved bundles. Every backend keeps bundles for ttl_seconds and answers searches cheapest
+    first with the same semantics: all requested benefit types, any requested provider, the other facets
+    exact (case-insensitive), and total monthly premium at most max_budget.
+    """
+    name = "base"
+
+    def __init__(self, ttl_seconds: int = BUNDLE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    def save(self, bundle: Bundle):
+        ...
+
+    @abstractmethod
+    def get(self, bundle_id: str) -> Optional[Bundle]:
+        ...
+
+    @abstractmethod
+    def list(self, limit: int = 10, offset: int = 0) -> List[Bundle]:
+        ...
+
+    @abstractmethod
+    def delete(self, bundle_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def search(self, criteria: BundleSearchRequest, limit: int = 10, offset: int = 0) -> Tuple[List[Bundle], int]:
+        ...
+
+    def flush(self):
+        """
+        Write out anything buffered; a no-op for backends that write through
+        """
+
+    def close(self):
+        self.flush()
+
+class MemoryBundleStore(BundleStore):
+    """
+    Bundles in a dict of this process, with the facet indexes as sets. Nothing survives a restart and nothing
+    is shared between workers, which suits tests and single-process deployments.
+    """
+    name = "memory"
+
+    def __init__(self, ttl_seconds: int = BUNDLE_TTL_SECONDS):
+        super().__init__(ttl_seconds)
+        self._lock = threading.Lock()
+        self._bundles: Dict[str, Tuple[Bundle, float]] = {}
+        self._index: Dict[str, set] = {}
+        self._bundle_keys: Dict[str, List[str]] = {}
+
+    def _unindex(self, bundle_id: str):
+        for key in self._bundle_keys.pop(bundle_id, []):
+            self._index[key].discard(bundle_id)
+
+    def _live(self, bundle_id: str) -> Optional[Bundle]:
+        entry = self._bundles.get(bundle_id)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._bundles[bundle_id]
+            self._unindex(bundle_id)
+            return None
+        return entry[0]
+
+    def save(self, bundle: Bundle):
+        # Stored as a copy so later changes to the caller's object do not leak into the store
+        keys = [facet_key(facet, value) for facet, values in bundle_terms(bundle).items() for value in values]
+        with self._lock:
+            self._unindex(bundle.id)
+            self._bundles[bundle.id] = (bundle.model_copy(deep=True), time.time() + self.ttl_seconds)
+            for key in keys:
+                self._index.setdefault(key, set()).add(bundle.id)
+            self._bundle_keys[bundle.id] = keys
+
+    def get(self, bundle_id: str) -> Optional[Bundle]:
+        with self._lock:
+            bundle = self._live(bundle_id)
+        return bundle.model_copy(deep=True) if bundle is not None else None
+
+    def list(self, limit: int = 10, offset: int = 0) -> List[Bundle]:
+        with self._lock:
+            bundles = [bundle for bundle in map(self._live, list(self._bundles)) if bundle is not None]
+        return [bundle.model_copy(deep=True) for bundle in bundles[offset:offset + limit]]
+
+    def delete(self, bundle_id: str) -> bool:
+        with self._lock:
+            found = self._live(bundle_id) is not None
+            self._bundles.pop(bundle_id, None)
+            self._unindex(bundle_id)
+        return found
+
+    def search(self, criteria: BundleSearchRequest, limit: int = 10, offset: int = 0) -> Tuple[List[Bundle], int]:
+        filters = search_filters(criteria)
+        with self._lock:
+            candidates = None
+            for _, key in _required_terms(filters):
+                members = self._index.get(key, set())
+                candidates = set(members) if candidates is None else candidates & members
+            if filters['providers']:
+                providers = set().union(*(self._index.get(facet_key('provider', value), set())
+                                          for value in filters['providers']))
+                candidates = providers if candidates is None else candidates & providers
+            matches = [bundle for bundle in map(self._live, list(self._bundles) if candidates is None else candidates)
+                       if bundle is not None and (filters['max_budget'] is None
+                                                  or bundle.total_monthly_premium <= filters['max_budget'])]
+        matches.sort(key=lambda bundle: (bundle.total_monthly_premium, bundle.id))
+        return [bundle.model_copy(deep=True) for bundle in matches[offset:offset + limit]], len(matches)
+
+class SqliteBundleStore(BundleStore):
+    """
+    Bundles in an embedded SQLite database: one row per bundle (indexed by premium) and one row per facet
+    value in bundle_terms, keyed by facet value and premium so each value reads as a premium-ordered list
+    without touching the bundle rows. A search intersects those lists and only joins the page it returns
+    back to the bundle documents. Writes are buffered and flushed in one transaction by a background thread
+    every flush_interval seconds, or as soon as batch_size writes are pending; reads of a buffered bundle are
+    answered from the buffer, and listings and searches flush first. flush_interval 0 writes through. A
+    failed flush keeps its writes buffered for the next one, so save and delete never fail because of it.
+    """
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS bundles (
+            id TEXT PRIMARY KEY,
+            total_monthly_premium REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            payload TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS bundles_premium ON bundles (total_monthly_premium, id, expires_at);
+        CREATE INDEX IF NOT EXISTS bundles_expires ON bundles (expires_at);
+        CREATE TABLE IF NOT EXISTS bundle_terms (
+            term TEXT NOT NULL,
+            total_monthly_premium REAL NOT NULL,
+            bundle_id TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (term, total_monthly_premium, bundle_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS bundle_terms_bundle ON bundle_terms (bundle_id);
+    """
+
+    def __init__(self, path: str = ":memory:", ttl_seconds: int = BUNDLE_TTL_SECONDS,
+                 flush_interval: float = 0.5, batch_size: int = 256):
+        super().__init__(ttl_seconds)
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._pending: Dict[str, Optional[Tuple[Bundle, float]]] = {}
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(self.SCHEMA)
+        self._stopped = threading.Event()
+        self._flusher = None
+        if flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="bundle-store-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing bundle writes: {e}")
+
+    def _buffer(self, bundle_id: str, entry: Optional[Tuple[Bundle, float]]):
+        with self._lock:
+            self._pending[bundle_id] = entry
+            if self.flush_interval <= 0 or len(self._pending) >= self.batch_size:
+                try:
+                    self.flush()
+                except Exception as e:
+                    # The write stays buffered and goes out with the next flush, so it is not reported as failed
+                    logger.error(f"Error flushing bundle writes; will retry: {e}")
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            ids = [(bundle_id,) for bundle_id in pending]
+            rows, terms = [], []
+            for bundle_id, entry in pending.items():
+                if entry is None:
+                    continue
+                bundle, expires_at = entry
+                premium = float(bundle.total_monthly_premium)
+                rows.append((bundle_id, premium, expires_at, bundle.model_dump_json()))
+                terms += [(facet_key(facet, value), premium, bundle_id, expires_at)
+                          for facet, values in bundle_terms(bundle).items() for value in values]
+            connection = self._connection
+            try:
+                connection.execute("BEGIN")
+                connection.executemany("DELETE FROM bundle_terms WHERE bundle_id = ?", ids)
+                connection.executemany("DELETE FROM bundles WHERE id = ?", ids)
+                connection.executemany("INSERT INTO bundles VALUES (?, ?, ?, ?)", rows)
+                connection.executemany("INSERT OR IGNORE INTO bundle_terms VALUES (?, ?, ?, ?)", terms)
+                now = time.time()
+                connection.execute("DELETE FROM bundle_terms WHERE bundle_id IN "
+                                   "(SELECT id FROM bundles WHERE expires_at <= ?)", (now,))
+                connection.execute("DELETE FROM bundles WHERE expires_at <= ?", (now,))
+                connection.execute("COMMIT")
+            except BaseException:
+                # Keep the writes for the next attempt unless they have been superseded meanwhile
+                self._pending = {**pending, **self._pending}
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+
+    def save(self, bundle: Bundle):
+        self._buffer(bundle.id, (bundle.model_copy(deep=True), time.time() + self.ttl_seconds))
+
+    def get(self, bundle_id: str) -> Optional[Bundle]:
+        with self._lock:
+            if bundle_id in self._pending:
+                entry = self._pending[bundle_id]
+                return entry[0].model_copy(deep=True) if entry is not None and entry[1] > time.time() else None
+            row = self._connection.execute("SELECT payload FROM bundles WHERE id = ? AND expires_at > ?",
+                                           (bundle_id, time.time())).fetchone()
+        return Bundle.model_validate_json(row[0]) if row else None
+
+    def list(self, limit: int = 10, offset: int = 0) -> List[Bundle]:
+        with self._lock:
+            self.flush()
+            rows = self._connection.execute("SELECT payload FROM bundles WHERE expires_at > ? ORDER BY id LIMIT ? OFFSET ?",
+                                            (time.time(), limit, offset)).fetchall()
+        return [Bundle.model_validate_json(row[0]) for row in rows]
+
+    def delete(self, bundle_id: str) -> bool:
+        with self._lock:
+            found = self.get(bundle_id) is not None
+            self._buffer(bundle_id, None)
+        return found
+
+    def search(self, criteria: BundleSearchRequest, limit: int = 10, offset: int = 0) -> Tuple[List[Bundle], int]:
+        filters = search_filters(criteria)
+        bounds = "expires_at > ?" + ("" if filters['max_budget'] is None else " AND total_monthly_premium <= ?")
+        bound_params = [time.time()] + ([] if filters['max_budget'] is None else [filters['max_budget']])
+        selects, params = [], []
+        for _, key in _required_terms(filters):
+            selects.append(f"SELECT total_monthly_premium, bundle_id FROM bundle_terms WHERE term = ? AND {bounds}")
+            params += [key, *bound_params]
+        if filters['providers']:
+            keys = [facet_key('provider', value) for value in filters['providers']]
+            # DISTINCT: a bundle from several of the requested providers has one row per provider
+            selects.append("SELECT DISTINCT total_monthly_premium, bundle_id FROM bundle_terms "
+                           f"WHERE term IN ({', '.join('?' * len(keys))}) AND {bounds}")
+            params += [*keys, *bound_params]
+        if not selects:
+            selects.append(f"SELECT total_monthly_premium, id AS bundle_id FROM bundles WHERE {bounds}")
+            params += bound_params
+        matches = " INTERSECT ".join(selects)
+        with self._lock:
+            self.flush()
+            total = self._connection.execute(f"SELECT COUNT(*) FROM ({matches})", params).fetchone()[0]
+            rows = self._connection.execute(
+                f"SELECT bundles.payload FROM (SELECT * FROM ({matches}) ORDER BY 1, 2 LIMIT ? OFFSET ?) AS page "
+                "JOIN bundles ON bundles.id = page.bundle_id ORDER BY page.total_monthly_premium, page.bundle_id",
+                [*params, limit, offset]).fetchall()
+        return [Bundle.model_validate_json(row[0]) for row in rows], total
+
+    def close(self):
+        self._stopped.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self.flush()
+            self._connection.close()
+
+class RedisBundleStore(BundleStore):
+    """
+    Bundles in Redis with a key TTL, searched through RedisBundleIndex. Shared by every worker and host
+    pointing at the same server.
+    """
+    name = "redis"
+
+    def __init__(self, client, ttl_seconds: int = BUNDLE_TTL_SECONDS):
+        super().__init__(ttl_seconds)
+        self.client = client
+        self.index = RedisBundleIndex(client)
+
+    def save(self, bundle: Bundle):
+        self.index.save(bundle, bundle.model_dump_json(), self.ttl_seconds)
+
+    def get(self, bundle_id: str) -> Optional[Bundle]:
+        payload = self.client.get(bundle_key(bundle_id))
+        return Bundle.model_validate_json(payload) if payload else None
+
+    def list(self, limit: int = 10, offset: int = 0) -> List[Bundle]:
+        bundle_keys = self.client.keys(bundle_key("*"))[offset:offset + limit]
+        payloads = self.client.mget(bundle_keys) if bundle_keys else []
+        return [Bundle.model_validate_json(payload) for payload in payloads if payload]
+
+    def delete(self, bundle_id: str) -> bool:
+        return self.index.delete(bundle_id)
+
+    def search(self, criteria: BundleSearchRequest, limit: int = 10, offset: int = 0) -> Tuple[List[Bundle], int]:
+        bundle_ids, total = self.index.search(**search_filters(criteria), limit=limit, offset=offset)
+        return self.index.fetch(bundle_ids), total
+
+BUNDLE_STORE_BACKENDS = {"memory": MemoryBundleStore, "sqlite": SqliteBundleStore, "redis": RedisBundleStore}
+
+def get_bundle_store(name: Optional[str] = None) -> BundleStore:
+    """
+    Backend named by BUNDLE_STORE_BACKEND: "memory", "sqlite" (BUNDLE_STORE_SQLITE_PATH) or "redis" (REDIS_URL)
+    """
+    name = (name or settings.BUNDLE_STORE_BACKEND).lower()
+    if name not in BUNDLE_STORE_BACKENDS:
+        raise ValueError(f"Unknown bundle store backend '{name}'; expected one of {', '.join(BUNDLE_STORE_BACKENDS)}")
+    if name == "sqlite":
+        return SqliteBundleStore(settings.BUNDLE_STORE_SQLITE_PATH,
+                                 flush_interval=settings.BUNDLE_STORE_FLUSH_INTERVAL_SECONDS,
+                                 batch_size=settings.BUNDLE_STORE_BATCH_SIZE)
+    if name == "redis":
+        if redis is None:
+            raise RuntimeError("The redis bundle store needs the redis package")
+        return RedisBundleStore(redis.from_url(settings.REDIS_URL))
+    return MemoryBundleStore()
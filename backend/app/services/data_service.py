@@ -1,26 +1,98 @@
-import redis
-import json
+import numpy as np
 import pandas as pd
 import logging
 import os
+import hashlib
+import threading
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Callable, Tuple
 from app.core.config import settings
-from app.models.domain import Benefit, Bundle, PlanFeature, CMSPlanAttributes, CMSServiceArea, CMSRate, CMSBenefits
+from app.services.puf_parsing import parse_cost_sharing, parse_yes_no, resolve_columns
+from app.services.puf_schema import read_puf_csv
+from app.services.plan_index import PlanIndex
+from app.services.load_progress import LoadProgress
+from app.services.puf_store import PufStore, pa
+from app.services.bundle_store import BundleStore, get_bundle_store
+from app.services.analytics import AnalyticsEngine
+from app.optimization.rate_curves import RateCurves
+from app.optimization.family_premium import FamilyPremiumCalculator
+from app.optimization.cost_model import ExpectedCostModel
+from app.models.records import PlanRecord, PLAN_RECORD_FIELDS
+from app.models.schemas import BundleSearchRequest
+from app.models.domain import NETWORK_TIERS, Benefit, Bundle, PlanFeature, CMSPlanAttributes, CMSServiceArea, CMSRate, CMSBenefits, PufFingerprint
+
+if TYPE_CHECKING:
+    from app.services.shared_dataset import DatasetSnapshot
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Expected PUF file names per data kind, formatted with the plan year
+PUF_FILE_PATTERNS = {
+    'plan_attributes': "plan-attributes-puf-{year}.csv",
+    'rate': "rate-puf-{year}.csv",
+    'benefits': "benefits-and-cost-sharing-puf-{year}.csv",
+    'service_area': "service-area-puf-{year}.csv"
+}
+
+# Candidate column names per plan field for generic CSV files, in order of preference
+GENERIC_COLUMN_ALIASES = {
+    'plan_id': ('PlanId', 'plan_id'),
+    'monthly_premium': ('IndividualRate', 'individual_rate', 'MonthlyPremium'),
+    'deductible': ('Deductible', 'deductible', 'AnnualDeductible'),
+    'out_of_pocket_max': ('OutOfPocketMax', 'out_of_pocket_max', 'MaxOutOfPocket'),
+    'actuarial_value': ('ActuarialValue', 'actuarial_value', 'AVCalculatorOutputNumber'),
+    'hsa_eligible': ('IsHSAEligible', 'is_hsa_eligible'),
+    'state_code': ('StateCode', 'state_code'),
+    'issuer_id': ('IssuerId', 'issuer_id'),
+    'plan_marketing_name': ('PlanMarketingName', 'plan_marketing_name'),
+    'metal_level': ('MetalLevel', 'metal_level'),
+    'plan_type': ('PlanType', 'plan_type'),
+    'market_coverage': ('MarketCoverage', 'market_coverage'),
+    'dental_only_plan': ('DentalOnlyPlan', 'dental_only_plan'),
+    'service_area_id': ('ServiceAreaId', 'service_area_id'),
+    'network_id': ('NetworkId', 'network_id')
+}
+
+# Actuarial value assumed per metal level when no better source exists
+METAL_LEVEL_DEFAULT_AV = {
+    'platinum': 0.9,
+    'gold': 0.8,
+    'silver': 0.7
+}
+
+class PufUnavailableError(Exception):
+    """Raised when the dataset has a PUF this worker cannot read (attached without a snapshot or store copy)"""
+    def __init__(self, kind: str):
+        super().__init__(f"The {kind} PUF is not available on this worker")
+        self.kind = kind
+
+# Log labels per data kind: (PUF name, record noun)
+PUF_LABELS = {
+    'plan_attributes': ("Plan Attributes", "plan attributes"),
+    'rate': ("Rate", "rate"),
+    'benefits': ("Benefits", "benefits"),
+    'service_area': ("Service Area", "service area")
+}
+
 class DataService:
     def __init__(self):
-        self.redis_client = redis.from_url(settings.REDIS_URL)
+        self.bundle_store: BundleStore = get_bundle_store(getattr(settings, "BUNDLE_STORE_BACKEND", None))
         self.cms_loaded = False
         self.plan_attributes_df = None
         self.rate_df = None
         self.benefits_df = None
         self.service_area_df = None
         self.plans_cache = None
+        self.data_directory = "data"
+        self.plan_year = "2025"
+        self.puf_fingerprints: Dict[str, PufFingerprint] = {}
+        self.dataset_version: Optional[str] = None
+        self._publish_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.load_progress = LoadProgress()
+        self._derived_cache: Dict[Any, Any] = {}
     
     async def get_benefits(self, benefit_types: Optional[List[str]] = None) -> List[Benefit]:
         """
@@ -69,15 +141,10 @@ class DataService:
     
     async def save_bundle(self, bundle: Bundle) -> bool:
         """
-        Save a bundle to the data store
+        Save a bundle to the data store and update its search indexes
         """
         try:
-            bundle_data = bundle.model_dump()
-            self.redis_client.setex(
-                f"bundle:{bundle.id}",
-                3600,  # 1 hour TTL
-                json.dumps(bundle_data)
-            )
+            self.bundle_store.save(bundle)
             return True
         except Exception as e:
             logger.error(f"Error saving bundle: {e}")
@@ -88,10 +155,7 @@ class DataService:
         Retrieve a bundle by ID
         """
         try:
-            bundle_data = self.redis_client.get(f"bundle:{bundle_id}")
-            if bundle_data:
-                return Bundle(**json.loads(bundle_data))
-            return None
+            return self.bundle_store.get(bundle_id)
         except Exception as e:
             logger.error(f"Error retrieving bundle: {e}")
             return None
@@ -101,180 +165,260 @@ class DataService:
         Retrieve multiple bundles with pagination
         """
         try:
-            # This is a simplified implementation
-            # In a real application, you'd use a proper database
-            bundle_keys = self.redis_client.keys("bundle:*")
-            bundles = []
-            
-            for key in bundle_keys[offset:offset + limit]:
-                bundle_data = self.redis_client.get(key)
-                if bundle_data:
-                    bundles.append(Bundle(**json.loads(bundle_data)))
-            
-            return bundles
+            return self.bundle_store.list(limit=limit, offset=offset)
         except Exception as e:
             logger.error(f"Error retrieving bundles: {e}")
             return []
     
     async def delete_bundle(self, bundle_id: str) -> bool:
         """
-        Delete a bundle by ID
+        Delete a bundle by ID, along with its index entries
         """
         try:
-            result = self.redis_client.delete(f"bundle:{bundle_id}")
-            return result > 0
+            return self.bundle_store.delete(bundle_id)
         except Exception as e:
             logger.error(f"Error deleting bundle: {e}")
             return False
 
-    def load_cms_data(self, data_directory: str = "data", plan_year: str = "2025") -> List[PlanFeature]:
+    async def search_bundles(self, criteria: BundleSearchRequest, limit: int = 10, offset: int = 0) -> Tuple[List[Bundle], int]:
+        """
+        One page of the bundles matching the criteria, cheapest first, and the total number of matches
+        """
+        try:
+            return self.bundle_store.search(criteria, limit=limit, offset=offset)
+        except Exception as e:
+            logger.error(f"Error searching bundles: {e}")
+            return [], 0
+
+    def load_cms_data(self, data_directory: str = "data", plan_year: str = "2025", force: bool = False) -> List[PlanRecord]:
         """
-        Load CMS PUF data from CSV files and transform into PlanFeature objects. Only loads once per process.
+        Load CMS PUF data from CSV files and transform into plan records. Only loads once per process
+        unless force is set; the new data is built off to the side and published in one step.
         """
-        if self.cms_loaded and self.plans_cache is not None:
+        if self.cms_loaded and self.plans_cache is not None and not force:
             logger.info("CMS data already loaded, using cached data.")
             return self.plans_cache
+        with self._load_lock:
+            # A caller that waited on a concurrent load can use its result
+            if self.cms_loaded and self.plans_cache is not None and not force:
+                return self.plans_cache
+            return self._load_cms_data(data_directory, plan_year)
+
+    def _load_cms_data(self, data_directory: str, plan_year: str) -> List[PlanRecord]:
+        progress = self.load_progress
+        progress.clear_stages()
         try:
             data_path = Path(data_directory)
             if not data_path.exists():
                 logger.warning(f"Data directory {data_directory} does not exist")
                 return []
-            puf_files = {
-                'plan_attributes': data_path / f"plan-attributes-puf-{plan_year}.csv",
-                'rate': data_path / f"rate-puf-{plan_year}.csv", 
-                'benefits': data_path / f"benefits-and-cost-sharing-puf-{plan_year}.csv",
-                'service_area': data_path / f"service-area-puf-{plan_year}.csv"
-            }
-            self.plan_attributes_df = None
-            self.rate_df = None
-            self.benefits_df = None
-            self.service_area_df = None
-            if puf_files['plan_attributes'].exists():
-                logger.info(f"Loading Plan Attributes PUF: {puf_files['plan_attributes']}")
-                self.plan_attributes_df = pd.read_csv(puf_files['plan_attributes'], low_memory=False, nrows=2500)
-                logger.info(f"Loaded {len(self.plan_attributes_df)} plan attributes records")
-            else:
-                logger.warning(f"Plan Attributes PUF not found: {puf_files['plan_attributes']}")
-            if puf_files['rate'].exists():
-                logger.info(f"Loading Rate PUF: {puf_files['rate']}")
-                self.rate_df = pd.read_csv(puf_files['rate'], low_memory=False, nrows=2500)
-                logger.info(f"Loaded {len(self.rate_df)} rate records")
-            else:
-                logger.warning(f"Rate PUF not found: {puf_files['rate']}")
-            if puf_files['benefits'].exists():
-                logger.info(f"Loading Benefits PUF: {puf_files['benefits']}")
-                self.benefits_df = pd.read_csv(puf_files['benefits'], low_memory=False, nrows=2500)
-                logger.info(f"Loaded {len(self.benefits_df)} benefits records")
-            else:
-                logger.warning(f"Benefits PUF not found: {puf_files['benefits']}")
-            if puf_files['service_area'].exists():
-                logger.info(f"Loading Service Area PUF: {puf_files['service_area']}")
-                self.service_area_df = pd.read_csv(puf_files['service_area'], low_memory=False, nrows=2500)
-                logger.info(f"Loaded {len(self.service_area_df)} service area records")
-            else:
-                logger.warning(f"Service Area PUF not found: {puf_files['service_area']}")
-            if self.plan_attributes_df is None and self.rate_df is None:
+            self.data_directory = data_directory
+            self.plan_year = plan_year
+            puf_files = self._puf_paths(data_path, plan_year)
+            frames = {}
+            for kind, path in puf_files.items():
+                with progress.stage(f"read_{kind}", path=str(path)) as stage:
+                    if path.exists():
+                        stage["bytes"] = path.stat().st_size
+                    frames[kind] = self._read_puf(kind, path)
+                    if frames[kind] is None:
+                        stage["status"] = "skipped"
+                    else:
+                        stage["rows"] = len(frames[kind])
+            with progress.stage("fingerprint"):
+                fingerprints = {
+                    kind: self._fingerprint_file(path)
+                    for kind, path in puf_files.items() if path.exists()
+                }
+            if frames['plan_attributes'] is None and frames['rate'] is None:
                 logger.info("PUF files not found, looking for generic CSV files...")
                 csv_files = list(data_path.glob("*.csv"))
                 if csv_files:
                     logger.info(f"Found {len(csv_files)} generic CSV files")
                     all_plans = []
                     for csv_file in csv_files:
-                        plans = self._parse_cms_csv(csv_file)
+                        with progress.stage(f"read_{csv_file.name}", path=str(csv_file),
+                                            bytes=csv_file.stat().st_size) as stage:
+                            plans = self._parse_cms_csv(csv_file)
+                            stage["rows"] = len(plans)
                         all_plans.extend(plans)
-                    self.plans_cache = all_plans
-                    self.cms_loaded = True
+                    fingerprints = {f"generic:{csv_file.name}": self._fingerprint_file(csv_file) for csv_file in csv_files}
+                    with progress.stage("publish", plans=len(all_plans)):
+                        self._publish(all_plans, frames, fingerprints)
                     return all_plans
                 else:
                     logger.warning("No CSV files found")
                     return []
-            all_plans = self._merge_puf_data(self.plan_attributes_df, self.rate_df, self.benefits_df, self.service_area_df)
-            self.plans_cache = all_plans
-            self.cms_loaded = True
+            with progress.stage("build_plans") as stage:
+                all_plans = self._merge_puf_data(frames['plan_attributes'], frames['rate'], frames['benefits'], frames['service_area'])
+                stage["plans"] = len(all_plans)
+            with progress.stage("publish", plans=len(all_plans)):
+                self._publish(all_plans, frames, fingerprints)
             logger.info(f"Successfully loaded {len(all_plans)} plans from CMS PUF data (cached in memory)")
             return all_plans
         except Exception as e:
             logger.error(f"Error loading CMS data: {e}")
             return []
 
-    def _parse_cms_csv(self, csv_file: Path) -> List[PlanFeature]:
+    def _puf_paths(self, data_path: Path, plan_year: str) -> Dict[str, Path]:
         """
-        Parse a generic CMS CSV file and extract plan features
+        Resolve the expected PUF file paths for a plan year
         """
-        try:
-            df = pd.read_csv(csv_file, low_memory=False)
-            plans = []
-            
-            for _, row in df.iterrows():
-                plan = self._create_plan_feature_from_row(row)
-                if plan:
-                    plans.append(plan)
-            
-            return plans
-        except Exception as e:
-            logger.error(f"Error parsing CSV file {csv_file}: {e}")
-            return []
+        return {kind: data_path / pattern.format(year=plan_year) for kind, pattern in PUF_FILE_PATTERNS.items()}
+
+    def _read_puf(self, kind: str, path: Path) -> Optional[pd.DataFrame]:
+        """
+        Read a single PUF file, returning None if it is missing
+        """
+        label, noun = PUF_LABELS[kind]
+        if not path.exists():
+            logger.warning(f"{label} PUF not found: {path}")
+            return None
+        logger.info(f"Loading {label} PUF: {path}")
+        df = read_puf_csv(path, kind, nrows=2500)
+        logger.info(f"Loaded {len(df)} {noun} records ({df.memory_usage(deep=True).sum() / 1e6:.1f} MB)")
+        return df
+
+    def _fingerprint_file(self, path: Path) -> PufFingerprint:
+        """
+        Fingerprint a data file by size, modification time and content hash
+        """
+        stat = path.stat()
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return PufFingerprint(path=str(path), size=stat.st_size, mtime=stat.st_mtime, sha256=digest.hexdigest())
+
+    def _publish(self, plans: List[PlanRecord], frames: Dict[str, Optional[pd.DataFrame]],
+                 fingerprints: Dict[str, PufFingerprint], derived: Optional[Dict[Any, Any]] = None) -> None:
+        """
+        Swap in a fully built dataset. Readers see either the old or the new data, never a mix.
+        derived pre-seeds the derived-structure cache of the new version.
+        """
+        version = hashlib.sha256(
+            "|".join(f"{kind}={fp.sha256}" for kind, fp in sorted(fingerprints.items())).encode()
+        ).hexdigest()[:16]
+        with self._publish_lock:
+            self.plan_attributes_df = frames.get('plan_attributes')
+            self.rate_df = frames.get('rate')
+            self.benefits_df = frames.get('benefits')
+            self.service_area_df = frames.get('service_area')
+            self.plans_cache = plans
+            self.puf_fingerprints = fingerprints
+            self.dataset_version = version
+            self._derived_cache = dict(derived or {})
+            self.cms_loaded = True
+
+    def attach_snapshot(self, snapshot: "DatasetSnapshot", data_directory: str, plan_year: str) -> None:
+        """
+        Publish a shared snapshot built by another worker. Plans, the plan index and the rate curves stay
+        memory-mapped from the snapshot and the raw PUF frames are not held (get_puf_frame rebuilds them from
+        the snapshot on demand); a later change to the PUFs is picked up by a full reload.
+        """
+        self.data_directory = data_directory
+        self.plan_year = plan_year
+        plans = snapshot.plans()
+        derived = {
+            'shared_snapshot': snapshot,
+            ('rate_curves', False): snapshot.rate_curves(tobacco=False),
+            ('rate_curves', True): snapshot.rate_curves(tobacco=True),
+        }
+        plan_index = snapshot.plan_index(plans)
+        if plan_index is not None:
+            derived['plan_index'] = plan_index
+        self._publish(plans, {}, snapshot.fingerprints, derived=derived)
+
+    def get_derived(self, key: Any, builder: Callable[[], Any]) -> Any:
+        """
+        Memoize a structure derived from the loaded data. Entries are dropped whenever a new dataset is published.
+        """
+        cache = self._derived_cache
+        if key not in cache:
+            cache[key] = builder()
+        return cache[key]
 
-    def _create_plan_feature_from_row(self, row: pd.Series) -> Optional[PlanFeature]:
+    def get_rate_curves(self, tobacco: bool = False) -> RateCurves:
         """
-        Create a PlanFeature from a CSV row
+        Premium-by-age curves for every plan and rating area in the Rate PUF
+        """
+        if not self.cms_loaded:
+            self.load_cms_data(self.data_directory, self.plan_year)
+        return self.get_derived(('rate_curves', tobacco),
+                                lambda: RateCurves.from_puf(self.rate_df, self.plan_attributes_df, tobacco=tobacco))
+
+    def get_family_premium_calculator(self, tobacco: bool = False) -> FamilyPremiumCalculator:
+        """
+        Household premium calculator over the Rate PUF curves
+        """
+        return self.get_derived(('family_premiums', tobacco),
+                                lambda: FamilyPremiumCalculator(self.get_rate_curves(tobacco=tobacco)))
+
+    def _parse_cms_csv(self, csv_file: Path) -> List[PlanRecord]:
+        """
+        Parse a generic CMS CSV file and extract plan records. Columns are resolved once per file and
+        coerced in bulk; the PlanFeature bounds are checked as masks over the whole file, so records are
+        built without per-row validation. Rows that fail a check are dropped and counted in the log.
         """
         try:
-            # Extract basic plan information
-            plan_id = str(row.get('PlanId', row.get('plan_id', '')))
-            if not plan_id or plan_id == 'nan':
-                return None
-            
-            # Extract premium (try different possible column names)
-            premium = self._safe_float(row.get('IndividualRate', row.get('individual_rate', row.get('MonthlyPremium', 0))))
-            
-            # Extract deductible (try different possible column names)
-            deductible = self._safe_float(row.get('Deductible', row.get('deductible', row.get('AnnualDeductible', 0))))
-            
-            # Extract out-of-pocket maximum
-            oop_max = self._safe_float(row.get('OutOfPocketMax', row.get('out_of_pocket_max', row.get('MaxOutOfPocket', 0))))
-            
-            # Extract actuarial value
-            av = self._safe_float(row.get('ActuarialValue', row.get('actuarial_value', row.get('AVCalculatorOutputNumber', 0.7))))
-            
-            # Determine network tier from actuarial value
-            network_tier = self._determine_network_tier(av)
-            
-            # Extract HSA eligibility
-            hsa_eligible = str(row.get('IsHSAEligible', row.get('is_hsa_eligible', 'No'))).lower() == 'yes'
-            
-            # Extract additional CMS-specific fields
-            state_code = str(row.get('StateCode', row.get('state_code', '')))
-            issuer_id = str(row.get('IssuerId', row.get('issuer_id', '')))
-            plan_marketing_name = str(row.get('PlanMarketingName', row.get('plan_marketing_name', '')))
-            metal_level = str(row.get('MetalLevel', row.get('metal_level', 'Silver')))
-            plan_type = str(row.get('PlanType', row.get('plan_type', '')))
-            market_coverage = str(row.get('MarketCoverage', row.get('market_coverage', '')))
-            dental_only = str(row.get('DentalOnlyPlan', row.get('dental_only_plan', 'No'))).lower() == 'yes'
-            service_area_id = str(row.get('ServiceAreaId', row.get('service_area_id', '')))
-            network_id = str(row.get('NetworkId', row.get('network_id', '')))
-            
-            return PlanFeature(
-                plan_id=plan_id,
-                monthly_premium=premium,
-                deductible=deductible,
-                out_of_pocket_max=oop_max,
-                hsa_eligible=hsa_eligible,
-                actuarial_value=av,
-                network_tier=network_tier,
-                state_code=state_code,
-                issuer_id=issuer_id,
-                plan_marketing_name=plan_marketing_name,
-                metal_level=metal_level,
-                plan_type=plan_type,
-                market_coverage=market_coverage,
-                dental_only_plan=dental_only,
-                service_area_id=service_area_id if service_area_id != 'nan' else None,
-                network_id=network_id if network_id != 'nan' else None
-            )
+            df = pd.read_csv(csv_file, low_memory=False)
+            columns = resolve_columns(df.columns, GENERIC_COLUMN_ALIASES)
+
+            def text(field: str, default: str = '') -> pd.Series:
+                column = columns[field]
+                return df[column].astype(str) if column else pd.Series(default, index=df.index)
+
+            def amount(field: str, default: float = 0.0) -> pd.Series:
+                column = columns[field]
+                return parse_cost_sharing(df[column], default=default) if column else pd.Series(default, index=df.index)
+
+            def flag(field: str) -> pd.Series:
+                column = columns[field]
+                return parse_yes_no(df[column]) if column else pd.Series(False, index=df.index)
+
+            plan_id = text('plan_id')
+            av = amount('actuarial_value', default=0.7)
+            service_area_id = text('service_area_id')
+            network_id = text('network_id')
+            frame = pd.DataFrame({
+                'plan_id': plan_id,
+                'monthly_premium': amount('monthly_premium'),
+                'deductible': amount('deductible'),
+                'out_of_pocket_max': amount('out_of_pocket_max'),
+                'hsa_eligible': flag('hsa_eligible'),
+                'actuarial_value': av,
+                'network_tier': np.select([av >= 0.9, av >= 0.8, av >= 0.7], ['platinum', 'gold', 'silver'], 'bronze'),
+                'state_code': text('state_code'),
+                'issuer_id': text('issuer_id'),
+                'plan_marketing_name': text('plan_marketing_name'),
+                'metal_level': text('metal_level', 'Silver'),
+                'plan_type': text('plan_type'),
+                'market_coverage': text('market_coverage'),
+                'dental_only_plan': flag('dental_only_plan'),
+                'service_area_id': service_area_id.where(service_area_id != 'nan', None),
+                'network_id': network_id.where(network_id != 'nan', None)
+            })
+
+            # Same rules PlanFeature validation applies (plus non-negative amounts), checked for the whole file at once
+            checks = {
+                'no plan id': (plan_id != '') & (plan_id != 'nan'),
+                'actuarial value outside [0, 1]': (av >= 0) & (av <= 1),
+                'negative premium': np.isfinite(frame['monthly_premium']) & (frame['monthly_premium'] >= 0),
+                'negative deductible': np.isfinite(frame['deductible']) & (frame['deductible'] >= 0),
+                'negative out-of-pocket maximum': np.isfinite(frame['out_of_pocket_max']) & (frame['out_of_pocket_max'] >= 0),
+                'unknown network tier': frame['network_tier'].isin(NETWORK_TIERS),
+            }
+            valid = pd.Series(True, index=df.index)
+            for reason, passed in checks.items():
+                failed = valid & ~passed
+                if failed.any():
+                    logger.warning(f"Skipping {int(failed.sum())} rows with {reason} in {csv_file}")
+                valid &= passed
+            frame = frame[valid]
+            return [PlanRecord(*values) for values in zip(*(frame[field].tolist() for field in PLAN_RECORD_FIELDS))]
         except Exception as e:
-            logger.error(f"Error creating plan feature from row: {e}")
-            return None
+            logger.error(f"Error parsing CSV file {csv_file}: {e}")
+            return []
 
     def _safe_float(self, value) -> float:
         """
@@ -304,15 +448,19 @@ class DataService:
             return "bronze"
 
     def _merge_puf_data(self, plan_attributes_df: pd.DataFrame, rate_df: pd.DataFrame, 
-                       benefits_df: pd.DataFrame, service_area_df: pd.DataFrame) -> List[PlanFeature]:
+                       benefits_df: pd.DataFrame, service_area_df: pd.DataFrame) -> List[PlanRecord]:
         """
         Merge data from multiple PUF files to create comprehensive plan features
         """
         plans = []
+        av_inputs = self._benefit_av_inputs(benefits_df)
         
         # Use plan attributes as the primary source
         if plan_attributes_df is not None and not plan_attributes_df.empty:
             logger.info("Processing plan attributes data...")
+            plan_attributes_df = plan_attributes_df.assign(
+                DerivedActuarialValue=self._derive_actuarial_values(plan_attributes_df, av_inputs)
+            )
             for _, plan_row in plan_attributes_df.iterrows():
                 plan = self._create_plan_from_puf_data(plan_row, rate_df, benefits_df, service_area_df)
                 if plan:
@@ -321,6 +469,9 @@ class DataService:
         # If no plan attributes, use rate data as fallback
         elif rate_df is not None and not rate_df.empty:
             logger.info("Processing rate data as fallback...")
+            rate_df = rate_df.assign(
+                DerivedActuarialValue=self._benefits_actuarial_values(rate_df['PlanId'], av_inputs)
+            )
             for _, rate_row in rate_df.iterrows():
                 plan = self._create_plan_from_rate_data(rate_row, benefits_df, service_area_df)
                 if plan:
@@ -332,7 +483,8 @@ class DataService:
             if plan.plan_id not in unique_plans:
                 unique_plans[plan.plan_id] = plan
         
-        return list(unique_plans.values())
+        # Validated as PlanFeature above; kept in memory as compact records
+        return [PlanRecord.from_feature(plan) for plan in unique_plans.values()]
 
     def _create_plan_from_puf_data(self, plan_row: pd.Series, rate_df: pd.DataFrame, 
                                   benefits_df: pd.DataFrame, service_area_df: pd.DataFrame) -> Optional[PlanFeature]:
@@ -347,8 +499,8 @@ class DataService:
             # Get premium from rate data
             premium = self._get_premium_from_rate_data(plan_id, rate_df)
             
-            # Get actuarial value from plan attributes or benefits
-            av = self._get_actuarial_value_from_plan_attributes(plan_row, benefits_df)
+            # Actuarial value derived for all plans at once in _merge_puf_data
+            av = float(plan_row['DerivedActuarialValue'])
             
             # Determine HSA eligibility
             hsa_eligible = self._determine_hsa_eligibility(plan_row)
@@ -402,8 +554,8 @@ class DataService:
             # Get premium from rate data
             premium = self._safe_float(rate_row.get('IndividualRate', 0))
             
-            # Get actuarial value from benefits data
-            av = self._get_actuarial_value_from_benefits(plan_id, benefits_df)
+            # Actuarial value derived for all plans at once in _merge_puf_data
+            av = float(rate_row['DerivedActuarialValue'])
             
             # Extract other fields
             state_code = str(rate_row.get('StateCode', ''))
@@ -459,65 +611,56 @@ class DataService:
         rate = plan_rates.iloc[0]
         return self._safe_float(rate.get('IndividualRate', 0))
 
-    def _get_actuarial_value_from_plan_attributes(self, plan_row: pd.Series, benefits_df: pd.DataFrame) -> float:
+    def _benefit_av_inputs(self, benefits_df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
         """
-        Get actuarial value from plan attributes or benefits data
+        Actuarial value inputs for every plan in the Benefits PUF, computed in one grouped pass:
+        benefit, EHB and covered-benefit counts, the EHB ratio and the AV it maps to
         """
-        # Try to get from plan attributes first
-        av = self._safe_float(plan_row.get('IssuerActuarialValue', 0))
-        if av > 0:
-            return av
-        
-        av = self._safe_float(plan_row.get('AVCalculatorOutputNumber', 0))
-        if av > 0:
-            return av
-        
-        # Fallback to benefits data
-        plan_id = str(plan_row.get('PlanId', ''))
-        if benefits_df is not None and not benefits_df.empty:
-            return self._get_actuarial_value_from_benefits(plan_id, benefits_df)
-        
-        # Default based on metal level
-        metal_level = str(plan_row.get('MetalLevel', 'Silver')).lower()
-        if metal_level == 'platinum':
-            return 0.9
-        elif metal_level == 'gold':
-            return 0.8
-        elif metal_level == 'silver':
-            return 0.7
+        if benefits_df is None or benefits_df.empty:
+            return None
+        flags = pd.DataFrame({
+            'PlanId': benefits_df['PlanId'],
+            'ehb': benefits_df['IsEHB'] == 'Yes',
+            'covered': (benefits_df['IsCovered'] == 'Covered') if 'IsCovered' in benefits_df.columns else False
+        })
+        inputs = flags.groupby('PlanId', sort=False, observed=True).agg(
+            benefit_count=('ehb', 'size'),
+            ehb_count=('ehb', 'sum'),
+            covered_count=('covered', 'sum')
+        )
+        # This is a simplified approach - in reality, AV calculation is complex
+        # and requires detailed benefit analysis. EHB ratio is a rough proxy.
+        inputs['ehb_ratio'] = inputs['ehb_count'] / inputs['benefit_count']
+        ratio = inputs['ehb_ratio']
+        inputs['benefits_av'] = np.select([ratio >= 0.9, ratio >= 0.8, ratio >= 0.7], [0.9, 0.8, 0.7], 0.6)
+        return inputs
+
+    def _derive_actuarial_values(self, plan_attributes_df: pd.DataFrame, av_inputs: Optional[pd.DataFrame]) -> pd.Series:
+        """
+        Actuarial value per plan: issuer AV, then AV calculator output, then the Benefits PUF EHB proxy
+        (0.7 for plans without benefits rows), then a metal-level default when no Benefits PUF is loaded
+        """
+        def column(name: str) -> pd.Series:
+            if name in plan_attributes_df.columns:
+                return parse_cost_sharing(plan_attributes_df[name])
+            return pd.Series(0.0, index=plan_attributes_df.index)
+
+        issuer_av = column('IssuerActuarialValue')
+        calculator_av = column('AVCalculatorOutputNumber')
+        if av_inputs is not None:
+            fallback = plan_attributes_df['PlanId'].map(av_inputs['benefits_av']).fillna(0.7)
         else:
-            return 0.6
+            metal = plan_attributes_df['MetalLevel'] if 'MetalLevel' in plan_attributes_df.columns else pd.Series('Silver', index=plan_attributes_df.index)
+            fallback = metal.astype(str).str.lower().map(METAL_LEVEL_DEFAULT_AV).fillna(0.6)
+        return issuer_av.where(issuer_av > 0, calculator_av.where(calculator_av > 0, fallback))
 
-    def _get_actuarial_value_from_benefits(self, plan_id: str, benefits_df: pd.DataFrame) -> float:
+    def _benefits_actuarial_values(self, plan_ids: pd.Series, av_inputs: Optional[pd.DataFrame]) -> pd.Series:
         """
-        Get actuarial value from benefits data
+        Benefits PUF AV proxy for the given plans, defaulting to Silver level
         """
-        if benefits_df is None or benefits_df.empty:
-            return 0.7  # Default to Silver level
-        
-        # This is a simplified approach - in reality, AV calculation is complex
-        # and requires detailed benefit analysis
-        plan_benefits = benefits_df[benefits_df['PlanId'] == plan_id]
-        if plan_benefits.empty:
-            return 0.7
-        
-        # Count EHB benefits as a rough proxy for AV
-        ehb_count = len(plan_benefits[plan_benefits['IsEHB'] == 'Yes'])
-        total_benefits = len(plan_benefits)
-        
-        if total_benefits > 0:
-            ehb_ratio = ehb_count / total_benefits
-            # Map EHB ratio to AV (simplified)
-            if ehb_ratio >= 0.9:
-                return 0.9
-            elif ehb_ratio >= 0.8:
-                return 0.8
-            elif ehb_ratio >= 0.7:
-                return 0.7
-            else:
-                return 0.6
-        
-        return 0.7
+        if av_inputs is None:
+            return pd.Series(0.7, index=plan_ids.index)
+        return plan_ids.map(av_inputs['benefits_av']).fillna(0.7)
 
     def _determine_hsa_eligibility(self, plan_row: pd.Series) -> bool:
         """
@@ -550,15 +693,103 @@ class DataService:
         
         return deductible, oop_max
 
-    def get_plans_by_state(self, state_code: str, data_directory: str = "data") -> List[PlanFeature]:
+    def get_puf_store(self) -> Optional[PufStore]:
         """
-        Get plans for a specific state from in-memory cache.
+        Columnar PUF store when PUF_STORE_DIRECTORY is set and pyarrow is installed
+        """
+        if not settings.PUF_STORE_DIRECTORY or pa is None:
+            return None
+        return self.get_derived('puf_store', lambda: PufStore(settings.PUF_STORE_DIRECTORY))
+
+    def _matching_puf_store(self, kind: str) -> Optional[PufStore]:
+        # The columnar store, when it holds an ingest of the loaded file for this plan year
+        store = self.get_puf_store()
+        fingerprint = self.puf_fingerprints.get(kind)
+        source = store.source(kind, self.plan_year) if store is not None else None
+        if source is not None and (fingerprint is None or source.get("sha256") in (None, fingerprint.sha256)):
+            return store
+        return None
+
+    def get_puf_frame(self, kind: str) -> Optional[pd.DataFrame]:
+        """
+        Raw PUF frame of the published dataset; None when the dataset has no such PUF. Workers attached to a
+        shared snapshot do not hold the frames and rebuild them once per version from the snapshot, or else
+        from the columnar store; with neither, PufUnavailableError is raised rather than serving no rows.
+        """
+        frame = {'plan_attributes': self.plan_attributes_df, 'rate': self.rate_df,
+                 'benefits': self.benefits_df, 'service_area': self.service_area_df}.get(kind)
+        if frame is not None or kind not in self.puf_fingerprints:
+            return frame
+        snapshot = self._derived_cache.get('shared_snapshot')
+        if snapshot is not None and snapshot.has_puf_frame(kind):
+            return self.get_derived(('puf_frame', kind), lambda: snapshot.puf_frame(kind))
+        store = self._matching_puf_store(kind)
+        if store is not None:
+            return self.get_derived(('puf_frame', kind), lambda: store.read(
+                kind, filters={'plan_year': self.plan_year}).drop(columns='plan_year', errors='ignore'))
+        raise PufUnavailableError(kind)
+
+    def query_puf(self, kind: str, columns: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None,
+                  limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Raw PUF rows matching filters (column -> value or list of values). Served from the columnar store with
+        projection and predicate pushdown when it holds an ingest of the loaded file; otherwise filtered from the
+        frame get_puf_frame returns.
+        """
+        store = self._matching_puf_store(kind)
+        if store is not None:
+            return store.read(kind, columns, {'plan_year': self.plan_year, **(filters or {})}, limit)
+
+        frame = self.get_puf_frame(kind)
+        if frame is None:
+            return pd.DataFrame(columns=columns or [])
+        unknown = [name for name in list(columns or []) + list(filters or {}) if name not in frame.columns]
+        if unknown:
+            raise ValueError(f"Unknown {kind} PUF columns: {', '.join(unknown)}")
+        mask = pd.Series(True, index=frame.index)
+        for column, value in (filters or {}).items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            mask &= frame[column].astype(str).str.strip().isin([str(item) for item in values])
+        rows = frame.loc[mask, list(columns) if columns else frame.columns]
+        return rows.head(limit) if limit is not None else rows
+
+    def get_analytics_engine(self) -> AnalyticsEngine:
+        """
+        SQLite copy of the plan, rate and benefits tables for ad-hoc queries; rebuilt for each published dataset
+        """
+        if not self.cms_loaded:
+            self.load_cms_data(self.data_directory, self.plan_year)
+        return self.get_derived('analytics', lambda: AnalyticsEngine(self))
+
+    def query_analytics(self, sql: str, params: Optional[List[Any]] = None, max_rows: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Run one read-only analytics statement within the configured time and row limits
+        """
+        limit = settings.ANALYTICS_MAX_ROWS
+        return self.get_analytics_engine().query(sql, params or [], max_rows=min(max_rows or limit, limit),
+                                                 timeout_seconds=settings.ANALYTICS_QUERY_TIMEOUT_SECONDS)
+
+    def get_cost_model(self) -> ExpectedCostModel:
+        """
+        Monte Carlo expected-cost model; its per-plan estimates are kept until the next dataset is published
+        """
+        return self.get_derived('cost_model', ExpectedCostModel)
+
+    def get_plan_index(self, data_directory: str = "data") -> PlanIndex:
+        """
+        Per-state plan partitions with pre-sorted orders for paged listing
         """
         if not self.cms_loaded or self.plans_cache is None:
             self.load_cms_data(data_directory)
-        return [plan for plan in self.plans_cache if plan.state_code.upper() == state_code.upper()]
+        return self.get_derived('plan_index', lambda: PlanIndex(self.plans_cache))
+
+    def get_plans_by_state(self, state_code: str, data_directory: str = "data") -> List[PlanRecord]:
+        """
+        Get plans for a specific state from in-memory cache.
+        """
+        return list(self.get_plan_index(data_directory).plans(state_code))
 
-    def get_plans_by_network_tier(self, network_tier: str, data_directory: str = "data") -> List[PlanFeature]:
+    def get_plans_by_network_tier(self, network_tier: str, data_directory: str = "data") -> List[PlanRecord]:
         """
         Get plans by network tier (bronze, silver, gold, platinum)
         """
@@ -566,7 +797,7 @@ class DataService:
             self.load_cms_data(data_directory)
         return [plan for plan in self.plans_cache if plan.network_tier.lower() == network_tier.lower()]
 
-    def get_plans_by_budget(self, max_monthly_premium: float, data_directory: str = "data") -> List[PlanFeature]:
+    def get_plans_by_budget(self, max_monthly_premium: float, data_directory: str = "data") -> List[PlanRecord]:
         """
         Get plans within a budget constraint
         """
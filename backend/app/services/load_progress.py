@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from app.services.data_service import DataService
+    from app.services.shared_dataset import SharedDatasetStore
+
+logger = logging.getLogger(__name__)
+
+class LoadProgress:
+    """
+    Thread-safe record of a dataset load: an overall state ("idle", "loading", "ready" or "failed") and an
+    ordered list of stages, each with its status, timings and details such as file size and row count
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "idle"
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._stages: List[Dict[str, Any]] = []
+
+    def begin(self):
+        with self._lock:
+            self.state, self.error = "loading", None
+            self.started_at, self.finished_at = time.time(), None
+            self._stages = []
+
+    def clear_stages(self):
+        with self._lock:
+            self._stages = []
+
+    def finish(self, error: Optional[str] = None):
+        with self._lock:
+            self.state, self.error = ("failed", error) if error else ("ready", None)
+            self.finished_at = time.time()
+
+    @contextmanager
+    def stage(self, name: str, **detail: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Track one stage; the yielded dict can be updated with details as the stage learns them
+        """
+        record = {"name": name, "status": "running", "started_at": time.time(), "duration_ms": None, **detail}
+        with self._lock:
+            self._stages.append(record)
+        try:
+            yield record
+        except BaseException:
+            record["status"] = "failed"
+            raise
+        else:
+            if record["status"] == "running":
+                record["status"] = "done"
+        finally:
+            record["duration_ms"] = round((time.time() - record["started_at"]) * 1000, 2)
+
+    @property
+    def loading(self) -> bool:
+        return self.state == "loading"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished_at or time.time()
+            return {
+                "state": self.state,
+                "error": self.error,
+                "elapsed_ms": round((end - self.started_at) * 1000, 2) if self.started_at else None,
+                "stages": [dict(stage) for stage in self._stages],
+            }
+
+class BackgroundLoader:
+    """
+    Loads the CMS dataset on a daemon thread so the server accepts connections (and answers liveness probes)
+    while the PUFs are read. The load is complete, and the service ready, once the plans are published and the
+    plan index is built. With a shared store, the dataset is attached from another worker's snapshot when one
+    matches the files on disk.
+    """
+    def __init__(self, data_service: "DataService", shared_store: Optional["SharedDatasetStore"] = None):
+        self.data_service = data_service
+        self.shared_store = shared_store
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def progress(self) -> LoadProgress:
+        return self.data_service.load_progress
+
+    def start(self, data_directory: str, on_ready: Optional[Callable[[], None]] = None) -> threading.Thread:
+        self.progress.begin()
+        self._thread = threading.Thread(target=self._run, args=(data_directory, on_ready),
+                                        name="dataset-loader", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _run(self, data_directory: str, on_ready: Optional[Callable[[], None]]):
+        ds = self.data_service
+        try:
+            if self.shared_store is not None:
+                self.shared_store.load_or_attach(ds, data_directory, ds.plan_year)
+            else:
+                ds.load_cms_data(data_directory)
+            if not ds.cms_loaded:
+                self.progress.finish(error=f"No CMS data could be loaded from {data_directory}")
+                return
+            with self.progress.stage("plan_index") as stage:
+                stage["states"] = len(ds.get_plan_index(data_directory).states)
+            self.progress.finish()
+            logger.info("CMS data loaded; service is ready.")
+            if on_ready is not None:
+                on_ready()
+        except Exception as e:
+            logger.error(f"Background dataset load failed: {e}")
+            self.progress.finish(error=str(e))
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
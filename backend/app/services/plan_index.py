@@ -0,0 +1,178 @@
+import base64
+import binascii
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+import orjson
+from app.models.records import PLAN_RECORD_FIELDS, PlanRecord, plan_column, take_plans
+
+# Public sort keys and the record field each one orders by
+SORT_KEYS = {
+    "premium": "monthly_premium",
+    "deductible": "deductible",
+    "actuarial_value": "actuarial_value",
+    "out_of_pocket_max": "out_of_pocket_max",
+    "plan_id": "plan_id",
+}
+
+# Partition key for listings that are not restricted to one state
+ALL_STATES = "*"
+
+# Columns kept per partition for sorting and filtering; text columns are stored lower-cased
+_NUMERIC_COLUMNS = ("monthly_premium", "deductible", "out_of_pocket_max", "actuarial_value", "hsa_eligible", "dental_only_plan")
+_TEXT_COLUMNS = ("metal_level", "market_coverage", "network_tier")
+
+class _Partition:
+    """
+    Plans of one state, as positions into the full plan sequence, with one precomputed ascending order per
+    sort key. Ties are broken by plan_id, so pages are stable across requests.
+    """
+    __slots__ = ("positions", "columns", "orders")
+
+    def __init__(self, positions: np.ndarray, columns: Dict[str, np.ndarray],
+                 orders: Optional[Dict[str, np.ndarray]] = None):
+        self.positions = positions
+        self.columns = columns
+        if orders is None:
+            plan_ids = columns["plan_id"]
+            orders = {
+                key: np.lexsort((plan_ids, columns[field])) if field != "plan_id" else np.argsort(plan_ids, kind="stable")
+                for key, field in SORT_KEYS.items()
+            }
+        self.orders = orders
+
+    def mask(self, filters: Dict[str, object]) -> Optional[np.ndarray]:
+        if not filters:
+            return None
+        mask = np.ones(len(self.positions), dtype=bool)
+        for name, value in filters.items():
+            if name == "max_premium":
+                mask &= self.columns["monthly_premium"] <= value
+            elif name == "dental_only":
+                mask &= self.columns["dental_only_plan"] == value
+            elif name in _TEXT_COLUMNS:
+                mask &= self.columns[name] == str(value).lower()
+            else:
+                mask &= self.columns[name] == value
+        return mask
+
+class PlanIndex:
+    """
+    Plan listing over pre-sorted per-state indexes. Built once per dataset version; a page is a slice of the
+    chosen order (after an optional vectorized filter mask), so no request sorts or copies the whole state.
+    Partitions hold positions rather than records: records are only taken from the plan sequence for the
+    page or state being returned, so a PlanTable backing the index is never materialized as a whole.
+    """
+    def __init__(self, plans: Sequence[PlanRecord], partitions: Optional[Dict[str, _Partition]] = None):
+        self._plans = plans
+        if partitions is None:
+            partitions = self._build(plans)
+        self._partitions = partitions
+
+    @staticmethod
+    def _build(plans: Sequence[PlanRecord]) -> Dict[str, _Partition]:
+        columns = {name: np.asarray(plan_column(plans, name), dtype=float) for name in _NUMERIC_COLUMNS}
+        columns["plan_id"] = np.asarray(plan_column(plans, "plan_id"), dtype=object).astype(str)
+        for name in _TEXT_COLUMNS:
+            columns[name] = pd.Series(plan_column(plans, name), dtype=object).str.lower().to_numpy()
+        states = pd.Series(plan_column(plans, "state_code"), dtype=object).str.upper()
+
+        partitions = {ALL_STATES: _Partition(np.arange(len(plans)), columns)}
+        for state, positions in states.groupby(states, sort=False).indices.items():
+            partitions[state] = _Partition(positions, {name: values[positions] for name, values in columns.items()})
+        return partitions
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """
+        The partitions as flat arrays (concatenated in partition order, with offsets) for from_arrays
+        """
+        keys = list(self._partitions)
+        partitions = [self._partitions[key] for key in keys]
+        arrays = {
+            "index.partitions": np.array(keys, dtype=str),
+            "index.offsets": np.cumsum([0] + [len(partition.positions) for partition in partitions], dtype=np.int64),
+            "index.positions": np.concatenate([partition.positions for partition in partitions]).astype(np.int64),
+        }
+        for key in SORT_KEYS:
+            arrays[f"index.order.{key}"] = np.concatenate(
+                [partition.orders[key] for partition in partitions]).astype(np.int64)
+        for name in partitions[0].columns:
+            values = np.concatenate([partition.columns[name] for partition in partitions])
+            arrays[f"index.column.{name}"] = values.astype(str) if values.dtype == object else values
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, plans: Sequence[PlanRecord], arrays: Dict[str, np.ndarray]) -> "PlanIndex":
+        """
+        Index over plans from arrays written by arrays(). Partitions are slices of the given arrays, so
+        memory-mapped arrays are used in place.
+        """
+        offsets = arrays["index.offsets"]
+        columns = [name[len("index.column."):] for name in arrays if name.startswith("index.column.")]
+        partitions = {}
+        for i, key in enumerate(arrays["index.partitions"].tolist()):
+            part = slice(int(offsets[i]), int(offsets[i + 1]))
+            partitions[key] = _Partition(arrays["index.positions"][part],
+                                         {name: arrays[f"index.column.{name}"][part] for name in columns},
+                                         {sort_key: arrays[f"index.order.{sort_key}"][part] for sort_key in SORT_KEYS})
+        return cls(plans, partitions)
+
+    @property
+    def states(self) -> List[str]:
+        return sorted(state for state in self._partitions if state != ALL_STATES)
+
+    def plans(self, state_code: Optional[str] = None) -> List[PlanRecord]:
+        partition = self._partitions.get(state_code.upper() if state_code else ALL_STATES)
+        return take_plans(self._plans, partition.positions) if partition is not None else []
+
+    def page(self, state_code: Optional[str] = None, sort_by: str = "premium", descending: bool = False,
+             offset: int = 0, limit: int = 50, filters: Optional[Dict[str, object]] = None) -> Tuple[List[PlanRecord], int]:
+        """
+        One page of plans and the total number of matches. Filters are record columns (metal_level,
+        market_coverage, network_tier, hsa_eligible, dental_only) plus max_premium.
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{sort_by}'; expected one of {', '.join(SORT_KEYS)}")
+        partition = self._partitions.get(state_code.upper() if state_code else ALL_STATES)
+        if partition is None:
+            return [], 0
+        order = partition.orders[sort_by]
+        if descending:
+            order = order[::-1]
+        mask = partition.mask(filters or {})
+        if mask is not None:
+            order = order[mask[order]]
+        return take_plans(self._plans, partition.positions[order[offset:offset + limit]]), len(order)
+
+def project(plans: Sequence[PlanRecord], fields: Optional[Sequence[str]]) -> list:
+    """
+    Keep only the requested fields; without a projection the records are returned as-is
+    """
+    if not fields:
+        return list(plans)
+    unknown = [name for name in fields if name not in PLAN_RECORD_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown plan fields: {', '.join(unknown)}")
+    return [{name: getattr(plan, name) for name in fields} for plan in plans]
+
+def cursor_scope(state_code: Optional[str], sort_by: str, descending: bool, filters: Optional[Dict] = None) -> str:
+    """
+    Short hash of the ordering a cursor pages through, so it cannot be replayed against another one
+    """
+    key = orjson.dumps([(state_code or "").upper(), sort_by, descending, filters or {}], option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(key).hexdigest()[:12]
+
+def encode_cursor(dataset_version: Optional[str], offset: int, scope: Optional[str] = None) -> str:
+    payload = {"v": dataset_version, "o": offset, "s": scope}
+    return base64.urlsafe_b64encode(orjson.dumps(payload)).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], int, Optional[str]]:
+    """
+    (dataset version, offset, scope) of a cursor issued by encode_cursor
+    """
+    try:
+        payload = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return payload["v"], int(payload["o"]), payload.get("s")
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise ValueError("Malformed cursor")
@@ -0,0 +1,61 @@
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Sequence
+
+# Leading amount in a cost-sharing string: "$1,500", "20%", "$25 Copay after deductible", "0.72"
+_AMOUNT = re.compile(r'(-?\d[\d,]*(?:\.\d+)?|-?\.\d+)\s*(%?)')
+
+# Strings that mean "no amount" rather than zero
+_NOT_APPLICABLE = {'', 'nan', 'none', 'not applicable', 'n/a', 'na'}
+
+def resolve_column(columns: Sequence[str], candidates: Sequence[str]) -> Optional[str]:
+    """
+    First candidate name present in the file, resolved once per file instead of once per row
+    """
+    present = set(columns)
+    for candidate in candidates:
+        if candidate in present:
+            return candidate
+    return None
+
+def resolve_columns(columns: Sequence[str], aliases: Dict[str, Sequence[str]]) -> Dict[str, Optional[str]]:
+    return {field: resolve_column(columns, candidates) for field, candidates in aliases.items()}
+
+def _parse_amount(text: str) -> float:
+    text = text.strip()
+    if text.lower() in _NOT_APPLICABLE:
+        return np.nan
+    if text.lower().startswith('no charge'):
+        return 0.0
+    match = _AMOUNT.search(text.replace('$', ''))
+    if not match:
+        return np.nan
+    value = float(match.group(1).replace(',', ''))
+    return value / 100.0 if match.group(2) else value
+
+def parse_cost_sharing(values: pd.Series, default: float = 0.0) -> pd.Series:
+    """
+    Vectorized numeric coercion for PUF money and cost-sharing columns. Handles "$" and thousands separators,
+    "Not Applicable", percentages (returned as fractions) and trailing text such as "after deductible".
+    Unparseable cells become default. Each distinct string is parsed once, so repetitive columns are cheap.
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype(float).fillna(default)
+    codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=True)
+    parsed = np.array([_parse_amount(str(value)) for value in uniques], dtype=float)
+    result = np.full(len(values), np.nan)
+    known = codes >= 0
+    result[known] = parsed[codes[known]]
+    return pd.Series(result, index=values.index).fillna(default)
+
+def parse_yes_no(values: pd.Series) -> pd.Series:
+    """
+    Vectorized "Yes"/"No" flag parsing; anything other than yes (any case) is False
+    """
+    codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=True)
+    flags = np.array([str(value).strip().lower() == 'yes' for value in uniques], dtype=bool)
+    result = np.zeros(len(values), dtype=bool)
+    known = codes >= 0
+    result[known] = flags[codes[known]]
+    return pd.Series(result, index=values.index)
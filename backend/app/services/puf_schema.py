@@ -0,0 +1,120 @@
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from app.services.puf_parsing import parse_cost_sharing
+
+CATEGORY = "category"
+AMOUNT = "float64"
+TEXT = "object"
+
+# Columns read from each PUF and their dtypes. Columns not listed are skipped at parse time. Codes, ids that
+# repeat across rows, flags ("Yes"/"No") and labels are categorical; premium amounts are float64 (NaN when
+# blank). Mostly-unique columns stay object: plan ids and names in Plan Attributes, and the AV columns, which
+# hold text such as "72.5%" and are parsed by parse_cost_sharing when plans are built.
+PUF_SCHEMAS: Dict[str, Dict[str, str]] = {
+    'plan_attributes': {
+        'PlanId': TEXT,
+        'StandardComponentId': TEXT,
+        'StateCode': CATEGORY,
+        'IssuerId': CATEGORY,
+        'PlanMarketingName': TEXT,
+        'MetalLevel': CATEGORY,
+        'PlanType': CATEGORY,
+        'MarketCoverage': CATEGORY,
+        'DentalOnlyPlan': CATEGORY,
+        'IsHSAEligible': CATEGORY,
+        'ServiceAreaId': CATEGORY,
+        'NetworkId': CATEGORY,
+        'IssuerActuarialValue': TEXT,
+        'AVCalculatorOutputNumber': TEXT,
+    },
+    'rate': {
+        'PlanId': CATEGORY,
+        'StateCode': CATEGORY,
+        'IssuerId': CATEGORY,
+        'RatingAreaId': CATEGORY,
+        'Tobacco': CATEGORY,
+        'Age': CATEGORY,
+        'RateEffectiveDate': CATEGORY,
+        'IndividualRate': AMOUNT,
+        'IndividualTobaccoRate': AMOUNT,
+        'Couple': AMOUNT,
+        'PrimarySubscriberAndOneDependent': AMOUNT,
+        'PrimarySubscriberAndTwoDependents': AMOUNT,
+        'PrimarySubscriberAndThreeOrMoreDependents': AMOUNT,
+        'CoupleAndOneDependent': AMOUNT,
+        'CoupleAndTwoDependents': AMOUNT,
+        'CoupleAndThreeOrMoreDependents': AMOUNT,
+    },
+    'benefits': {
+        'PlanId': CATEGORY,
+        'StandardComponentId': CATEGORY,
+        'StateCode': CATEGORY,
+        'IssuerId': CATEGORY,
+        'BenefitName': CATEGORY,
+        'IsEHB': CATEGORY,
+        'IsCovered': CATEGORY,
+    },
+    'service_area': {
+        'ServiceAreaId': CATEGORY,
+        'ServiceAreaName': CATEGORY,
+        'StateCode': CATEGORY,
+        'IssuerId': CATEGORY,
+        'CoverEntireState': CATEGORY,
+        'County': CATEGORY,
+        'PartialCounty': CATEGORY,
+        'ZipCodes': TEXT,
+        'MarketCoverage': CATEGORY,
+        'DentalOnlyPlan': CATEGORY,
+    },
+}
+
+def amount_columns(kind: str) -> List[str]:
+    return [column for column, dtype in PUF_SCHEMAS.get(kind, {}).items() if dtype == AMOUNT]
+
+def read_puf_csv(path: Path, kind: str, nrows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Read a PUF with its registered schema: unlisted columns are pruned and dtypes are applied by the parser.
+    Amount columns that hold text ("$1,234.00") are re-read as text and coerced with parse_cost_sharing.
+    """
+    schema = PUF_SCHEMAS[kind]
+    options = dict(usecols=lambda column: column in schema, nrows=nrows)
+    try:
+        return pd.read_csv(path, dtype=schema, **options)
+    except ValueError:
+        amounts = set(amount_columns(kind))
+        df = pd.read_csv(path, dtype={column: (TEXT if column in amounts else dtype)
+                                      for column, dtype in schema.items()}, **options)
+        for column in amounts & set(df.columns):
+            df[column] = parse_cost_sharing(df[column], default=np.nan)
+        return df
+
+def memory_report(path: Path, kind: str, nrows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Resident memory per column and parse time of a PUF read with inferred types (every column) versus the
+    registered schema. Columns the schema prunes report no typed size.
+    """
+    start = time.perf_counter()
+    inferred = pd.read_csv(path, low_memory=False, nrows=nrows)
+    inferred_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    typed = read_puf_csv(path, kind, nrows)
+    typed_seconds = time.perf_counter() - start
+
+    columns = pd.DataFrame({
+        'inferred_dtype': inferred.dtypes.astype(str),
+        'inferred_bytes': inferred.memory_usage(deep=True, index=False),
+    })
+    columns['typed_dtype'] = typed.dtypes.astype(str).reindex(columns.index)
+    columns['typed_bytes'] = typed.memory_usage(deep=True, index=False).reindex(columns.index)
+    return {
+        'kind': kind,
+        'rows': len(inferred),
+        'columns': columns,
+        'inferred_bytes': int(columns['inferred_bytes'].sum()),
+        'typed_bytes': int(columns['typed_bytes'].sum()),
+        'inferred_seconds': inferred_seconds,
+        'typed_seconds': typed_seconds,
+    }
@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import pandas as pd
+from app.services.puf_schema import amount_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+except ImportError:  # optional: columnar PUF store
+    pa = None
+    pads = None
+
+logger = logging.getLogger(__name__)
+
+# PUF kinds stored by default; the other two are small enough to keep reading from CSV
+COLUMNAR_PUFS = ('rate', 'benefits')
+
+# Partition directories, outermost first (hive style: plan_year=2025/StateCode=TX)
+PARTITION_COLUMNS = ('plan_year', 'StateCode')
+
+# Columns each kind is sorted by within a partition, so row-group statistics can skip most of a state
+SORT_COLUMNS = {
+    'rate': ('RatingAreaId', 'Age', 'PlanId'),
+    'benefits': ('StandardComponentId', 'PlanId', 'BenefitName'),
+}
+
+# Written next to a plan year's partitions (the leading underscore keeps it out of dataset discovery)
+SOURCE_FILE = "_source.json"
+
+# Rows read from the CSV per batch during ingest, and rows per Parquet row group
+INGEST_CHUNK_ROWS = 500_000
+ROW_GROUP_ROWS = 64_000
+
+class PufStore:
+    """
+    Raw PUFs converted once to Parquet, partitioned by plan year and state. Reads select columns (projection)
+    and filter rows in the scanner (predicate pushdown): partition filters skip whole directories and the
+    remaining filters skip row groups by their min/max statistics, so a lookup such as "TX rates at age 40 in
+    rating area 3" reads a few row groups of one state instead of the whole CSV.
+    """
+    def __init__(self, root: str):
+        if pa is None:
+            raise RuntimeError("The columnar PUF store needs the pyarrow package")
+        self.root = Path(root)
+
+    def _partitioning(self):
+        return pads.partitioning(pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]), flavor="hive")
+
+    def path(self, kind: str) -> Path:
+        return self.root / kind
+
+    def has(self, kind: str, plan_year: Optional[str] = None) -> bool:
+        path = self.path(kind)
+        return (path / f"plan_year={plan_year}").is_dir() if plan_year else path.is_dir() and any(path.iterdir())
+
+    def source(self, kind: str, plan_year: str) -> Optional[Dict[str, Any]]:
+        """
+        Source CSV details recorded when the plan year was ingested (path, sha256, rows)
+        """
+        path = self.path(kind) / f"plan_year={plan_year}" / SOURCE_FILE
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def ingest(self, kind: str, csv_path: Path, plan_year: str, source_sha256: Optional[str] = None,
+               chunk_rows: int = INGEST_CHUNK_ROWS) -> int:
+        """
+        Convert one PUF CSV into the plan year's partitions, replacing any earlier ingest of that year.
+        The CSV is streamed in chunks, so memory is bounded by chunk_rows. Returns the number of rows written.
+        """
+        numeric = set(amount_columns(kind))
+        staging = self.root / f".{kind}.{plan_year}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        schema = None
+        rows = 0
+        for number, chunk in enumerate(pd.read_csv(csv_path, dtype=str, chunksize=chunk_rows, keep_default_na=False,
+                                                   na_values=[""])):
+            for column in numeric & set(chunk.columns):
+                chunk[column] = pd.to_numeric(chunk[column], errors='coerce')
+            chunk['plan_year'] = str(plan_year)
+            chunk['StateCode'] = chunk['StateCode'].str.strip().str.upper()
+            sort_columns = [column for column in SORT_COLUMNS.get(kind, ()) if column in chunk.columns]
+            if sort_columns:
+                chunk = chunk.sort_values(['StateCode', *sort_columns], kind='stable')
+            if schema is None:
+                schema = pa.schema([(column, pa.float64() if column in numeric else pa.string()) for column in chunk.columns])
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            pads.write_dataset(table, staging, format="parquet", partitioning=self._partitioning(),
+                               basename_template=f"part-{number}-{{i}}.parquet",
+                               existing_data_behavior="overwrite_or_ignore", max_rows_per_group=ROW_GROUP_ROWS)
+            rows += len(table)
+        staged = staging / f"plan_year={plan_year}"
+        staged.mkdir(parents=True, exist_ok=True)
+        (staged / SOURCE_FILE).write_text(json.dumps({"path": str(csv_path), "sha256": source_sha256, "rows": rows}))
+        target = self.path(kind) / f"plan_year={plan_year}"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staged, target)
+        shutil.rmtree(staging, ignore_errors=True)
+        logger.info(f"Ingested {rows} {kind} rows from {csv_path} into {target}")
+        return rows
+
+    def read(self, kind: str, columns: Optional[Sequence[str]] = None,
+             filters: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Rows of a stored PUF as a DataFrame. filters maps column names to a value or a list of accepted
+        values (plan_year and StateCode prune partitions); columns limits what is read.
+        """
+        if not self.has(kind):
+            raise FileNotFoundError(f"No columnar {kind} PUF in {self.root}")
+        dataset = pads.dataset(self.path(kind), format="parquet", partitioning=self._partitioning())
+        unknown = [name for name in list(columns or []) + list(filters or {}) if name not in dataset.schema.names]
+        if unknown:
+            raise ValueError(f"Unknown {kind} PUF columns: {', '.join(unknown)}")
+        expression = None
+        for column, value in (filters or {}).items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            field_type = dataset.schema.field(column).type
+            values = [float(item) if pa.types.is_floating(field_type) else str(item) for item in values]
+            condition = pads.field(column) == values[0] if len(values) == 1 else pads.field(column).isin(values)
+            expression = condition if expression is None else expression & condition
+        scanner = dataset.scanner(columns=list(columns) if columns else None, filter=expression)
+        table = scanner.head(limit) if limit is not None else scanner.to_table()
+        return table.to_pandas()
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """
+        Stored kinds with their plan years, states and on-disk size
+        """
+        kinds = []
+        kind_paths = sorted(path for path in self.root.iterdir()
+                            if path.is_dir() and not path.name.startswith(".")) if self.root.exists() else []
+        for kind_path in kind_paths:
+            files = list(kind_path.rglob("*.parquet"))
+            kinds.append({
+                "kind": kind_path.name,
+                "plan_years": sorted(path.name.split("=", 1)[1] for path in kind_path.glob("plan_year=*")),
+                "states": len({path.parent.name for path in files}),
+                "files": len(files),
+                "bytes": sum(path.stat().st_size for path in files),
+            })
+        return kinds
@@ -0,0 +1,213 @@
+import logging
+import threading
+import time
+from pathlib import Path
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Set, Tuple
+import pandas as pd
+from app.models.domain import PufFingerprint, ReloadReport
+from app.models.records import PlanRecord
+from app.services.data_service import DataService, PUF_FILE_PATTERNS
+from app.services.shared_dataset import SharedDatasetStore
+
+logger = logging.getLogger(__name__)
+
+# Derived plan structure that has to be rebuilt when a PUF changes.
+# Service areas are not used when building plans, so they only need the raw frame swapped.
+DERIVED_STRUCTURES = {
+    'rate': 'premiums',
+    'benefits': 'actuarial_values',
+    'service_area': 'service_areas'
+}
+
+class DatasetReloader:
+    """
+    Picks up corrected PUF files without a restart. Only the PUFs whose content changed are re-read,
+    and only the plans of the states whose rows changed are rebuilt before the data is republished.
+    With a shared store, a worker whose files changed attaches to the snapshot another worker already
+    rebuilt from them, and a worker that rebuilds exports the result for the others.
+    """
+    def __init__(self, data_service: DataService, shared_store: Optional[SharedDatasetStore] = None):
+        self.data_service = data_service
+        self.shared_store = shared_store
+        self.last_report: Optional[ReloadReport] = None
+        self._reload_lock = threading.Lock()
+        self._poll_thread: Optional[threading.Thread] = None
+        self._stop_polling = threading.Event()
+        self._pointer_stamp: Optional[Tuple[int, int]] = None
+
+    def detect_changes(self) -> Tuple[Dict[str, PufFingerprint], Dict[str, Optional[PufFingerprint]]]:
+        """
+        Fingerprint the PUF files. Returns the current fingerprints and the files whose content changed
+        (None for a file that disappeared). Files are only hashed when their size or mtime moved.
+        """
+        ds = self.data_service
+        previous = ds.puf_fingerprints
+        current: Dict[str, PufFingerprint] = {}
+        changed: Dict[str, Optional[PufFingerprint]] = {}
+        paths = {kind: Path(fp.path) for kind, fp in previous.items()}
+        paths.update(ds._puf_paths(Path(ds.data_directory), ds.plan_year))
+        for kind, path in paths.items():
+            old = previous.get(kind)
+            if not path.exists():
+                if old is not None:
+                    changed[kind] = None
+                continue
+            stat = path.stat()
+            if old is not None and old.size == stat.st_size and old.mtime == stat.st_mtime:
+                current[kind] = old
+                continue
+            fingerprint = ds._fingerprint_file(path)
+            current[kind] = fingerprint
+            if old is None or old.sha256 != fingerprint.sha256:
+                changed[kind] = fingerprint
+        return current, changed
+
+    def reload(self) -> ReloadReport:
+        """
+        Reload whatever changed on disk and publish the result. Requests keep being served from the
+        previous dataset until the new one is swapped in.
+        """
+        store = self.shared_store
+        with self._reload_lock, (store.exclusive() if store is not None else nullcontext()):
+            start_time = time.time()
+            ds = self.data_service
+            previous_version = ds.dataset_version
+            fingerprints, changed = self.detect_changes()
+            report = ReloadReport(previous_version=previous_version, changed_files=sorted(changed), duration_ms=0)
+            snapshot = store.current() if store is not None and changed else None
+
+            if not changed:
+                ds.puf_fingerprints = fingerprints
+            elif snapshot is not None and store.matches(snapshot, fingerprints):
+                ds.attach_snapshot(snapshot, ds.data_directory, ds.plan_year)
+                report.shared_snapshot = snapshot.version
+            elif (not ds.cms_loaded
+                  or (ds.plan_attributes_df is None and ds.rate_df is None)
+                  or any(kind not in DERIVED_STRUCTURES or fp is None for kind, fp in changed.items())
+                  or any(kind not in PUF_FILE_PATTERNS for kind in ds.puf_fingerprints)):
+                plans = ds.load_cms_data(ds.data_directory, ds.plan_year, force=True)
+                report.full_rebuild = True
+                report.rebuilt = {'plans': sorted({plan.state_code.upper() for plan in plans})}
+                report.rebuilt_plan_count = len(plans)
+            else:
+                report.rebuilt, report.rebuilt_plan_count = self._rebuild_partitions(changed, fingerprints)
+            if store is not None and changed and report.shared_snapshot is None and ds.cms_loaded:
+                report.shared_snapshot = store.export(ds).version
+
+            report.dataset_version = ds.dataset_version
+            report.total_plan_count = len(ds.plans_cache or [])
+            report.duration_ms = (time.time() - start_time) * 1000
+            self.last_report = report
+            logger.info(
+                f"Dataset reload finished in {report.duration_ms:.2f} ms: changed={report.changed_files} "
+                f"rebuilt={report.rebuilt} version {previous_version} -> {report.dataset_version}"
+            )
+            return report
+
+    def _rebuild_partitions(self, changed: Dict[str, Optional[PufFingerprint]],
+                            fingerprints: Dict[str, PufFingerprint]) -> Tuple[Dict[str, List[str]], int]:
+        """
+        Re-read the changed PUFs and rebuild only the plans in states whose rows differ
+        """
+        ds = self.data_service
+        frames = {
+            'plan_attributes': ds.plan_attributes_df,
+            'rate': ds.rate_df,
+            'benefits': ds.benefits_df,
+            'service_area': ds.service_area_df
+        }
+        rebuilt: Dict[str, List[str]] = {}
+        affected_states: Set[str] = set()
+        for kind in changed:
+            new_df = ds._read_puf(kind, Path(fingerprints[kind].path))
+            states = self._changed_states(frames[kind], new_df)
+            frames[kind] = new_df
+            rebuilt[DERIVED_STRUCTURES[kind]] = sorted(states)
+            if kind != 'service_area':
+                affected_states |= states
+
+        new_plans: List[PlanRecord] = []
+        if affected_states:
+            plan_attributes_df = frames['plan_attributes']
+            rate_df = frames['rate']
+            if plan_attributes_df is not None and not plan_attributes_df.empty:
+                plan_attributes_df = plan_attributes_df[self._state_mask(plan_attributes_df, affected_states)]
+            elif rate_df is not None and not rate_df.empty:
+                rate_df = rate_df[self._state_mask(rate_df, affected_states)]
+            new_plans = ds._merge_puf_data(plan_attributes_df, rate_df, frames['benefits'], frames['service_area'])
+            rebuilt['plans'] = sorted(affected_states)
+
+        kept_plans = [plan for plan in ds.plans_cache or [] if plan.state_code.upper() not in affected_states]
+        ds._publish(kept_plans + new_plans, frames, fingerprints)
+        return rebuilt, len(new_plans)
+
+    def _state_mask(self, df: pd.DataFrame, states: Set[str]) -> pd.Series:
+        return df['StateCode'].astype(str).str.upper().isin(states)
+
+    def _state_digests(self, df: Optional[pd.DataFrame]) -> pd.Series:
+        """
+        Order-insensitive content digest of a PUF frame per state
+        """
+        if df is None or df.empty or 'StateCode' not in df.columns:
+            return pd.Series(dtype='uint64')
+        row_hashes = pd.util.hash_pandas_object(df, index=False)
+        return row_hashes.groupby(df['StateCode'].astype(str).str.upper().values).sum()
+
+    def _changed_states(self, old_df: Optional[pd.DataFrame], new_df: Optional[pd.DataFrame]) -> Set[str]:
+        old_digests = self._state_digests(old_df)
+        new_digests = self._state_digests(new_df)
+        states = set(old_digests.index) | set(new_digests.index)
+        return {state for state in states if old_digests.get(state) != new_digests.get(state)}
+
+    def follow_shared(self) -> bool:
+        """
+        Attach to the shared snapshot when another worker has made a new one current. Costs one stat of the
+        CURRENT pointer when nothing changed, so it can run on every request; workers then follow a handoff
+        even with polling disabled. Returns whether a new version was attached.
+        """
+        store = self.shared_store
+        if store is None:
+            return False
+        stamp = store.pointer_stamp()
+        if stamp is None or stamp == self._pointer_stamp:
+            return False
+        # A reload in progress publishes (or attaches) on its own
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self._pointer_stamp = stamp
+            ds = self.data_service
+            snapshot = store.current()
+            if snapshot is None or not ds.cms_loaded or snapshot.version == ds.dataset_version:
+                return False
+            previous_version = ds.dataset_version
+            ds.attach_snapshot(snapshot, ds.data_directory, ds.plan_year)
+            logger.info(f"Attached shared dataset snapshot: version {previous_version} -> {snapshot.version}")
+            return True
+        except Exception as e:
+            logger.error(f"Attaching the shared dataset snapshot failed: {e}")
+            return False
+        finally:
+            self._reload_lock.release()
+
+    def start_polling(self, interval_seconds: float) -> None:
+        """
+        Check for changed PUF files every interval in a background thread
+        """
+        if self._poll_thread is not None and self._poll_thread.is_alive():
+            return
+        self._stop_polling.clear()
+
+        def poll():
+            while not self._stop_polling.wait(interval_seconds):
+                try:
+                    self.reload()
+                except Exception as e:
+                    logger.error(f"Background dataset reload failed: {e}")
+
+        self._poll_thread = threading.Thread(target=poll, name="dataset-reloader", daemon=True)
+        self._poll_thread.start()
+
+    def stop_polling(self) -> None:
+        self._stop_polling.set()
@@ -0,0 +1,85 @@
+import gzip
+import threading
+from typing import Callable, Dict, Optional
+
+class CachedResponse:
+    """
+    Serialized response body in plain and gzip form, each with the strong ETag that identifies it
+    """
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag")
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6)
+        self.etag = etag
+        self.gzip_etag = gzip_etag(etag)
+
+def make_etag(dataset_version: str, key: str) -> str:
+    return f'"{dataset_version}-{key}"'
+
+def gzip_etag(etag: str) -> str:
+    """
+    ETag of the gzip-encoded variant; a strong tag must differ between content codings (RFC 9110 8.8.3)
+    """
+    return f'{etag[:-1]}-gz"'
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """
+    If-None-Match check (RFC 9110): '*' or any listed tag, weak or strong, matching one of ours
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") in etags for tag in candidates)
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    Accept-Encoding check (RFC 9110): gzip, or '*' when gzip is not listed, with a q-value above zero
+    """
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0))) > 0
+
+class ResponseCache:
+    """
+    Pre-serialized responses per dataset version. Entries of older versions are dropped as soon as a
+    newer version is requested, so the cache never serves stale data after a reload.
+    """
+    def __init__(self):
+        self._version: Optional[str] = None
+        self._entries: Dict[str, CachedResponse] = {}
+        self._lock = threading.Lock()
+
+    def get(self, dataset_version: str, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            return self._entries.get(key) if self._version == dataset_version else None
+
+    def get_or_build(self, dataset_version: str, key: str, build: Callable[[], bytes]) -> CachedResponse:
+        with self._lock:
+            if self._version != dataset_version:
+                self._version = dataset_version
+                self._entries = {}
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        # Serialize outside the lock; a concurrent duplicate build is harmless
+        entry = CachedResponse(build(), make_etag(dataset_version, key))
+        with self._lock:
+            if self._version == dataset_version:
+                self._entries.setdefault(key, entry)
+        return entry
@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Tuple
+import numpy as np
+import pandas as pd
+from app.models.domain import PufFingerprint
+from app.models.records import PlanTable, PLAN_RECORD_FIELDS
+from app.optimization.rate_curves import RateCurves
+from app.services.plan_index import PlanIndex
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts fall back to a process-local lock
+    fcntl = None
+
+if TYPE_CHECKING:
+    from app.services.data_service import DataService
+
+logger = logging.getLogger(__name__)
+
+# File in the store root naming the snapshot workers should attach to; replaced atomically on handoff
+CURRENT_POINTER = "CURRENT"
+
+# Snapshots kept on disk (the current one and its predecessors); workers may still map an older one
+KEEP_SNAPSHOTS = 2
+
+_PLAN_FLOAT_FIELDS = ('monthly_premium', 'deductible', 'out_of_pocket_max', 'actuarial_value')
+_PLAN_BOOL_FIELDS = ('hsa_eligible', 'dental_only_plan')
+_PLAN_OPTIONAL_FIELDS = ('service_area_id', 'network_id')
+_CURVE_FIELDS = ('plan_ids', 'metal_levels', 'area_index', 'area_states', 'area_ids', 'premiums', 'family_tiers')
+
+# Raw PUF frames exported column by column, for the analytics tables and PUF queries of attached workers
+_PUF_FRAME_KINDS = ('rate', 'benefits')
+
+class DatasetSnapshot:
+    """
+    One published dataset version as read-only memory-mapped arrays: the plan table column by column, the
+    plan listing index, the Rate PUF curves (standard and tobacco) and the raw Rate and Benefits PUF columns.
+    Pages are shared through the OS page cache, so every worker attached to the same snapshot maps the same
+    physical memory.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.manifest = json.loads((path / "manifest.json").read_text())
+        self.version: str = self.manifest["version"]
+
+    @property
+    def fingerprints(self) -> Dict[str, PufFingerprint]:
+        return {kind: PufFingerprint(**fp) for kind, fp in self.manifest["fingerprints"].items()}
+
+    def array(self, name: str) -> np.ndarray:
+        return np.load(self.path / f"{name}.npy", mmap_mode='r')
+
+    def plans(self) -> PlanTable:
+        """
+        The plan table served from the mapped columns; records are built only when read
+        """
+        return PlanTable({name: self.array(f"plan.{name}") for name in PLAN_RECORD_FIELDS},
+                         {name: self.array(f"plan.{name}.present") for name in _PLAN_OPTIONAL_FIELDS})
+
+    def plan_index(self, plans: PlanTable) -> Optional[PlanIndex]:
+        """
+        The listing index over plans with its partitions mapped from the snapshot, if it was exported
+        """
+        names = [path.name[:-len(".npy")] for path in self.path.glob("index.*.npy")]
+        if not names:
+            return None
+        return PlanIndex.from_arrays(plans, {name: self.array(name) for name in names})
+
+    def rate_curves(self, tobacco: bool = False) -> RateCurves:
+        prefix = "tobacco_curves" if tobacco else "curves"
+        return RateCurves(**{name: self.array(f"{prefix}.{name}") for name in _CURVE_FIELDS})
+
+    def has_puf_frame(self, kind: str) -> bool:
+        return kind in self.manifest.get("puf_frames", {})
+
+    def puf_frame(self, kind: str) -> Optional[pd.DataFrame]:
+        """
+        A raw PUF frame rebuilt from its exported columns; text columns become Python strings (None where missing)
+        """
+        columns = self.manifest.get("puf_frames", {}).get(kind)
+        if columns is None:
+            return None
+        data = {}
+        for number, (name, masked) in enumerate(columns):
+            values = self.array(f"puf.{kind}.{number}")
+            if values.dtype.kind == 'U':
+                values = pd.Series(values.astype(object))
+                if masked:
+                    values = values.where(self.array(f"puf.{kind}.{number}.present"), None)
+            data[name] = np.asarray(values)
+        return pd.DataFrame(data, columns=[name for name, _ in columns])
+
+class SharedDatasetStore:
+    """
+    Versioned on-disk snapshots of the loaded dataset shared by the worker processes of one host. Under an
+    exclusive file lock, the first worker whose PUFs do not match the current snapshot loads them and exports
+    a new snapshot, then repoints CURRENT; every other worker attaches to it instead of parsing the PUFs.
+    """
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._thread_lock, open(self.root / ".lock", "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def current(self) -> Optional[DatasetSnapshot]:
+        pointer = self.root / CURRENT_POINTER
+        if not pointer.exists():
+            return None
+        path = self.root / pointer.read_text().strip()
+        return DatasetSnapshot(path) if (path / "manifest.json").exists() else None
+
+    def pointer_stamp(self) -> Optional[Tuple[int, int]]:
+        """
+        Identity (inode, mtime) of the CURRENT pointer, from a single stat. The pointer is replaced on every
+        handoff, never rewritten in place, so the stamp changes whenever a new snapshot becomes current.
+        """
+        try:
+            stat = (self.root / CURRENT_POINTER).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def matches(self, snapshot: DatasetSnapshot, fingerprints: Dict[str, PufFingerprint]) -> bool:
+        return {kind: fp.sha256 for kind, fp in snapshot.fingerprints.items()} == \
+               {kind: fp.sha256 for kind, fp in fingerprints.items()}
+
+    def source_fingerprints(self, ds: "DataService", data_directory: str, plan_year: str) -> Dict[str, PufFingerprint]:
+        """
+        Fingerprints of the files a load of data_directory would read. Files whose size and mtime match the
+        current snapshot reuse its hash instead of being re-read.
+        """
+        data_path = Path(data_directory)
+        puf_files = {kind: path for kind, path in ds._puf_paths(data_path, plan_year).items() if path.exists()}
+        if 'plan_attributes' not in puf_files and 'rate' not in puf_files:
+            puf_files = {f"generic:{path.name}": path for path in data_path.glob("*.csv")}
+        snapshot = self.current()
+        known = snapshot.fingerprints if snapshot is not None else {}
+        fingerprints = {}
+        for kind, path in puf_files.items():
+            stat = path.stat()
+            old = known.get(kind)
+            if old is not None and old.path == str(path) and old.size == stat.st_size and old.mtime == stat.st_mtime:
+                fingerprints[kind] = old
+            else:
+                fingerprints[kind] = ds._fingerprint_file(path)
+        return fingerprints
+
+    def load_or_attach(self, ds: "DataService", data_directory: str, plan_year: str = "2025") -> str:
+        """
+        Attach ds to the current snapshot when it was built from the same files, otherwise load the PUFs and
+        export a new snapshot. Returns "attached", "built" or "unavailable" (nothing could be loaded).
+        """
+        progress = ds.load_progress
+        with self.exclusive():
+            snapshot = self.current()
+            if Path(data_directory).exists() and snapshot is not None and \
+                    self.matches(snapshot, self.source_fingerprints(ds, data_directory, plan_year)):
+                with progress.stage("attach_snapshot", version=snapshot.version) as stage:
+                    ds.attach_snapshot(snapshot, data_directory, plan_year)
+                    stage["plans"] = len(ds.plans_cache)
+                return "attached"
+            ds.load_cms_data(data_directory, plan_year, force=ds.cms_loaded)
+            if not ds.cms_loaded:
+                return "unavailable"
+            with progress.stage("export_snapshot", version=ds.dataset_version):
+                self.export(ds)
+            return "built"
+
+    def export(self, ds: "DataService") -> DatasetSnapshot:
+        """
+        Write ds's published dataset as a snapshot and make it current. Call while holding exclusive().
+        """
+        version = ds.dataset_version
+        path = self.root / version
+        if not (path / "manifest.json").exists():
+            staging = self.root / f".{version}.{os.getpid()}.tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            staging.mkdir()
+            plans = ds.plans_cache or []
+            for name in PLAN_RECORD_FIELDS:
+                values = [getattr(plan, name) for plan in plans]
+                if name in _PLAN_OPTIONAL_FIELDS:
+                    np.save(staging / f"plan.{name}.present.npy", np.array([value is not None for value in values], dtype=bool))
+                    values = ["" if value is None else value for value in values]
+                dtype = float if name in _PLAN_FLOAT_FIELDS else bool if name in _PLAN_BOOL_FIELDS else str
+                np.save(staging / f"plan.{name}.npy", np.array(values, dtype=dtype))
+            for name, values in ds.get_plan_index().arrays().items():
+                np.save(staging / f"{name}.npy", values)
+            for prefix, tobacco in (("curves", False), ("tobacco_curves", True)):
+                curves = ds.get_rate_curves(tobacco=tobacco)
+                for name in _CURVE_FIELDS:
+                    values = getattr(curves, name)
+                    np.save(staging / f"{prefix}.{name}.npy",
+                            values.astype(str) if values.dtype == object else np.ascontiguousarray(values))
+            puf_frames = {}
+            for kind in _PUF_FRAME_KINDS:
+                frame = ds.get_puf_frame(kind)
+                if frame is not None:
+                    puf_frames[kind] = self._save_frame(staging, f"puf.{kind}", frame)
+            manifest = {
+                "version": version,
+                "plan_count": len(plans),
+                "fingerprints": {kind: fp.model_dump() for kind, fp in ds.puf_fingerprints.items()},
+                "puf_frames": puf_frames,
+            }
+            (staging / "manifest.json").write_text(json.dumps(manifest))
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(staging, path)
+        pointer = self.root / f".{CURRENT_POINTER}.{os.getpid()}.tmp"
+        pointer.write_text(version)
+        os.replace(pointer, self.root / CURRENT_POINTER)
+        self._prune(version)
+        logger.info(f"Exported shared dataset snapshot {version} to {path}")
+        return DatasetSnapshot(path)
+
+    def _save_frame(self, staging: Path, prefix: str, frame: pd.DataFrame) -> list:
+        # Numeric and boolean columns are saved as they are; everything else as fixed-width text with a
+        # presence mask when values are missing. Returns [column name, has mask] per column, in order.
+        columns = []
+        for number, name in enumerate(frame.columns):
+            values = frame[name]
+            if pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype):
+                np.save(staging / f"{prefix}.{number}.npy", values.to_numpy())
+                columns.append([str(name), False])
+                continue
+            present = values.notna().to_numpy()
+            masked = not present.all()
+            if masked:
+                np.save(staging / f"{prefix}.{number}.present.npy", present)
+            np.save(staging / f"{prefix}.{number}.npy", values.astype(object).where(present, "").astype(str).to_numpy(dtype=str))
+            columns.append([str(name), masked])
+        return columns
+
+    def _prune(self, current: str):
+        snapshots = sorted((path for path in self.root.iterdir()
+                            if path.is_dir() and not path.name.startswith(".") and path.name != current),
+                           key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in snapshots[KEEP_SNAPSHOTS - 1:]:
+            # Workers still mapping these files keep their pages until they attach to the new version
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,58 @@
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Optional
+import orjson
+from pydantic import BaseModel
+
+def request_key(request: BaseModel, dataset_version: Optional[str]) -> str:
+    """
+    Canonical key of a request body: identical payloads against the same dataset share a key
+    """
+    body = orjson.dumps(request.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+    return f"{dataset_version}:{hashlib.sha256(body).hexdigest()}"
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: the first caller for a key starts the computation and later callers
+    await the same result (or exception) instead of repeating it. The computation runs as its own task, so it
+    completes for the remaining waiters even if the caller that started it times out or disconnects.
+    Keys are forgotten as soon as the computation finishes; nothing is cached beyond the burst.
+    """
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._counters = {"computations": 0, "coalesced": 0, "timeouts": 0}
+
+    async def run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Result of compute() for key; raises asyncio.TimeoutError after self.timeout seconds of waiting
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            # Mark the exception retrieved even if every waiter timed out
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._inflight[key] = future
+            self._counters["computations"] += 1
+            asyncio.ensure_future(self._compute(key, compute, future))
+        else:
+            self._counters["coalesced"] += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            raise
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Any]], future: asyncio.Future):
+        try:
+            future.set_result(await compute())
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._counters, "in_flight": len(self._inflight)}
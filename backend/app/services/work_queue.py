@@ -0,0 +1,116 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# Recent queue waits and run times kept for the percentile and Retry-After estimates
+TIMING_WINDOW = 256
+
+class QueueFullError(Exception):
+    """
+    Raised when every worker is busy and the wait queue is at capacity
+    """
+    def __init__(self, retry_after: int):
+        super().__init__(f"Optimization queue is full; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+class BoundedExecutor:
+    """
+    Runs blocking, CPU-bound calls off the event loop on a fixed pool of worker threads. At most max_workers
+    calls run at once and at most max_queue more wait for a worker; past that, calls are rejected immediately
+    with QueueFullError rather than piling up behind a slow solve. The solvers spend their time in CBC
+    subprocesses and HiGHS/numpy native code, so threads overlap without copying the dataset into other
+    processes.
+    """
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, retry_after_seconds: float = 1.0):
+        if max_workers < 1 or max_queue < 0:
+            raise ValueError("max_workers must be at least 1 and max_queue non-negative")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after_seconds = retry_after_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="optimize")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._counters = {"completed": 0, "failed": 0, "rejected": 0}
+        self._waits: deque = deque(maxlen=TIMING_WINDOW)
+        self._run_times: deque = deque(maxlen=TIMING_WINDOW)
+
+    def retry_after(self) -> int:
+        """
+        Seconds until a slot is likely free: the queue ahead drained at the recent mean run time, at least
+        retry_after_seconds
+        """
+        with self._lock:
+            run_times = list(self._run_times)
+            queued = self._admitted - self._running
+        mean_run = sum(run_times) / len(run_times) if run_times else 0.0
+        return max(1, math.ceil(max(self.retry_after_seconds, mean_run * (queued + 1) / self.max_workers)))
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Result of func(*args) computed on a worker thread; raises QueueFullError when the queue is full
+        """
+        with self._lock:
+            full = self._admitted >= self.max_workers + self.max_queue
+            if full:
+                self._counters["rejected"] += 1
+            else:
+                self._admitted += 1
+        if full:
+            raise QueueFullError(self.retry_after())
+        submitted = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._waits.append(started - submitted)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._admitted -= 1
+                    self._run_times.append(time.perf_counter() - started)
+
+        def release_if_cancelled(future):
+            # A call cancelled before a worker picked it up never runs, so its slot is released here
+            if future.cancelled():
+                with self._lock:
+                    self._admitted -= 1
+
+        future = self._executor.submit(call)
+        future.add_done_callback(release_if_cancelled)
+        try:
+            # Cancelling the awaiting task cancels the pool future too, as long as the call has not started
+            result = await asyncio.wrap_future(future)
+        except BaseException:
+            with self._lock:
+                self._counters["failed"] += 1
+            raise
+        with self._lock:
+            self._counters["completed"] += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            stats: Dict[str, Any] = {
+                **self._counters,
+                "running": self._running,
+                "queue_depth": self._admitted - self._running,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+            }
+        stats["queue_wait_ms"] = {
+            "mean": round(1000 * sum(waits) / len(waits), 3) if waits else None,
+            "p95": round(1000 * waits[min(len(waits) - 1, int(0.95 * len(waits)))], 3) if waits else None,
+        }
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bundle store backends on the same workload: saves, lookups by id and indexed searches
+
+Usage: python benchmark_bundle_stores.py [--bundles 5000] [--lookups 2000] [--searches 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.models.domain import Benefit, BenefitType, Bundle, BundleStatus, CoverageLevel
+from app.models.schemas import BundleSearchRequest
+from app.services.bundle_store import MemoryBundleStore, RedisBundleStore, SqliteBundleStore, redis
+
+PROVIDERS = [f"Provider {i}" for i in range(12)]
+NETWORKS = ["PPO", "HMO", "EPO"]
+
+def sample_bundles(count: int, rng: random.Random):
+    types, levels, statuses = list(BenefitType), list(CoverageLevel), list(BundleStatus)
+    now = datetime.utcnow()
+    bundles = []
+    for i in range(count):
+        benefits = [
+            Benefit(id=f"b{i}-{j}", name=f"Benefit {j}", type=kind, provider=rng.choice(PROVIDERS),
+                    monthly_premium=rng.uniform(10, 500), annual_deductible=rng.uniform(0, 3000), coinsurance_rate=0.2,
+                    max_out_of_pocket=rng.uniform(500, 8000), coverage_details={}, network_type=rng.choice(NETWORKS))
+            for j, kind in enumerate(rng.sample(types, rng.randint(1, 4)))
+        ]
+        bundles.append(Bundle(id=str(uuid.uuid4()), name=f"Bundle {i}", description="Benchmark bundle",
+                              benefits=benefits, total_monthly_premium=sum(b.monthly_premium for b in benefits),
+                              total_annual_deductible=0.0, total_max_out_of_pocket=0.0,
+                              status=rng.choice(statuses), created_at=now, updated_at=now,
+                              metadata={"coverage_level": rng.choice(levels).value}))
+    return bundles
+
+def sample_searches(count: int, rng: random.Random):
+    types = list(BenefitType)
+    return [BundleSearchRequest(benefit_types=rng.sample(types, rng.randint(0, 2)) or None,
+                                providers=rng.sample(PROVIDERS, 2) if rng.random() < 0.5 else None,
+                                network_type=rng.choice(NETWORKS) if rng.random() < 0.3 else None,
+                                status=BundleStatus.ACTIVE if rng.random() < 0.5 else None,
+                                max_budget=rng.uniform(200, 1500))
+            for _ in range(count)]
+
+def latencies(run, items):
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        run(item)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+def stores(tmp: str):
+    yield "memory", MemoryBundleStore()
+    yield "sqlite (write-through)", SqliteBundleStore(os.path.join(tmp, "through.sqlite3"), flush_interval=0)
+    yield "sqlite (write-behind)", SqliteBundleStore(os.path.join(tmp, "behind.sqlite3"),
+                                                     flush_interval=settings.BUNDLE_STORE_FLUSH_INTERVAL_SECONDS,
+                                                     batch_size=settings.BUNDLE_STORE_BATCH_SIZE)
+    client = redis.from_url(settings.REDIS_URL) if redis is not None else None
+    try:
+        client.ping()
+    except Exception:
+        print(f"Redis is not reachable at {settings.REDIS_URL}; skipped the redis backend")
+        return
+    yield "redis", RedisBundleStore(client)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bundles", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--searches", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    bundles = sample_bundles(args.bundles, rng)
+    lookups = [rng.choice(bundles).id for _ in range(args.lookups)]
+    searches = sample_searches(args.searches, rng)
+
+    print(f"{'backend':<24}{'saves/s':>10}{'get p50 ms':>12}{'get p95 ms':>12}{'search p50 ms':>15}{'search p95 ms':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, store in stores(tmp):
+            start = time.perf_counter()
+            for bundle in bundles:
+                store.save(bundle)
+            store.flush()
+            saves_per_second = len(bundles) / (time.perf_counter() - start)
+            get_p50, get_p95 = latencies(store.get, lookups)
+            search_p50, search_p95 = latencies(lambda criteria: store.search(criteria, limit=20), searches)
+            print(f"{name:<24}{saves_per_second:>10.0f}{get_p50:>12.3f}{get_p95:>12.3f}{search_p50:>15.3f}{search_p95:>15.3f}")
+            if isinstance(store, RedisBundleStore):
+                for bundle in bundles:
+                    store.delete(bundle.id)
+            store.close()
+
+if __name__ == "__main__":
+    main()
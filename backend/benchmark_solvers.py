@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the MIP solver backends on representative plan-selection and bundle problems
+
+Usage: python benchmark_solvers.py [--repeats 20] [--sizes 50 500 2000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.domain import Benefit, BenefitType, BundleRequest, CoverageLevel, EmployeeProfile
+from app.models.records import PlanRecord
+from app.optimization.bundler import BenefitBundler, BundleOptimizer
+from app.optimization.solvers import SOLVER_BACKENDS, highspy
+
+METALS = [("Bronze", 0.6), ("Silver", 0.7), ("Gold", 0.8), ("Platinum", 0.9)]
+
+def sample_plans(count: int, rng: random.Random):
+    plans = []
+    for i in range(count):
+        metal, av = METALS[i % len(METALS)]
+        premium = rng.uniform(250, 900)
+        plans.append(PlanRecord(f"{10000 + i}TX{i:07d}", premium, rng.uniform(0, 9000), rng.uniform(3000, 9450),
+                                i % 5 == 0, av, metal.lower(), "TX", str(10000 + i % 40), f"Plan {i}", metal,
+                                "HMO", "Individual"))
+    return plans
+
+def sample_benefits(count: int, rng: random.Random):
+    types = list(BenefitType)
+    return [
+        Benefit(id=f"b{i}", name=f"Benefit {i}", type=types[i % len(types)], provider=f"Provider {i % 12}",
+                monthly_premium=rng.uniform(10, 500), annual_deductible=rng.uniform(0, 3000), coinsurance_rate=0.2,
+                max_out_of_pocket=rng.uniform(500, 8000), coverage_details={}, network_type="PPO")
+        for i in range(count)
+    ]
+
+def timed(run, repeats: int):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 2000])
+    args = parser.parse_args()
+
+    backends = [name for name in SOLVER_BACKENDS if name != "highs" or highspy is not None]
+    rng = random.Random(7)
+    profile = EmployeeProfile(age=40, risk_score=0.5, budget_cap=700, preference_weights={"cost": 0.5, "coverage": 0.5})
+    request = BundleRequest(name="Benchmark", description="Benchmark bundle", coverage_level=CoverageLevel.INDIVIDUAL,
+                            benefit_types=[BenefitType.HEALTH_INSURANCE, BenefitType.DENTAL, BenefitType.VISION],
+                            budget_constraint=900, max_deductible=6000, preferred_providers=["Provider 1", "Provider 2"])
+
+    print(f"{'problem':<22}{'size':>7}  {'backend':<8}{'median ms':>11}{'max ms':>10}")
+    for size in args.sizes:
+        plans = sample_plans(size, rng)
+        benefits = sample_benefits(size, rng)
+        for name in backends:
+            solver = SOLVER_BACKENDS[name](time_limit=10.0)
+            bundler = BenefitBundler(solver)
+            median, worst = timed(lambda: bundler.optimize(profile, plans), args.repeats)
+            print(f"{'plan selection':<22}{size:>7}  {name:<8}{median:>11.1f}{worst:>10.1f}")
+            optimizer = BundleOptimizer(solver)
+            median, worst = timed(lambda: optimizer.optimize_bundle(benefits, request), args.repeats)
+            print(f"{'bundle (warm start)':<22}{size:>7}  {name:<8}{median:>11.1f}{worst:>10.1f}")
+    if "highs" not in backends:
+        print("highspy is not installed; only CBC was benchmarked")
+
+if __name__ == "__main__":
+    main()
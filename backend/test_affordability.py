@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test script for the census-wide ICHRA affordability engine
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.optimization.affordability import AffordabilityEngine
+from test_allowance import sample_rate_curves
+
+def test_census_affordability():
+    """Each employee is compared against the lowest-cost silver plan for their rating area and age"""
+    engine = AffordabilityEngine(sample_rate_curves(), affordability_percentage=0.0902)
+    census = pd.DataFrame([
+        {"employee_id": "e1", "state_code": "TX", "rating_area_id": "1", "age": 21,
+         "monthly_allowance": 250.0, "household_income": 60000.0},
+        {"employee_id": "e2", "state_code": "tx", "rating_area_id": "Rating Area 2", "age": 21,
+         "monthly_allowance": 0.0, "household_income": 24000.0},
+        {"employee_id": "e3", "state_code": "TX", "rating_area_id": "Rating Area 9", "age": 40,
+         "monthly_allowance": 100.0, "household_income": 50000.0},
+        {"employee_id": "e4", "state_code": "TX", "rating_area_id": "Rating Area 1", "age": 70,
+         "monthly_allowance": 900.0, "household_income": 30000.0},
+    ])
+    result = engine.evaluate(census).set_index("employee_id")
+    print(result[["lcsp_premium", "required_contribution", "affordability_limit", "affordable", "shortfall"]])
+
+    assert result.loc["e1", "lcsp_premium"] == 280.0
+    assert result.loc["e1", "required_contribution"] == 30.0
+    assert result.loc["e1", "affordable"] is True
+
+    assert result.loc["e2", "lcsp_premium"] == 320.0
+    assert result.loc["e2", "affordable"] is False
+    assert abs(result.loc["e2", "shortfall"] - (320.0 - 24000.0 * 0.0902 / 12)) < 1e-9
+
+    assert result.loc["e3", "affordable"] is None  # no silver plan in that area
+    assert result.loc["e4", "lcsp_premium"] == 280.0 * 3.5  # ages above 64 use the "64 and over" rate
+
+if __name__ == "__main__":
+    test_census_affordability()
+    print("Affordability tests passed.")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for the ICHRA allowance table generator
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.domain import AllowanceClass
+from app.optimization.allowance import AllowanceTableGenerator
+from app.optimization.minimum_allowance import MinimumAllowanceSolver
+from app.optimization.rate_curves import RateCurves
+from app.services.data_service import DataService
+from app.services.reload_service import DatasetReloader
+from test_plan_listing import api_client
+from test_reload_service import write_sample_pufs, write_sample_rates
+from test_work_queue import FullExecutor
+
+def sample_rate_curves() -> RateCurves:
+    """Two silver plans and one gold plan in one rating area, one silver plan in another"""
+    plans = [
+        ("11111TX0010001", "Silver", "Rating Area 1", 300.0),
+        ("11111TX0010002", "Silver", "Rating Area 1", 280.0),
+        ("11111TX0010003", "Gold", "Rating Area 1", 250.0),
+        ("11111TX0010001", "Silver", "Rating Area 2", 320.0),
+    ]
+    rows = []
+    for plan_id, _, area, base in plans:
+        rows.append({"PlanId": plan_id, "StateCode": "TX", "RatingAreaId": area, "Age": "0-14", "IndividualRate": base * 0.6})
+        for age in range(15, 64):
+            rows.append({"PlanId": plan_id, "StateCode": "TX", "RatingAreaId": area, "Age": str(age),
+                         "IndividualRate": base * (1 + (age - 21) * 0.05)})
+        rows.append({"PlanId": plan_id, "StateCode": "TX", "RatingAreaId": area, "Age": "64 and over", "IndividualRate": base * 3.5})
+        rows.append({"PlanId": plan_id, "StateCode": "TX", "RatingAreaId": area, "Age": "Family Option", "IndividualRate": 999.0})
+    attributes = pd.DataFrame([
+        {"PlanId": f"{plan_id}-01", "StandardComponentId": plan_id, "MetalLevel": metal, "DentalOnlyPlan": "No"}
+        for plan_id, metal, _, _ in plans
+    ])
+    return RateCurves.from_puf(pd.DataFrame(rows), attributes)
+
+def test_lowest_silver_benchmark():
+    """Lowest-cost silver is taken per rating area and age, ignoring the cheaper gold plan"""
+    curves = sample_rate_curves()
+    states, areas, table = curves.benchmark("Silver", "lowest")
+    assert list(areas) == ["Rating Area 1", "Rating Area 2"]
+    assert table[0, 21] == 280.0
+    assert table[1, 21] == 320.0
+    assert table[0, 5] == 280.0 * 0.6
+
+    _, _, second = curves.benchmark("Silver", "second_lowest")
+    assert second[0, 21] == 300.0
+    assert second[1, 21] == 320.0  # only one silver plan: falls back to the lowest
+
+def test_allowance_table_classes_and_age_ratio():
+    """Class shares, caps and the 3:1 age ratio are applied across all areas and ages"""
+    table = AllowanceTableGenerator(sample_rate_curves()).generate([
+        AllowanceClass(name="full-time", benchmark_share=1.0),
+        AllowanceClass(name="part-time", benchmark_share=0.5, max_allowance=400.0),
+    ])
+    assert table.allowances.shape == (2, 2, 44)
+    assert table.allowances[0, 0, 0] == 280.0
+    assert table.allowances[0, 0, -1] == 3 * 280.0  # 64 and over rate of 3.5x is capped at 3x age 21
+    assert table.allowances[1, 0, 0] == 140.0
+    assert np.nanmax(table.allowances[1]) == 400.0
+    frame = table.to_frame()
+    assert len(frame) == 2 * 2 * 44
+    print(frame.head())
+
+def test_minimum_allowance_search():
+    """Per-class minimum allowances come from sorted thresholds; uncoverable employees cap the reachable coverage"""
+    census = pd.DataFrame([
+        {"employee_id": "1", "state_code": "TX", "rating_area_id": "1", "age": 21, "household_income": 0.0, "class_name": "A"},
+        {"employee_id": "2", "state_code": "TX", "rating_area_id": "1", "age": 21, "household_income": 12000.0, "class_name": "A"},
+        {"employee_id": "3", "state_code": "TX", "rating_area_id": "2", "age": 21, "household_income": 0.0, "class_name": "B"},
+        {"employee_id": "4", "state_code": "TX", "rating_area_id": "9", "age": 21, "household_income": 0.0, "class_name": "B"},
+    ])
+    solver = MinimumAllowanceSolver(sample_rate_curves(), affordability_percentage=0.1)
+    assert list(solver.thresholds(census, "Silver")[:3]) == [250.0, 150.0, 320.0]
+    assert solver.thresholds(census, "Bronze", min_choices=2)[0] == 280.0
+
+    half = solver.solve(census, 0.5, "Silver").classes.set_index("class_name")
+    assert half.loc["A", "monthly_allowance"] == 150.0 and half.loc["A", "coverage"] == 0.5
+    assert half.loc["B", "monthly_allowance"] == 320.0 and half.loc["B", "max_coverage"] == 0.5
+
+    full = solver.solve(census, 1.0, "Silver", annual_budget=5000.0)
+    levels = full.classes.set_index("class_name")["monthly_allowance"]
+    assert levels["A"] == 250.0 and pd.isna(levels["B"]) and full.annual_cost is None
+    assert full.budget_coverage == 0.0  # even one employee per class costs more than the budget
+
+def test_minimum_allowance_endpoint():
+    """POST /api/allowances/minimum reuses one solver per dataset version and sheds load when the queue is full"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_sample_pufs(Path(tmp))
+        service = DataService()
+        service.load_cms_data(tmp)
+        client = api_client(service)
+        body = {"employees": [{"employee_id": "1", "state_code": "TX", "rating_area_id": "1", "age": 21,
+                               "household_income": 0.0, "class_name": "A"}], "target_coverage": 1.0}
+
+        response = client.post("/api/allowances/minimum", json=body)
+        assert response.status_code == 200
+        assert response.json()["classes"][0]["monthly_allowance"] == 350.0
+        solver = service.get_derived("minimum_allowance_solver", lambda: None)
+        assert client.post("/api/allowances/minimum", json=body).status_code == 200
+        assert service.get_derived("minimum_allowance_solver", lambda: None) is solver
+
+        write_sample_rates(Path(tmp), ak_rate=425.0)
+        DatasetReloader(service).reload()
+        assert client.post("/api/allowances/minimum", json=body).status_code == 200
+        assert service.get_derived("minimum_allowance_solver", lambda: None) not in (None, solver)
+
+        client.app.state.optimize_executor = FullExecutor()
+        overloaded = client.post("/api/allowances/minimum", json=body)
+        assert overloaded.status_code == 503 and overloaded.headers["retry-after"] == "3"
+
+if __name__ == "__main__":
+    test_lowest_silver_benchmark()
+    test_allowance_table_classes_and_age_ratio()
+    test_minimum_allowance_search()
+    test_minimum_allowance_endpoint()
+    print("Allowance tests passed.")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for the embedded analytics query engine
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app.services.data_service as data_service_module
+from app.cli import ingest_pufs
+from app.services.analytics import QueryTimeoutError
+from app.services.data_service import DataService
+from app.services.shared_dataset import SharedDatasetStore
+from test_plan_listing import api_client
+from test_reload_service import write_sample_pufs
+
+def test_read_only_queries_with_limits():
+    """Aggregates and joins run; writes, multiple statements and runaway queries are refused"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_sample_pufs(Path(tmp))
+        service = DataService()
+        service.load_cms_data(tmp)
+        engine = service.get_analytics_engine()
+        assert {"plans", "rates", "benefits"} <= set(engine.schema())
+
+        result = engine.query("SELECT state_code, median(monthly_premium), percentile(monthly_premium, 100) "
+                              "FROM plans GROUP BY state_code ORDER BY state_code")
+        assert result["columns"][0] == "state_code"
+        assert result["rows"] == [["AK", 400.0, 400.0], ["TX", 350.0, 350.0]]
+
+        joined = engine.query("SELECT p.plan_marketing_name, r.individual_rate FROM plans p JOIN rates r "
+                              "ON r.plan_id = p.standard_component_id WHERE r.state_code = ?", ["TX"])
+        assert joined["rows"] == [["TX Gold", 350.0]]
+
+        truncated = engine.query("SELECT plan_id FROM plans", max_rows=1)
+        assert truncated["row_count"] == 1 and truncated["truncated"]
+
+        for statement in ("DELETE FROM plans", "CREATE TABLE t (x)", "ATTACH DATABASE ':memory:' AS other",
+                          "PRAGMA query_only = OFF", "SELECT 1; DELETE FROM plans", "SELECT nonsense FROM plans"):
+            try:
+                engine.query(statement)
+                raise AssertionError(f"{statement!r} was not refused")
+            except ValueError:
+                pass
+        assert engine.query("SELECT COUNT(*) FROM plans")["rows"] == [[2]]
+
+        try:
+            engine.query("WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT MAX(x) FROM n",
+                         timeout_seconds=0.05)
+            raise AssertionError("runaway query was not interrupted")
+        except QueryTimeoutError:
+            pass
+        assert engine.query("SELECT COUNT(*) FROM rates")["rows"] == [[2]]
+        assert engine.query("SELECT x'00ff'")["rows"] == [["00ff"]]
+
+        # Waiting for a busy connection counts against the time limit
+        engine._lock.acquire()
+        try:
+            engine.query("SELECT 1", timeout_seconds=0.05)
+            raise AssertionError("query waited past its time limit")
+        except QueryTimeoutError:
+            pass
+        finally:
+            engine._lock.release()
+
+def attach_without_puf_frames(data_directory: str, shared_directory: str) -> DataService:
+    """A worker attached to a snapshot that was exported without the raw PUF columns"""
+    assert SharedDatasetStore(shared_directory).load_or_attach(DataService(), data_directory) == "built"
+    snapshot = SharedDatasetStore(shared_directory).current()
+    manifest = json.loads((snapshot.path / "manifest.json").read_text())
+    del manifest["puf_frames"]
+    (snapshot.path / "manifest.json").write_text(json.dumps(manifest))
+    service = DataService()
+    assert SharedDatasetStore(shared_directory).load_or_attach(service, data_directory) == "attached"
+    return service
+
+def test_attached_worker_queries_puf_tables():
+    """A worker attached to a shared snapshot serves the rate and benefits tables, or 503 when it cannot read them"""
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as shared:
+        write_sample_pufs(Path(tmp))
+        builder, attached = DataService(), DataService()
+        assert SharedDatasetStore(shared).load_or_attach(builder, tmp) == "built"
+        assert SharedDatasetStore(shared).load_or_attach(attached, tmp) == "attached"
+        assert attached.rate_df is None
+
+        client = api_client(attached)
+        counted = client.post("/api/analytics/query", json={"sql": "SELECT COUNT(*) FROM rates"})
+        assert counted.status_code == 200 and counted.json()["rows"] == [[2]]
+        rates = client.get("/api/puf/rate", params={"state_code": "TX"}).json()["rows"]
+        built = api_client(builder).get("/api/puf/rate", params={"state_code": "TX"}).json()["rows"]
+        assert len(rates) == 1 and rates == built
+
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as shared:
+        write_sample_pufs(Path(tmp))
+        client = api_client(attach_without_puf_frames(tmp, shared))
+        # Neither the snapshot nor a columnar store holds the rates: 503, not empty tables
+        assert client.post("/api/analytics/query", json={"sql": "SELECT COUNT(*) FROM rates"}).status_code == 503
+        assert client.get("/api/analytics/schema").status_code == 503
+        assert client.get("/api/puf/rate", params={"state_code": "TX"}).status_code == 503
+
+def test_attached_worker_reads_puf_tables_from_store():
+    """Without the PUF columns in the snapshot, an attached worker builds its tables from the columnar store"""
+    pytest.importorskip("pyarrow")
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as shared, \
+            tempfile.TemporaryDirectory() as store_dir:
+        write_sample_pufs(Path(tmp))
+        assert ingest_pufs(tmp, store_dir) == {"rate": 2}
+        service = attach_without_puf_frames(tmp, shared)
+        settings = data_service_module.settings
+        previous = getattr(settings, "PUF_STORE_DIRECTORY", None)
+        settings.PUF_STORE_DIRECTORY = store_dir
+        try:
+            assert service.query_analytics("SELECT COUNT(*) FROM rates")["rows"] == [[2]]
+            assert service.query_analytics("SELECT individual_rate FROM rates WHERE state_code = 'AK'")["rows"] == [[400.0]]
+        finally:
+            settings.PUF_STORE_DIRECTORY = previous
+
+if __name__ == "__main__":
+    test_read_only_queries_with_limits()
+    test_attached_worker_queries_puf_tables()
+    test_attached_worker_reads_puf_tables_from_store()
+    print("Analytics tests passed.")
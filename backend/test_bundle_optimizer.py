@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for compiled bundle model templates and warm-started re-solves
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.domain import Benefit, BenefitType, BundleRequest, CoverageLevel
+from app.optimization.bundler import BundleOptimizer
+
+def sample_catalog():
+    """Two health plans, two dental plans and one vision plan from three providers"""
+    rows = [
+        ("h1", BenefitType.HEALTH_INSURANCE, "Acme", 450.0, 1500.0, 6000.0),
+        ("h2", BenefitType.HEALTH_INSURANCE, "Zenith", 380.0, 3000.0, 8000.0),
+        ("d1", BenefitType.DENTAL, "Acme", 35.0, 50.0, 1000.0),
+        ("d2", BenefitType.DENTAL, "Zenith", 25.0, 100.0, 1500.0),
+        ("v1", BenefitType.VISION, "Orbit", 12.0, 0.0, 300.0),
+    ]
+    return [
+        Benefit(id=benefit_id, name=benefit_id, type=benefit_type, provider=provider, monthly_premium=premium,
+                annual_deductible=deductible, coinsurance_rate=0.2, max_out_of_pocket=oop,
+                coverage_details={}, network_type="PPO")
+        for benefit_id, benefit_type, provider, premium, deductible, oop in rows
+    ]
+
+def bundle_request(**overrides) -> BundleRequest:
+    fields = dict(name="Test", description="Test bundle", coverage_level=CoverageLevel.INDIVIDUAL,
+                  benefit_types=[BenefitType.HEALTH_INSURANCE, BenefitType.DENTAL])
+    fields.update(overrides)
+    return BundleRequest(**fields)
+
+def test_template_reuse_and_warm_start():
+    """Requests over one catalog share a template; re-solves warm-start from a still-feasible incumbent"""
+    optimizer = BundleOptimizer()
+    catalog = sample_catalog()
+    first = optimizer.solve(catalog, bundle_request(budget_constraint=500))
+    assert [b.id for b in first.selected] == ["h2", "d2"]
+    assert first.status == "Optimal" and not first.warm_started
+
+    second = optimizer.solve(sample_catalog(), bundle_request(budget_constraint=450))
+    assert optimizer.template_for(catalog) is optimizer.template_for(sample_catalog())
+    assert [b.id for b in second.selected] == ["h2", "d2"] and second.warm_started
+
+    # The incumbent breaks the deductible cap, so this solve starts cold
+    capped = optimizer.solve(catalog, bundle_request(max_deductible=1600))
+    assert [b.id for b in capped.selected] == ["h1", "d2"] and not capped.warm_started
+    assert optimizer.get_objective_value() == 475.0
+
+def test_concurrent_solves():
+    """One optimizer serves concurrent requests with different right-hand sides"""
+    optimizer = BundleOptimizer()
+    catalog = sample_catalog()
+    requests = [bundle_request(max_deductible=1600), bundle_request(budget_constraint=500)] * 4
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda request: optimizer.optimize_bundle(catalog, request), requests))
+    assert [[b.id for b in result] for result in results] == [["h1", "d2"], ["h2", "d2"]] * 4
+
+if __name__ == "__main__":
+    test_template_reuse_and_warm_start()
+    test_concurrent_solves()
+    print("Bundle optimizer tests passed.")
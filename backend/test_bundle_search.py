@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Test script for index-backed bundle search across the bundle store backends
+"""
+
+import asyncio
+import fnmatch
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.domain import Benefit, Bundle, BundleStatus
+from app.models.schemas import BundleSearchRequest
+from app.services.bundle_store import MemoryBundleStore, RedisBundleStore, SqliteBundleStore
+from app.services.data_service import DataService
+
+class FakeRedis:
+    """Just enough of the Redis command set used by the bundle indexes, kept in dicts"""
+    def __init__(self):
+        self.values, self.sets, self.zsets = {}, {}, {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def keys(self, pattern):
+        return [key for key in self.values if fnmatch.fnmatchcase(key, pattern)]
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def delete(self, *keys):
+        return sum(any(store.pop(key, None) is not None for store in (self.values, self.sets, self.zsets)) for key in keys)
+
+    def expire(self, key, ttl):
+        return True
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    def srem(self, key, *members):
+        self.sets.get(key, set()).difference_update(members)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def sunionstore(self, dest, keys):
+        self.sets[dest] = set().union(*(self.sets.get(key, set()) for key in keys))
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(member)
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+    def zinterstore(self, dest, weights):
+        def scores(key):
+            return self.zsets[key] if key in self.zsets else dict.fromkeys(self.sets.get(key, set()), 1.0)
+        members = set.intersection(*(set(scores(key)) for key in weights))
+        self.zsets[dest] = {m: sum(scores(key)[m] * w for key, w in weights.items()) for m in members}
+
+    def _range(self, key, low, high):
+        low, high = float(low), float(high)
+        return sorted((score, m) for m, score in self.zsets.get(key, {}).items() if low <= score <= high)
+
+    def zcount(self, key, low, high):
+        return len(self._range(key, low, high))
+
+    def zrangebyscore(self, key, low, high, start=0, num=None):
+        members = [m for _, m in self._range(key, low, high)]
+        return members[start:] if num is None else members[start:start + num]
+
+    def zremrangebyscore(self, key, low, high):
+        members = [m for _, m in self._range(key, low, high)]
+        self.zrem(key, *members)
+        return len(members)
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client, self.calls = client, []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+def make_bundle(bundle_id, premium, benefits, status=BundleStatus.ACTIVE, coverage_level="individual"):
+    now = datetime.utcnow()
+    return Bundle(
+        id=bundle_id, name=bundle_id, description="", total_monthly_premium=premium,
+        total_annual_deductible=0.0, total_max_out_of_pocket=0.0, status=status,
+        created_at=now, updated_at=now, metadata={"coverage_level": coverage_level},
+        benefits=[Benefit(id=f"{bundle_id}-{kind}", name=kind, type=kind, provider=provider, monthly_premium=0.0,
+                          annual_deductible=0.0, coinsurance_rate=0.0, max_out_of_pocket=0.0,
+                          coverage_details={}, network_type=network) for kind, provider, network in benefits]
+    )
+
+def bundle_service_with(store):
+    service = DataService()
+    service.bundle_store = store
+    return service
+
+async def ids(service, limit=10, offset=0, **criteria):
+    bundles, total = await service.search_bundles(BundleSearchRequest(**criteria), limit=limit, offset=offset)
+    return [bundle.id for bundle in bundles], total
+
+def test_search_intersects_indexes_and_pages():
+    """Every backend filters on each facet, pages in premium order and follows updates and deletes"""
+    stores = [MemoryBundleStore(), SqliteBundleStore(flush_interval=0.01, batch_size=2),
+              SqliteBundleStore(flush_interval=0), RedisBundleStore(FakeRedis())]
+
+    async def run(service):
+        await service.save_bundle(make_bundle("a", 500, [("health_insurance", "Aetna", "PPO"), ("dental", "Delta Dental", "PPO")]))
+        await service.save_bundle(make_bundle("b", 300, [("health_insurance", "Cigna", "HMO"), ("dental", "Delta Dental", "PPO")]))
+        await service.save_bundle(make_bundle("c", 100, [("dental", "Guardian", "PPO")], status=BundleStatus.DRAFT))
+
+        assert await ids(service) == (["c", "b", "a"], 3)
+        assert await ids(service, benefit_types=["health_insurance", "dental"]) == (["b", "a"], 2)
+        assert await ids(service, providers=["aetna", "Guardian"]) == (["c", "a"], 2)
+        assert await ids(service, providers=["Aetna", "Delta Dental"]) == (["b", "a"], 2)
+        assert await ids(service, providers=["Aetna", "Delta Dental"], max_budget=600, limit=1, offset=1) == (["a"], 2)
+        assert await ids(service, max_budget=300, status="active") == (["b"], 1)
+        assert await ids(service, network_type="hmo", coverage_level="individual") == (["b"], 1)
+        assert await ids(service, limit=1, offset=1) == (["b"], 3)
+        assert (await service.get_bundle("a")).total_monthly_premium == 500
+        assert len(await service.get_bundles(limit=10)) == 3
+
+        await service.save_bundle(make_bundle("b", 800, [("vision", "VSP", "PPO")]))
+        assert await ids(service, benefit_types=["health_insurance"]) == (["a"], 1)
+        assert await ids(service, providers=["VSP"], max_budget=1000) == (["b"], 1)
+        assert await service.delete_bundle("a")
+        assert not await service.delete_bundle("a")
+        assert await service.get_bundle("a") is None
+        assert await ids(service) == (["c", "b"], 2)
+
+    for store in stores:
+        asyncio.run(run(bundle_service_with(store)))
+        store.close()
+
+def test_expired_bundles_leave_search_results():
+    """Expired bundles are neither returned nor counted, and Redis removes them from every index"""
+    for store in (MemoryBundleStore(), SqliteBundleStore(flush_interval=0), RedisBundleStore(FakeRedis())):
+        service = bundle_service_with(store)
+
+        async def run():
+            await service.save_bundle(make_bundle("b", 300, [("dental", "Delta Dental", "PPO")]))
+            store.ttl_seconds = -1
+            await service.save_bundle(make_bundle("c", 100, [("dental", "Guardian", "PPO")]))
+            assert await ids(service) == (["b"], 1)
+            assert await ids(service, providers=["Guardian"]) == ([], 0)
+
+        asyncio.run(run())
+        if isinstance(store, RedisBundleStore):
+            assert all("c" not in members for members in store.client.sets.values())
+            assert all("c" not in scores for scores in store.client.zsets.values())
+            assert all("bundle_idx:tmp" not in key for key in list(store.client.zsets) + list(store.client.sets))
+        store.close()
+
+def test_sqlite_write_behind():
+    """Buffered SQLite writes are readable at once and reach the file on flush or close"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bundles.sqlite3")
+        store = SqliteBundleStore(path, flush_interval=60, batch_size=3)
+        store.save(make_bundle("a", 100, [("dental", "Guardian", "PPO")]))
+        store.save(make_bundle("b", 200, [("dental", "Guardian", "PPO")]))
+        assert store.get("a").id == "a"
+
+        def on_disk():
+            with sqlite3.connect(path) as connection:
+                return connection.execute("SELECT COUNT(*) FROM bundles").fetchone()[0]
+
+        assert on_disk() == 0
+        store.save(make_bundle("c", 300, [("dental", "Guardian", "PPO")]))
+        assert on_disk() == 3
+        store.delete("c")
+        assert store.get("c") is None and on_disk() == 3
+        store.close()
+        assert on_disk() == 2
+
+        # A failing flush keeps the write buffered instead of failing the save
+        class FailingWrites:
+            def __init__(self, connection):
+                self.connection = connection
+
+            def executemany(self, *args):
+                raise sqlite3.OperationalError("disk I/O error")
+
+            def __getattr__(self, name):
+                return getattr(self.connection, name)
+
+        failing = SqliteBundleStore(path, flush_interval=0)
+        connection = failing._connection
+        failing._connection = FailingWrites(connection)
+        failing.save(make_bundle("d", 50, [("dental", "Guardian", "PPO")]))
+        assert failing.get("d").id == "d"
+        failing._connection = connection
+        failing.flush()
+        assert on_disk() == 3
+        failing.close()
+        reopened = SqliteBundleStore(path, flush_interval=0)
+        assert [bundle.id for bundle in reopened.search(BundleSearchRequest())[0]] == ["d", "a", "b"]
+        reopened.close()
+
+if __name__ == "__main__":
+    test_search_intersects_indexes_and_pages()
+    test_expired_bundles_leave_search_results()
+    test_sqlite_write_behind()
+    print("Bundle search tests passed.")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test script for the command-line census optimizer
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.cli import optimize_census
+from test_reload_service import write_sample_pufs
+
+def test_optimize_census_streams_results():
+    """Every census row gets a result row; rows that cannot be optimized carry their error"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp) / "data"
+        data_path.mkdir()
+        write_sample_pufs(data_path)
+        pd.DataFrame({
+            "employee_id": ["E1", "E2", "E3", "E4", "E5"],
+            "state_code": ["AK", "tx", "ZZ", "AK", "TX"],
+            "age": [21, 21, 40, 21, 21],
+            "budget_cap": [600, 600, 600, 100, 600],
+            "rating_area_id": ["1", "1", "1", "1", "Rating Area 1"],
+        }).to_csv(Path(tmp) / "census.csv", index=False)
+
+        summary = optimize_census(str(Path(tmp) / "census.csv"), str(Path(tmp) / "out.csv"),
+                                  workers=1, chunk_size=2, data_directory=str(data_path))
+        results = pd.read_csv(Path(tmp) / "out.csv").set_index("employee_id")
+        assert summary["rows"] == 5 and summary["errors"] == 2
+        assert results.loc["E1", "plan_id"] == "11111AK0010001" and results.loc["E1", "monthly_premium"] == 400.0
+        assert results.loc["E2", "plan_id"] == results.loc["E5", "plan_id"] == "22222TX0010001"
+        assert "No plans found" in results.loc["E3", "error"]
+        assert pd.isna(results.loc["E4", "plan_id"]) and isinstance(results.loc["E4", "error"], str)
+
+if __name__ == "__main__":
+    test_optimize_census_streams_results()
+    print("Census CLI tests passed.")
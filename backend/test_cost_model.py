@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the Monte Carlo expected annual cost model
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.domain import EmployeeProfile
+from app.models.records import PlanRecord
+from app.optimization.bundler import BenefitBundler
+from app.optimization.cost_model import RISK_BUCKETS, ExpectedCostModel, risk_bucket
+
+def sample_plans():
+    """A bronze, silver, gold and platinum plan"""
+    rows = [("B", 7500.0, 9200.0, 0.6, "bronze"), ("S", 4200.0, 8700.0, 0.7, "silver"),
+            ("G", 1500.0, 6100.0, 0.8, "gold"), ("P", 0.0, 3500.0, 0.9, "platinum")]
+    return [PlanRecord(plan_id, 400.0, deductible, oop, False, av, tier, "TX", "11111", plan_id, tier.title(),
+                       "PPO", "Individual") for plan_id, deductible, oop, av, tier in rows]
+
+def test_seeded_draws_are_reproducible():
+    """Models with the same seed agree exactly; another seed gives different draws"""
+    plans = sample_plans()
+    first = ExpectedCostModel(samples=2000).expected_out_of_pocket(plans, 0.4)
+    again = ExpectedCostModel(samples=2000).expected_out_of_pocket(plans, 0.4)
+    other = ExpectedCostModel(samples=2000, seed=7).expected_out_of_pocket(plans, 0.4)
+    assert first.tolist() == again.tolist()
+    assert not np.array_equal(first, other)
+    assert np.allclose(first, other, rtol=0.15)
+
+def test_expected_cost_rises_with_risk_bucket():
+    """Expected spending never falls as the risk bucket rises, and stays within [0, out-of-pocket max]"""
+    plans = sample_plans()
+    model = ExpectedCostModel()
+    by_bucket = np.array([model.expected_out_of_pocket(plans, bucket / RISK_BUCKETS)
+                          for bucket in range(RISK_BUCKETS + 1)])
+    assert (np.diff(by_bucket, axis=0) >= 0).all()
+    assert (by_bucket >= 0).all() and (by_bucket <= [plan.out_of_pocket_max for plan in plans]).all()
+    # Richer plans leave the member less to pay at every risk level
+    assert (np.diff(by_bucket, axis=1) <= 0).all()
+
+def test_estimates_are_cached_per_plan_and_bucket():
+    """Repeat scoring within a risk bucket is served from the cache; only new plans are simulated"""
+    plans = sample_plans()
+    model = ExpectedCostModel(samples=1000)
+    simulated = []
+    simulate = model.simulate
+    model.simulate = lambda batch, risk_score: simulated.append([plan.plan_id for plan in batch]) or simulate(batch, risk_score)
+
+    first = model.expected_out_of_pocket(plans[:2], 0.5)
+    assert risk_bucket(0.5) == risk_bucket(0.51)
+    assert model.expected_out_of_pocket(plans[:2], 0.51).tolist() == first.tolist()
+    assert simulated == [["B", "S"]]
+
+    mixed = model.expected_out_of_pocket(plans[::-1], 0.5)
+    assert simulated == [["B", "S"], ["P", "G"]]
+    assert mixed[2:].tolist() == first[::-1].tolist()
+
+    model.expected_out_of_pocket(plans[:1], 0.9)
+    assert simulated[-1] == ["B"]
+    assert sorted(model._cache) == sorted([(plan.plan_id, risk_bucket(0.5)) for plan in plans] +
+                                          [("B", risk_bucket(0.9))])
+
+def test_expected_annual_cost_drives_cost_aware_utility():
+    """Annual cost is twelve premiums plus expected spending, and the cost-aware utility ranks plans by it"""
+    plans = sample_plans()
+    model = ExpectedCostModel(samples=2000)
+    premiums = [310.0, 420.0, 515.0, 640.0]
+    total = model.expected_annual_cost(plans, 0.9, premiums)
+    assert np.allclose(total, 12 * np.array(premiums) + model.expected_out_of_pocket(plans, 0.9))
+
+    profile = EmployeeProfile(age=40, risk_score=0.9, budget_cap=550.0,
+                              preference_weights={"cost": 0.5, "coverage": 0.0, "network": 0.3, "flexibility": 0.2})
+    scores = BenefitBundler().utility_scores(profile, plans, premiums, model)
+    assert scores.max() == 1.0 and np.argmax(scores) == np.argmin(total)
+    assert (np.argsort(-scores) == np.argsort(total)).all()
+
+if __name__ == "__main__":
+    test_seeded_draws_are_reproducible()
+    test_expected_cost_rises_with_risk_bucket()
+    test_estimates_are_cached_per_plan_and_bucket()
+    test_expected_annual_cost_drives_cost_aware_utility()
+    print("Cost model tests passed.")
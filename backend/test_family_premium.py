@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test script for family-tier and age-rated household premiums
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.domain import CoverageLevel, EmployeeProfile
+from app.optimization.family_premium import FamilyPremiumCalculator
+from app.optimization.rate_curves import RateCurves
+
+def sample_calculator() -> FamilyPremiumCalculator:
+    """One age-rated plan and one plan filed with family-tier rates"""
+    rows = [{"PlanId": "11111NY0010001", "StateCode": "NY", "RatingAreaId": "Rating Area 1", "Age": "0-14", "IndividualRate": 100.0}]
+    rows += [{"PlanId": "11111NY0010001", "StateCode": "NY", "RatingAreaId": "Rating Area 1", "Age": str(age),
+              "IndividualRate": 100.0 + age} for age in range(15, 64)]
+    rows.append({"PlanId": "22222NY0010001", "StateCode": "NY", "RatingAreaId": "Rating Area 1", "Age": "Family Option",
+                 "IndividualRate": 500.0, "Couple": 1000.0, "PrimarySubscriberAndOneDependent": 850.0,
+                 "PrimarySubscriberAndTwoDependents": 850.0, "PrimarySubscriberAndThreeOrMoreDependents": 850.0,
+                 "CoupleAndOneDependent": 1400.0, "CoupleAndTwoDependents": 1400.0, "CoupleAndThreeOrMoreDependents": 1400.0})
+    return FamilyPremiumCalculator(RateCurves.from_puf(pd.DataFrame(rows)))
+
+def test_family_premiums():
+    """Family-tier rates win where filed; otherwise member premiums are summed, charging at most three children"""
+    calculator = sample_calculator()
+    family = EmployeeProfile(age=40, risk_score=0.3, budget_cap=3000, coverage_level=CoverageLevel.FAMILY,
+                             spouse_age=38, dependent_ages=[12, 10, 8, 3])
+    premiums = calculator.premiums(["11111NY0010001-01", "22222NY0010001-01", "99999NY0010001-01"], family,
+                                   fallback=[0.0, 0.0, 200.0])
+    assert premiums[0] == 140.0 + 138.0 + 3 * 100.0
+    assert premiums[1] == 1400.0
+    assert premiums[2] == 200.0 * 5  # not in the Rate PUF: listed premium per charged member
+
+    spouse_only = family.model_copy(update={"coverage_level": CoverageLevel.EMPLOYEE_AND_SPOUSE})
+    assert list(calculator.premiums(["11111NY0010001", "22222NY0010001"], spouse_only)) == [278.0, 1000.0]
+
+if __name__ == "__main__":
+    test_family_premiums()
+    print("Family premium tests passed.")
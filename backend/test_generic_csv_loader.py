@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized generic CSV loader
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.domain import PlanFeature
+from app.models.records import dumps_plans
+from app.services.data_service import DataService
+from app.services.puf_parsing import parse_cost_sharing
+
+assertLogs = unittest.TestCase().assertLogs
+
+def test_parse_cost_sharing():
+    """Money, percentage and free-text cost-sharing strings are coerced in bulk"""
+    values = pd.Series(["$1,500", "20%", "$25 Copay after deductible", "Not Applicable", "No Charge", None, "72", "0.85"])
+    parsed = parse_cost_sharing(values).tolist()
+    assert parsed == [1500.0, 0.2, 25.0, 0.0, 0.0, 0.0, 72.0, 0.85]
+
+def test_generic_csv_plans():
+    """Alternate column names are resolved per file and invalid rows are skipped"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pd.DataFrame({
+            "plan_id": ["A1", "A2", "", "A4"],
+            "MonthlyPremium": ["$410.50", "$1,200", "$300", "$250"],
+            "deductible": ["$3,000", "Not Applicable", "$0", "$500"],
+            "MaxOutOfPocket": ["$9,100", "$8,000", "$1", "$2"],
+            "ActuarialValue": ["72%", "0.91", "0.8", "1.5"],
+            "IsHSAEligible": ["Yes", "No", "No", "No"],
+            "StateCode": ["TX", "TX", "TX", "TX"],
+            "ServiceAreaId": ["TXS001", None, None, None],
+        }).to_csv(Path(tmp) / "plans.csv", index=False)
+        plans = DataService().load_cms_data(tmp)
+
+        assert [plan.plan_id for plan in plans] == ["A1", "A2"]
+        first, second = plans
+        assert first.monthly_premium == 410.5 and first.deductible == 3000.0 and first.out_of_pocket_max == 9100.0
+        assert first.actuarial_value == 0.72 and first.network_tier == "silver" and first.hsa_eligible
+        assert first.metal_level == "Silver" and first.service_area_id == "TXS001"
+        assert second.monthly_premium == 1200.0 and second.deductible == 0.0
+        assert second.network_tier == "platinum" and second.service_area_id is None
+
+        # Records serialize to exactly what the PlanFeature response schema describes
+        serialized = json.loads(dumps_plans(plans))
+        assert serialized == [PlanFeature(**plan.to_dict()).model_dump() for plan in plans]
+
+def test_generic_csv_drops_invalid_rows():
+    """Rows PlanFeature would reject (or with negative amounts) are dropped and logged; a blank premium reads as 0"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pd.DataFrame({
+            "plan_id": ["OK1", "NEG_PREMIUM", "NO_PREMIUM", "BAD_PREMIUM", "NEG_DEDUCTIBLE", "NEG_OOP", "HIGH_AV", "OK2"],
+            "MonthlyPremium": ["$400", "-$10", None, "call us", "$300", "$300", "$300", "0"],
+            "deductible": ["$1,000", "$0", "$0", "$0", "-500", "$0", "$0", "Not Applicable"],
+            "MaxOutOfPocket": ["$5,000", "$1", "$1", "$1", "$1", "-$1", "$1", "$1"],
+            "ActuarialValue": ["0.62", "0.7", "0.7", "0.7", "0.7", "0.7", "120%", "0.95"],
+            "StateCode": ["TX"] * 8,
+        }).to_csv(Path(tmp) / "plans.csv", index=False)
+        with assertLogs("app.services.data_service") as logs:
+            plans = DataService().load_cms_data(tmp)
+
+        assert [plan.plan_id for plan in plans] == ["OK1", "NO_PREMIUM", "BAD_PREMIUM", "OK2"]
+        assert plans[0].network_tier == "bronze" and plans[-1].monthly_premium == 0.0 and plans[-1].deductible == 0.0
+        # As before vectorization, a blank or unparseable premium is kept as 0.0 rather than dropped
+        assert plans[1].monthly_premium == plans[2].monthly_premium == 0.0
+        for plan in plans:
+            PlanFeature(**plan.to_dict())
+        messages = "\n".join(logs.output)
+        for reason in ("1 rows with negative premium", "1 rows with negative deductible",
+                       "1 rows with negative out-of-pocket maximum", "1 rows with actuarial value outside [0, 1]"):
+            assert reason in messages, reason
+
+if __name__ == "__main__":
+    test_parse_cost_sharing()
+    test_generic_csv_plans()
+    test_generic_csv_drops_invalid_rows()
+    print("Generic CSV loader tests passed.")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test script for background dataset loading and readiness progress
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.data_service import DataService
+from app.services.load_progress import BackgroundLoader
+
+def test_background_load_reports_stages():
+    """A background load records per-file and per-stage progress and turns ready once the index is built"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pd.DataFrame({
+            "plan_id": ["A1", "A2"], "MonthlyPremium": [410.5, 520.0], "ActuarialValue": [0.7, 0.8],
+            "StateCode": ["TX", "FL"],
+        }).to_csv(Path(tmp) / "plans.csv", index=False)
+        service = DataService()
+        ready = []
+        loader = BackgroundLoader(service)
+        loader.start(tmp, on_ready=lambda: ready.append(True))
+        loader.join(30)
+
+        progress = service.load_progress.snapshot()
+        assert progress["state"] == "ready" and ready == [True]
+        stages = {stage["name"]: stage for stage in progress["stages"]}
+        assert stages["read_plan_attributes"]["status"] == "skipped"
+        assert stages["read_plans.csv"]["rows"] == 2 and stages["read_plans.csv"]["bytes"] > 0
+        assert stages["publish"]["status"] == "done" and stages["plan_index"]["states"] == 2
+
+def test_background_load_failure():
+    """A load that produces no data leaves the service not ready with an error"""
+    service = DataService()
+    loader = BackgroundLoader(service)
+    loader.start("/nonexistent/data")
+    loader.join(30)
+    progress = service.load_progress.snapshot()
+    assert progress["state"] == "failed" and "No CMS data" in progress["error"]
+
+if __name__ == "__main__":
+    test_background_load_reports_stages()
+    test_background_load_failure()
+    print("Load progress tests passed.")
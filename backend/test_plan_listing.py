@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the indexed plan listing: stable paging, cursors, sort keys and field projection
+"""
+
+import base64
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.api import bundle
+from app.models.records import PLAN_RECORD_FIELDS
+from app.services.data_service import DataService
+from app.services.plan_index import SORT_KEYS, PlanIndex, cursor_scope, decode_cursor, encode_cursor, project
+from app.services.response_cache import ResponseCache
+
+def write_sample_plans(data_path: Path):
+    """Twelve plans in two states; premiums repeat so that sorting has ties to break"""
+    pd.DataFrame({
+        "plan_id": [f"P{i:02d}" for i in range(12)][::-1],
+        "MonthlyPremium": [300, 250, 300, 410, 250, 300, 520, 250, 300, 410, 610, 300],
+        "deductible": [4000, 6000, 1500, 4000, 0, 2500, 1000, 6000, 4000, 2500, 0, 1500],
+        "ActuarialValue": [0.7, 0.6, 0.8, 0.7, 0.9, 0.7, 0.8, 0.6, 0.7, 0.8, 0.9, 0.8],
+        "StateCode": ["TX", "TX", "FL", "TX", "FL", "TX", "TX", "FL", "TX", "TX", "FL", "TX"],
+    }).to_csv(data_path / "plans.csv", index=False)
+
+def api_client(service: DataService) -> TestClient:
+    """Client for the bundle API routes serving the given (already loaded) data service"""
+    app = FastAPI()
+    app.include_router(bundle.router, prefix="/api")
+    app.state.data_service = service
+    app.state.plan_response_cache = ResponseCache()
+    return TestClient(app)
+
+def sorted_ids(plans, field: str, descending: bool = False):
+    # Expected order: by the sort field, ties by plan id (the whole order reversed when descending)
+    ordered = [plan.plan_id for plan in sorted(plans, key=lambda plan: (getattr(plan, field), plan.plan_id))]
+    return ordered[::-1] if descending else ordered
+
+def test_pages_are_stable_and_complete():
+    """Paging through any sort key visits every plan once, in sort order with ties broken by plan id"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_sample_plans(Path(tmp))
+        plans = DataService().load_cms_data(tmp)
+        index = PlanIndex(plans)
+        for sort_by, field in SORT_KEYS.items():
+            for descending in (False, True):
+                for state in (None, "tx"):
+                    expected = sorted_ids([plan for plan in plans if state is None or plan.state_code == "TX"],
+                                          field, descending)
+                    seen, offset = [], 0
+                    while True:
+                        page, total = index.page(state, sort_by, descending, offset=offset, limit=5)
+                        assert total == len(expected)
+                        if not page:
+                            break
+                        seen += [plan.plan_id for plan in page]
+                        offset += 5
+                    assert seen == expected, (sort_by, descending, state)
+
+        cheap, total = index.page("TX", "premium", filters={"max_premium": 300})
+        assert total == 5 and [plan.plan_id for plan in cheap] == ["P10", "P00", "P03", "P06", "P11"]
+        assert index.page("ZZ") == ([], 0)
+        try:
+            index.page(sort_by="popularity")
+            raise AssertionError("unknown sort key was accepted")
+        except ValueError:
+            pass
+
+def test_cursor_round_trip_and_tampering():
+    """Cursors decode to what was encoded; anything else is rejected as malformed"""
+    scope = cursor_scope("tx", "premium", False, {"max_premium": 300.0})
+    assert decode_cursor(encode_cursor("v1", 150, scope)) == ("v1", 150, scope)
+    assert decode_cursor(encode_cursor(None, 0)) == (None, 0, None)
+    assert scope == cursor_scope("TX", "premium", False, {"max_premium": 300.0})
+    for other in (cursor_scope("FL", "premium", False, {"max_premium": 300.0}),
+                  cursor_scope("TX", "deductible", False, {"max_premium": 300.0}),
+                  cursor_scope("TX", "premium", True, {"max_premium": 300.0}),
+                  cursor_scope("TX", "premium", False)):
+        assert other != scope
+    forged = [
+        "not a cursor!",
+        encode_cursor("v1", 50)[:-3],
+        base64.urlsafe_b64encode(b"[1, 2]").decode(),
+        base64.urlsafe_b64encode(b'{"v": "v1"}').decode(),
+        base64.urlsafe_b64encode(b'{"v": "v1", "o": "ten"}').decode(),
+    ]
+    for cursor in forged:
+        try:
+            decode_cursor(cursor)
+            raise AssertionError(f"{cursor!r} was accepted")
+        except ValueError:
+            pass
+
+def test_project_fields():
+    """Projection keeps only the requested fields, in order, and rejects unknown ones"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_sample_plans(Path(tmp))
+        plans = DataService().load_cms_data(tmp)[:2]
+        assert project(plans, None) == plans
+        assert project(plans, ["monthly_premium", "plan_id"]) == [
+            {"monthly_premium": plan.monthly_premium, "plan_id": plan.plan_id} for plan in plans]
+        try:
+            project(plans, ["plan_id", "secret"])
+            raise AssertionError("unknown field was accepted")
+        except ValueError:
+            pass
+
+def test_plan_listing_endpoint():
+    """GET /api/plans pages with cursors, projects fields, and answers 400/409 for bad or reused cursors"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_sample_plans(Path(tmp))
+        service = DataService()
+        plans = service.load_cms_data(tmp)
+        client = api_client(service)
+
+        seen, params = [], {"state_code": "TX", "sort_by": "deductible", "limit": 3, "fields": "plan_id,deductible"}
+        while True:
+            response = client.get("/api/plans", params=params)
+            assert response.status_code == 200
+            body = response.json()
+            assert body["total_count"] == 8
+            assert all(list(plan) == ["plan_id", "deductible"] for plan in body["plans"])
+            seen += [plan["plan_id"] for plan in body["plans"]]
+            if body["next_cursor"] is None:
+                break
+            params = {**params, "cursor": body["next_cursor"]}
+        assert seen == sorted_ids([plan for plan in plans if plan.state_code == "TX"], "deductible")
+
+        full = client.get("/api/plans", params={"limit": 1}).json()["plans"][0]
+        assert list(full) == list(PLAN_RECORD_FIELDS)
+
+        assert client.get("/api/plans", params={"sort_by": "popularity"}).status_code == 400
+        assert client.get("/api/plans", params={"fields": "plan_id,secret"}).status_code == 400
+        assert client.get("/api/plans", params={"cursor": "not a cursor!"}).status_code == 400
+        first = client.get("/api/plans", params={"sort_by": "deductible", "limit": 3}).json()
+        _, offset, scope = decode_cursor(first["next_cursor"])
+        stale = client.get("/api/plans", params={"sort_by": "deductible",
+                                                 "cursor": encode_cursor("older-version", offset, scope)})
+        assert stale.status_code == 409
+        # A cursor replayed with another sort, direction or filter set is rejected rather than paging a different order
+        for params in ({"sort_by": "premium"}, {"sort_by": "deductible", "descending": True},
+                       {"sort_by": "deductible", "state_code": "TX"}, {"sort_by": "deductible", "max_premium": 400}):
+            reused = client.get("/api/plans", params={**params, "cursor": first["next_cursor"]})
+            assert reused.status_code == 400, params
+        assert client.get("/api/plans", params={"sort_by": "deductible", "cursor": first["next_cursor"]}).status_code == 200
+
+if __name__ == "__main__":
+    test_pages_are_stable_and_complete()
+    test_cursor_round_trip_and_tampering()
+    test_project_fields()
+    test_plan_listing_endpoint()
+    print("Plan listing tests passed.")
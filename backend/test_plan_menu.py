@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for employer plan-menu selection
+"""
+
+import itertools
+import os
+import sys
+
+import numpy as np
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.domain import CoverageLevel, EmployeeProfile
+from app.models.records import PlanRecord
+from app.optimization.bundler import BenefitBundler
+from app.optimization.plan_menu import PlanMenuOptimizer
+from test_family_premium import sample_calculator
+
+def test_utility_matrix():
+    """Matrix entries match the bundler's utility; over-budget and excluded HSA plans score 0"""
+    plans = [
+        PlanRecord("A", 300.0, 2000.0, 6000.0, False, 0.7, "silver", "TX", "1", "A", "Silver", "HMO", "Individual"),
+        PlanRecord("B", 800.0, 500.0, 3000.0, False, 0.9, "platinum", "TX", "1", "B", "Platinum", "PPO", "Individual"),
+        PlanRecord("C", 250.0, 5000.0, 7000.0, True, 0.6, "bronze", "TX", "1", "C", "Bronze", "HMO", "Individual"),
+    ]
+    bundler = BenefitBundler()
+    profiles = [EmployeeProfile(age=30, risk_score=0.2, budget_cap=500),
+                EmployeeProfile(age=50, risk_score=0.8, budget_cap=900, preference_weights={"cost": 0.5, "hsa": 0.5})]
+    matrix = PlanMenuOptimizer(bundler).utility_matrix(profiles, plans)
+    expected = bundler.utility_scores(profiles[0], plans, [300.0, 800.0, 250.0])
+    assert np.isclose(matrix[0, 0], expected[0]) and matrix[0, 1] == 0 and matrix[0, 2] == 0
+    assert (matrix[1] > 0).all()
+
+def test_household_premiums_batched_per_rating_area():
+    """Family rows match per-employee household pricing; plan rows are resolved once per rating area"""
+    plans = [
+        PlanRecord("11111NY0010001-01", 300.0, 2000.0, 6000.0, False, 0.7, "silver", "NY", "1", "A", "Silver", "HMO", "Individual"),
+        PlanRecord("22222NY0010001-01", 450.0, 500.0, 3000.0, False, 0.9, "platinum", "NY", "2", "B", "Platinum", "PPO", "Individual"),
+        PlanRecord("99999NY0010001-01", 200.0, 5000.0, 7000.0, False, 0.6, "bronze", "NY", "9", "C", "Bronze", "HMO", "Individual"),
+    ]
+    calculator = sample_calculator()
+    resolved = []
+    plan_rows = calculator.plan_rows
+    calculator.plan_rows = lambda plan_ids, area: resolved.append(area) or plan_rows(plan_ids, area)
+    profiles = [
+        EmployeeProfile(age=40, risk_score=0.3, budget_cap=5000, coverage_level=CoverageLevel.FAMILY,
+                        spouse_age=38, dependent_ages=[12, 10, 8, 3], rating_area_id="Rating Area 1"),
+        EmployeeProfile(age=30, risk_score=0.1, budget_cap=5000),
+        EmployeeProfile(age=64, risk_score=0.9, budget_cap=5000, coverage_level=CoverageLevel.EMPLOYEE_AND_SPOUSE,
+                        spouse_age=60, rating_area_id="Rating Area 1"),
+        EmployeeProfile(age=45, risk_score=0.5, budget_cap=5000, coverage_level=CoverageLevel.EMPLOYEE_AND_CHILDREN,
+                        dependent_ages=[22, 5]),
+    ]
+    bundler = BenefitBundler()
+    for family_premiums in (calculator, None):
+        matrix = PlanMenuOptimizer(bundler).utility_matrix(profiles, plans, family_premiums)
+        if family_premiums is not None:
+            assert sorted(resolved, key=str) == [None, "Rating Area 1"]
+        for row, profile in zip(matrix, profiles):
+            premiums = bundler.household_premiums(profile, plans, family_premiums)
+            assert np.allclose(row, bundler.utility_scores(profile, plans, premiums), rtol=1e-6)
+
+def test_greedy_matches_exact():
+    """Lazy greedy reaches the brute-force optimum on a small instance, and its bound holds"""
+    rng = np.random.default_rng(5)
+    matrix = np.asfortranarray(rng.random((40, 12)) * (rng.random((40, 12)) > 0.6), dtype=np.float32)
+    optimizer = PlanMenuOptimizer(BenefitBundler())
+    optimum = max(matrix[:, list(menu)].max(axis=1).sum(dtype=float) for menu in itertools.combinations(range(12), 3))
+
+    greedy = optimizer.select(matrix, 3, "greedy")
+    exact = optimizer.select(matrix, 3, "exact")
+    assert np.isclose(exact.total_utility, optimum)
+    assert greedy.total_utility >= (1 - 1 / np.e) * optimum
+    assert greedy.upper_bound >= optimum - 1e-6
+    assert len(greedy.plan_indices) == 3 and (greedy.assignments < 3).all()
+
+if __name__ == "__main__":
+    test_utility_matrix()
+    test_household_premiums_batched_per_rating_area()
+    test_greedy_matches_exact()
+    print("Plan menu tests passed.")
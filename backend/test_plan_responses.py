@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for cached per-state plan responses: ETags, gzip negotiation and invalidation on reload
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.data_service import DataService
+from app.services.reload_service import DatasetReloader
+from app.services.response_cache import accepts_gzip, gzip_etag
+from test_plan_listing import api_client
+from test_reload_service import write_sample_pufs, write_sample_rates
+
+def test_accepts_gzip():
+    """gzip is chosen only when listed (or covered by '*') with a non-zero q-value"""
+    for header in ("gzip", "gzip, deflate, br", "br;q=1.0, gzip;q=0.5", "*", "deflate, *;q=0.1", "GZIP ; Q=0.2"):
+        assert accepts_gzip(header), header
+    for header in (None, "", "identity", "br", "gzip;q=0", "gzip;q=0.0, br", "*;q=0", "gzip;q=0, *", "gzip;q=abc"):
+        assert not accepts_gzip(header), header
+
+def test_state_plans_etag_gzip_and_reload():
+    """Responses revalidate with 304, honour gzip q-values with their own ETag, are built once per version and change on reload"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_sample_pufs(Path(tmp))
+        service = DataService()
+        service.load_cms_data(tmp)
+        lookups = []
+        get_plans_by_state = service.get_plans_by_state
+        service.get_plans_by_state = lambda state_code: lookups.append(state_code) or get_plans_by_state(state_code)
+        client = api_client(service)
+
+        first = client.get("/api/plans/ak", headers={"Accept-Encoding": "identity"})
+        assert first.status_code == 200 and "content-encoding" not in first.headers
+        assert [plan["monthly_premium"] for plan in first.json()] == [400.0]
+        etag = first.headers["etag"]
+        assert first.headers["vary"] == "Accept-Encoding"
+
+        for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            response = client.get("/api/plans/AK", headers={"If-None-Match": if_none_match,
+                                                            "Accept-Encoding": "identity"})
+            assert response.status_code == 304 and response.headers["etag"] == etag and not response.content
+        assert client.get("/api/plans/AK", headers={"If-None-Match": '"other"'}).status_code == 200
+
+        zipped = client.get("/api/plans/AK", headers={"Accept-Encoding": "gzip"})
+        assert zipped.headers["content-encoding"] == "gzip" and zipped.json() == first.json()
+        assert zipped.headers["etag"] == gzip_etag(etag) != etag
+        # Either variant's tag revalidates; the 304 names the variant the request would have received
+        for accept_encoding, if_none_match, expected in (("gzip", etag, gzip_etag(etag)),
+                                                         ("gzip", gzip_etag(etag), gzip_etag(etag)),
+                                                         ("identity", gzip_etag(etag), etag)):
+            response = client.get("/api/plans/AK", headers={"If-None-Match": if_none_match,
+                                                            "Accept-Encoding": accept_encoding})
+            assert response.status_code == 304 and response.headers["etag"] == expected
+        refused = client.get("/api/plans/AK", headers={"Accept-Encoding": "gzip;q=0, identity"})
+        assert "content-encoding" not in refused.headers and refused.content == first.content
+        # The plans were materialized for the first response only; later ones came from the cache or a 304
+        assert lookups == ["AK"]
+
+        assert client.get("/api/plans/ZZ").status_code == 404
+        assert client.get("/api/plans/ZZ").status_code == 404
+        assert lookups == ["AK", "ZZ", "ZZ"]
+
+        write_sample_rates(Path(tmp), ak_rate=425.0)
+        DatasetReloader(service).reload()
+        stale = client.get("/api/plans/AK", headers={"If-None-Match": etag})
+        assert stale.status_code == 200 and stale.headers["etag"] != etag
+        assert [plan["monthly_premium"] for plan in stale.json()] == [425.0]
+        assert lookups[-1] == "AK"
+
+if __name__ == "__main__":
+    test_accepts_gzip()
+    test_state_plans_etag_gzip_and_reload()
+    print("Plan response tests passed.")
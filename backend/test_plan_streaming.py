@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test script for NDJSON streaming of plan lists
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.api.streaming import NDJSON_MEDIA_TYPE, ndjson_chunks
+from app.services.data_service import DataService
+from test_plan_listing import api_client, write_sample_plans
+
+def test_ndjson_chunks():
+    """Records are written one per line, chunk_size records per chunk"""
+    chunks = list(ndjson_chunks(({"n": i} for i in range(5)), chunk_size=2))
+    assert len(chunks) == 3
+    assert [json.loads(line) for line in b"".join(chunks).splitlines()] == [{"n": i} for i in range(5)]
+    assert list(ndjson_chunks([])) == []
+
+def test_state_plans_as_ndjson():
+    """Accept: application/x-ndjson streams one parseable plan per line, the same plans as the JSON response"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_sample_plans(Path(tmp))
+        service = DataService()
+        service.load_cms_data(tmp)
+        client = api_client(service)
+
+        plain = client.get("/api/plans/TX")
+        assert plain.status_code == 200
+        streamed = client.get("/api/plans/TX", headers={"Accept": NDJSON_MEDIA_TYPE})
+        assert streamed.status_code == 200
+        assert streamed.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+        lines = streamed.text.splitlines()
+        assert len(lines) == len(plain.json()) == 8
+        assert sorted((json.loads(line) for line in lines), key=lambda plan: plan["plan_id"]) == \
+            sorted(plain.json(), key=lambda plan: plan["plan_id"])
+
+        # ?format=ndjson is equivalent, and the streamed variant has its own ETag
+        by_query = client.get("/api/plans/TX", params={"format": "ndjson"})
+        assert by_query.text == streamed.text
+        assert streamed.headers["etag"] != plain.headers["etag"]
+        revalidated = client.get("/api/plans/TX", headers={"Accept": NDJSON_MEDIA_TYPE,
+                                                           "If-None-Match": streamed.headers["etag"]})
+        assert revalidated.status_code == 304
+        assert client.get("/api/plans/ZZ", headers={"Accept": NDJSON_MEDIA_TYPE}).status_code == 404
+
+if __name__ == "__main__":
+    test_ndjson_chunks()
+    test_state_plans_as_ndjson()
+    print("Plan streaming tests passed.")
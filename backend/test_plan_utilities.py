@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized plan utility scoring
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.domain import EmployeeProfile
+from app.models.records import PlanRecord
+from app.optimization.bundler import UTILITY_WEIGHTS, BenefitBundler, allows_hsa, plan_utilities
+
+# (metal level, network tier, premium, deductible, out-of-pocket max, actuarial value)
+METAL_LEVELS = [
+    ("Bronze", "bronze", 310.0, 7500.0, 9200.0, 0.61),
+    ("Silver", "silver", 420.0, 4200.0, 8700.0, 0.71),
+    ("Gold", "gold", 515.0, 1500.0, 6100.0, 0.81),
+    ("Platinum", "platinum", 640.0, 0.0, 3500.0, 0.91),
+]
+
+def reference_utility(plan: PlanRecord, profile: EmployeeProfile) -> float:
+    """The per-plan utility the optimizer scored plans with before scoring was vectorized"""
+    premium_score = max(0, 1 - (plan.monthly_premium / max(1, profile.budget_cap)))
+    deductible_score = max(0, 1 - (plan.deductible / max(1, profile.budget_cap * 12))) * (0.5 + profile.risk_score / 2)
+    av_score = plan.actuarial_value
+    oop_score = max(0, 1 - (plan.out_of_pocket_max / max(1, profile.budget_cap * 12)))
+    weights = profile.preference_weights
+    return (weights.get("cost", 0.4) * premium_score + weights.get("coverage", 0.3) * av_score +
+            weights.get("network", 0.2) * oop_score + weights.get("flexibility", 0.1) * deductible_score)
+
+def sample_plan(metal_level: str, hsa_eligible: bool) -> PlanRecord:
+    level, tier, premium, deductible, oop, av = next(row for row in METAL_LEVELS if row[0] == metal_level)
+    return PlanRecord(f"{level[:2].upper()}{int(hsa_eligible)}", premium, deductible, oop, hsa_eligible, av, tier,
+                      "TX", "11111", f"{level} plan", level, "PPO", "Individual")
+
+def sample_profile(risk_score: float, hsa: bool, budget_cap: float = 550.0) -> EmployeeProfile:
+    weights = {"cost": 0.35, "coverage": 0.3, "network": 0.25, "flexibility": 0.1}
+    if hsa:
+        weights["hsa_preference"] = 0.0
+    return EmployeeProfile(age=40, risk_score=risk_score, budget_cap=budget_cap, preference_weights=weights)
+
+@pytest.mark.parametrize("metal_level", [row[0] for row in METAL_LEVELS])
+@pytest.mark.parametrize("hsa_eligible", [False, True])
+@pytest.mark.parametrize("risk_score", [0.0, 0.35, 1.0])
+def test_utility_scores_match_per_plan_utility(metal_level, hsa_eligible, risk_score):
+    """BenefitBundler.utility_scores equals the per-plan utility across metal levels, HSA flags and risk"""
+    plans = [sample_plan(metal_level, hsa_eligible), sample_plan("Silver", not hsa_eligible)]
+    for budget_cap in (0.5, 300.0, 550.0, 2000.0):
+        profile = sample_profile(risk_score, hsa=hsa_eligible, budget_cap=budget_cap)
+        scores = BenefitBundler().utility_scores(profile, plans, [plan.monthly_premium for plan in plans])
+        assert scores.tolist() == pytest.approx([reference_utility(plan, profile) for plan in plans], abs=1e-12)
+        assert allows_hsa(profile) == hsa_eligible
+
+def test_plan_utilities_broadcasts_profiles_against_plans():
+    """One call with column-vector profile arguments matches scoring each profile on its own"""
+    plans = [sample_plan(row[0], hsa_eligible) for row in METAL_LEVELS for hsa_eligible in (False, True)]
+    profiles = [sample_profile(risk, hsa=False, budget_cap=cap) for risk in (0.0, 0.5, 1.0) for cap in (250.0, 700.0)]
+    weights = [[profile.preference_weights.get(name, default) for profile in profiles]
+               for name, default in UTILITY_WEIGHTS]
+    column = lambda values: np.asarray(values, dtype=float)[:, None]
+    matrix = plan_utilities(
+        np.array([plan.monthly_premium for plan in plans]), np.array([plan.deductible for plan in plans]),
+        np.array([plan.actuarial_value for plan in plans]), np.array([plan.out_of_pocket_max for plan in plans]),
+        column([profile.budget_cap for profile in profiles]), column([profile.risk_score for profile in profiles]),
+        *(column(values) for values in weights)
+    )
+    assert matrix.shape == (len(profiles), len(plans))
+    expected = [[reference_utility(plan, profile) for plan in plans] for profile in profiles]
+    assert np.allclose(matrix, expected, rtol=0, atol=1e-12)
+
+if __name__ == "__main__":
+    for row in METAL_LEVELS:
+        for hsa_eligible in (False, True):
+            for risk_score in (0.0, 0.35, 1.0):
+                test_utility_scores_match_per_plan_utility(row[0], hsa_eligible, risk_score)
+    test_plan_utilities_broadcasts_profiles_against_plans()
+    print("Plan utility tests passed.")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test script for the typed PUF schema registry
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.puf_schema import memory_report, read_puf_csv
+
+def test_typed_read_prunes_and_types_columns():
+    """Unlisted columns are dropped, codes become categorical and text amounts are still parsed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "rate-puf-2025.csv"
+        pd.DataFrame({
+            "BusinessYear": [2025] * 4,
+            "StateCode": ["AK", "AK", "TX", "TX"],
+            "PlanId": ["11111AK0010001"] * 2 + ["22222TX0010001"] * 2,
+            "RatingAreaId": ["Rating Area 1"] * 4,
+            "Age": ["0-14", "21", "21", "64 and over"],
+            "IndividualRate": ["$1,200.50", "400", "350", ""],
+        }).to_csv(path, index=False)
+
+        rates = read_puf_csv(path, "rate")
+        assert "BusinessYear" not in rates.columns
+        assert str(rates["PlanId"].dtype) == "category" and str(rates["Age"].dtype) == "category"
+        assert rates["Age"].astype(str).tolist() == ["0-14", "21", "21", "64 and over"]
+        assert rates["IndividualRate"].iloc[:3].tolist() == [1200.5, 400.0, 350.0]
+        assert pd.isna(rates["IndividualRate"].iloc[3])
+
+        report = memory_report(path, "rate")
+        assert report["rows"] == 4 and pd.isna(report["columns"].loc["BusinessYear", "typed_bytes"])
+        assert report["columns"].loc["StateCode", "typed_dtype"] == "category"
+
+if __name__ == "__main__":
+    test_typed_read_prunes_and_types_columns()
+    print("PUF schema tests passed.")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test script for the partitioned columnar PUF store
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app.services.data_service as data_service_module
+from app.cli import ingest_pufs
+from app.services.data_service import DataService
+from app.services.puf_store import PufStore
+from app.services.reload_service import DatasetReloader
+from test_reload_service import write_sample_pufs, write_sample_rates
+
+def test_pushdown_matches_in_memory_filter():
+    """Store reads match the in-memory frame, and a stale ingest is bypassed after the CSV changes"""
+    pytest.importorskip("pyarrow")
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as store_dir:
+        write_sample_pufs(Path(tmp))
+        assert ingest_pufs(tmp, store_dir) == {"rate": 2}
+        rows = PufStore(store_dir).read("rate", ["PlanId", "IndividualRate"],
+                                        {"StateCode": "AK", "Age": 21, "RatingAreaId": "Rating Area 1"})
+        assert rows.to_dict("records") == [{"PlanId": "11111AK0010001", "IndividualRate": 400.0}]
+        assert PufStore(store_dir).read("rate", filters={"StateCode": ["AK", "TX"]}).shape[0] == 2
+
+        service = DataService()
+        service.load_cms_data(tmp)
+        settings = data_service_module.settings
+        previous = getattr(settings, "PUF_STORE_DIRECTORY", None)
+        settings.PUF_STORE_DIRECTORY = store_dir
+        try:
+            stored = service.query_puf("rate", ["PlanId", "IndividualRate"], {"StateCode": "TX"})
+            assert stored["IndividualRate"].tolist() == [350.0]
+            write_sample_rates(Path(tmp), ak_rate=425.0)
+            DatasetReloader(service).reload()
+            fresh = service.query_puf("rate", ["IndividualRate"], {"StateCode": "AK"})
+            assert fresh["IndividualRate"].tolist() == [425.0]
+        finally:
+            settings.PUF_STORE_DIRECTORY = previous
+
+if __name__ == "__main__":
+    test_pushdown_matches_in_memory_filter()
+    print("PUF store tests passed.")
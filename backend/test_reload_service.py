@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental CMS data reloads
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.data_service import DataService
+from app.services.reload_service import DatasetReloader
+
+def write_sample_pufs(data_path: Path):
+    """Write a tiny two-state PUF set"""
+    pd.DataFrame([
+        {"PlanId": "11111AK0010001", "StateCode": "AK", "IssuerId": "11111", "PlanMarketingName": "AK Silver",
+         "MetalLevel": "Silver", "PlanType": "HMO", "MarketCoverage": "Individual", "DentalOnlyPlan": "No",
+         "IsHSAEligible": "No", "IssuerActuarialValue": "0.72"},
+        {"PlanId": "22222TX0010001", "StateCode": "TX", "IssuerId": "22222", "PlanMarketingName": "TX Gold",
+         "MetalLevel": "Gold", "PlanType": "PPO", "MarketCoverage": "Individual", "DentalOnlyPlan": "No",
+         "IsHSAEligible": "No", "IssuerActuarialValue": "0.81"},
+    ]).to_csv(data_path / "plan-attributes-puf-2025.csv", index=False)
+    write_sample_rates(data_path)
+
+def write_sample_rates(data_path: Path, ak_rate: float = 400.0):
+    pd.DataFrame([
+        {"PlanId": "11111AK0010001", "StateCode": "AK", "IssuerId": "11111", "RatingAreaId": "Rating Area 1",
+         "Age": "21", "IndividualRate": ak_rate},
+        {"PlanId": "22222TX0010001", "StateCode": "TX", "IssuerId": "22222", "RatingAreaId": "Rating Area 1",
+         "Age": "21", "IndividualRate": 350.0},
+    ]).to_csv(data_path / "rate-puf-2025.csv", index=False)
+
+def test_reload_rebuilds_only_changed_state():
+    """A Rate PUF correction for one state rebuilds premiums for that state only"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp)
+        write_sample_pufs(data_path)
+        service = DataService()
+        service.load_cms_data(tmp)
+        reloader = DatasetReloader(service)
+        first_version = service.dataset_version
+
+        unchanged = reloader.reload()
+        assert unchanged.changed_files == []
+        assert unchanged.dataset_version == first_version
+
+        write_sample_rates(data_path, ak_rate=425.0)
+        report = reloader.reload()
+        print(f"Reload report: {report}")
+        assert report.changed_files == ["rate"]
+        assert not report.full_rebuild
+        assert report.rebuilt == {"premiums": ["AK"], "plans": ["AK"]}
+        assert report.rebuilt_plan_count == 1
+        assert report.total_plan_count == 2
+        assert report.dataset_version != first_version
+        assert service.get_plans_by_state("AK")[0].monthly_premium == 425.0
+        assert service.get_plans_by_state("TX")[0].monthly_premium == 350.0
+
+def test_touched_file_is_not_rebuilt():
+    """Rewriting a file with identical content only refreshes its fingerprint"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp)
+        write_sample_pufs(data_path)
+        service = DataService()
+        service.load_cms_data(tmp)
+        version = service.dataset_version
+        rate_file = data_path / "rate-puf-2025.csv"
+        os.utime(rate_file, (0, 0))
+        report = DatasetReloader(service).reload()
+        assert report.changed_files == []
+        assert report.dataset_version == version
+
+if __name__ == "__main__":
+    test_reload_rebuilds_only_changed_state()
+    test_touched_file_is_not_rebuilt()
+    print("Reload tests passed.")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for sharing the loaded dataset between workers through memory-mapped snapshots
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.domain import EmployeeProfile
+from app.models.records import PlanTable
+from app.services.data_service import DataService
+from app.services.reload_service import DatasetReloader
+from app.services.shared_dataset import SharedDatasetStore
+from test_plan_listing import api_client
+from test_reload_service import write_sample_pufs, write_sample_rates
+
+def test_workers_attach_and_follow_reloads():
+    """The first worker builds the snapshot, the next attaches to it, and reloads hand off new versions"""
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as shared:
+        write_sample_pufs(Path(tmp))
+        builder, follower = DataService(), DataService()
+        assert SharedDatasetStore(shared).load_or_attach(builder, tmp) == "built"
+        assert SharedDatasetStore(shared).load_or_attach(follower, tmp) == "attached"
+
+        assert follower.dataset_version == builder.dataset_version
+        assert isinstance(follower.plans_cache, PlanTable) and follower.rate_df is None
+        assert list(follower.plans_cache) == builder.plans_cache
+        assert follower.plans_cache[-1] == builder.plans_cache[-1] and follower.plans_cache[:1] == builder.plans_cache[:1]
+        # The listing index is mapped from the snapshot too, not rebuilt from records
+        index = follower.get_plan_index()
+        assert isinstance(index._partitions["AK"].positions, np.memmap)
+        assert index.page("AK") == builder.get_plan_index().page("AK")
+        curves = follower.get_rate_curves()
+        assert isinstance(curves.premiums, np.memmap) and curves.premiums[0, 21] in (400.0, 350.0)
+        profile = EmployeeProfile(age=21, risk_score=0.2, budget_cap=600, rating_area_id="1")
+        premiums = follower.get_family_premium_calculator().premiums(["11111AK0010001"], profile)
+        assert list(premiums) == [400.0]
+
+        # A third worker that never polls follows handoffs through the CURRENT pointer on requests
+        idle = DataService()
+        SharedDatasetStore(shared).load_or_attach(idle, tmp)
+        client = api_client(idle)
+        client.app.state.dataset_reloader = DatasetReloader(idle, SharedDatasetStore(shared))
+        assert client.get("/api/plans/AK").json()[0]["monthly_premium"] == 400.0
+
+        write_sample_rates(Path(tmp), ak_rate=425.0)
+        rebuilt = DatasetReloader(builder, SharedDatasetStore(shared)).reload()
+        assert rebuilt.rebuilt == {"premiums": ["AK"], "plans": ["AK"]}
+        attached = DatasetReloader(follower, SharedDatasetStore(shared)).reload()
+        assert attached.shared_snapshot == rebuilt.shared_snapshot == builder.dataset_version
+        assert attached.rebuilt_plan_count == 0
+        assert follower.get_plans_by_state("AK")[0].monthly_premium == 425.0
+
+        assert client.get("/api/plans/AK").json()[0]["monthly_premium"] == 425.0
+        assert idle.dataset_version == builder.dataset_version
+        assert not client.app.state.dataset_reloader.follow_shared()
+
+if __name__ == "__main__":
+    test_workers_attach_and_follow_reloads()
+    print("Shared dataset tests passed.")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight request coalescing
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.single_flight import SingleFlight
+
+def test_identical_calls_share_one_computation():
+    """Concurrent callers of one key get the same result, and errors reach every waiter"""
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"plan": "A"}
+
+        async def fail():
+            await asyncio.sleep(0.05)
+            raise ValueError("solver failed")
+
+        results = await asyncio.gather(*[flights.run("same", compute) for _ in range(5)], flights.run("other", compute))
+        assert len(calls) == 2 and all(result is results[0] for result in results[:5])
+
+        errors = await asyncio.gather(*[flights.run("bad", fail) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(error, ValueError) for error in errors)
+        assert flights.stats() == {"computations": 3, "coalesced": 6, "timeouts": 0, "in_flight": 0}
+
+    asyncio.run(scenario())
+
+def test_timeout_leaves_computation_running():
+    """A waiter that times out gives up alone; the shared computation still runs to completion"""
+    async def scenario():
+        flights = SingleFlight(timeout=0.01)
+        finished = []
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            finished.append(True)
+            return 42
+
+        try:
+            await flights.run("slow", compute)
+            raise AssertionError("expected a timeout")
+        except asyncio.TimeoutError:
+            pass
+        await asyncio.sleep(0.1)
+        assert finished == [True]
+        assert flights.stats()["timeouts"] == 1 and flights.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    test_identical_calls_share_one_computation()
+    test_timeout_leaves_computation_running()
+    print("Single-flight tests passed.")
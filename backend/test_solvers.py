@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the MIP solver backends
+"""
+
+import os
+import random
+import sys
+
+import pulp
+import pytest
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.optimization.solvers import CbcBackend, HighsBackend, SolverBackend
+
+def knapsack(items: int = 40, constraints: int = 4, seed: int = 3):
+    """A multi-dimensional 0/1 knapsack with integer data"""
+    rng = random.Random(seed)
+    problem = pulp.LpProblem("knapsack", pulp.LpMaximize)
+    picks = [pulp.LpVariable(f"x{i}", cat=pulp.LpBinary) for i in range(items)]
+    problem += pulp.lpSum(rng.randint(10, 100) * pick for pick in picks)
+    for _ in range(constraints):
+        weights = [rng.randint(10, 100) for _ in picks]
+        problem += pulp.lpSum(weight * pick for weight, pick in zip(weights, picks)) <= sum(weights) // 4
+    return problem, picks
+
+def test_backends_agree_on_small_mip():
+    """CBC and HiGHS find the same optimal objective, and the solution satisfies every constraint"""
+    pytest.importorskip("highspy")
+    objectives = {}
+    for backend in (CbcBackend(), HighsBackend()):
+        problem, picks = knapsack()
+        stats = backend.solve(problem)
+        assert stats.status == "Optimal" and stats.backend == backend.name
+        assert all(pick.varValue in (0, 1) for pick in picks)
+        assert all(constraint.valid() for constraint in problem.constraints.values())
+        assert stats.objective_value == pytest.approx(pulp.value(problem.objective))
+        assert backend.summary()["solves"] == 1
+        objectives[backend.name] = stats.objective_value
+    assert objectives["cbc"] == pytest.approx(objectives["highs"])
+
+def test_time_limit_reports_incumbent_or_not_solved():
+    """Stopped at the time limit, a warm-start incumbent is reported as solved; without one, as not solved"""
+    pytest.importorskip("highspy")
+    backend = HighsBackend(time_limit=0.0)
+
+    problem, picks = knapsack(items=150, constraints=15)
+    stats = backend.solve(problem)
+    assert stats.status == "Not Solved" and stats.objective_value is None and stats.mip_gap is None
+
+    problem, picks = knapsack(items=150, constraints=15)
+    for i, pick in enumerate(picks):
+        pick.setInitialValue(1 if i < 3 else 0)
+    stats = backend.solve(problem, warm_start=True)
+    assert stats.status == "Optimal" and stats.warm_started
+    assert problem.sol_status == pulp.LpSolutionIntegerFeasible
+    assert stats.objective_value == pytest.approx(pulp.value(problem.objective))
+    assert [pick.varValue for pick in picks[:4]] == [1, 1, 1, 0]
+    summary = backend.summary()
+    assert summary["solves"] == 2 and summary["not_optimal"] == 1
+
+def test_backend_must_implement_solve():
+    """SolverBackend is abstract until _solve is provided"""
+    with pytest.raises(TypeError):
+        SolverBackend()
+
+if __name__ == "__main__":
+    test_backends_agree_on_small_mip()
+    test_time_limit_reports_incumbent_or_not_solved()
+    test_backend_must_implement_solve()
+    print("Solver tests passed.")
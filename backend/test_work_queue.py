@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded optimization executor
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.data_service import DataService
+from app.services.work_queue import BoundedExecutor, QueueFullError
+from test_plan_listing import api_client
+from test_reload_service import write_sample_pufs
+
+class FullExecutor:
+    """Stands in for an executor whose queue is always full"""
+    async def run(self, func, *args):
+        raise QueueFullError(retry_after=3)
+
+def test_queue_sheds_load_and_keeps_loop_responsive():
+    """Calls past workers + queue are rejected with a Retry-After; blocking work does not stall the loop"""
+    async def scenario():
+        executor = BoundedExecutor(max_workers=1, max_queue=1, retry_after_seconds=2)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        results = await asyncio.gather(
+            executor.run(time.sleep, 0.1), executor.run(time.sleep, 0.1), executor.run(time.sleep, 0.1),
+            ticker(), return_exceptions=True
+        )
+        assert results[0] is None and results[1] is None
+        assert isinstance(results[2], QueueFullError) and results[2].retry_after >= 2
+        assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.1
+        stats = executor.stats()
+        assert stats["completed"] == 2 and stats["rejected"] == 1 and stats["queue_depth"] == 0
+        assert stats["queue_wait_ms"]["p95"] >= 90
+        executor.shutdown()
+
+    asyncio.run(scenario())
+
+def test_cancelled_queued_call_releases_its_slot():
+    """Cancelling a call still waiting for a worker frees its queue slot"""
+    async def scenario():
+        executor = BoundedExecutor(max_workers=1, max_queue=1)
+        running = asyncio.ensure_future(executor.run(time.sleep, 0.1))
+        queued = asyncio.ensure_future(executor.run(time.sleep, 0.1))
+        await asyncio.sleep(0.02)
+        assert executor.stats()["queue_depth"] == 1
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        await running
+        stats = executor.stats()
+        assert stats["queue_depth"] == 0 and stats["running"] == 0
+        assert await executor.run(time.sleep, 0) is None
+        executor.shutdown()
+
+    asyncio.run(scenario())
+
+def test_cpu_bound_routes_run_on_the_executor():
+    """Allowance, affordability and plan listing work goes through the executor and is shed when it is full"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_sample_pufs(Path(tmp))
+        service = DataService()
+        service.load_cms_data(tmp)
+        client = api_client(service)
+        employee = {"employee_id": "1", "state_code": "AK", "rating_area_id": "1", "age": 21, "household_income": 60000.0}
+        calls = [
+            ("get", "/api/plans", {"params": {"state_code": "AK"}}),
+            ("get", "/api/plans/AK", {}),
+            ("post", "/api/allowances", {"json": {"state_code": "AK", "classes": [{"name": "all"}],
+                                                  "min_age": 21, "max_age": 21}}),
+            ("post", "/api/affordability", {"json": {"employees": [employee]}}),
+        ]
+
+        client.app.state.optimize_executor = FullExecutor()
+        for method, path, kwargs in calls:
+            response = getattr(client, method)(path, **kwargs)
+            assert response.status_code == 503 and response.headers["retry-after"] == "3", path
+
+        executor = client.app.state.optimize_executor = BoundedExecutor(max_workers=2)
+        for method, path, kwargs in calls:
+            assert getattr(client, method)(path, **kwargs).status_code == 200, path
+        assert executor.stats()["completed"] >= len(calls)
+        executor.shutdown()
+
+if __name__ == "__main__":
+    test_queue_sheds_load_and_keeps_loop_responsive()
+    test_cancelled_queued_call_releases_its_slot()
+    test_cpu_bound_routes_run_on_the_executor()
+    print("Work queue tests passed.")